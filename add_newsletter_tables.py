@@ -1,4 +1,6 @@
 # add_newsletter_tables.py
+# The newsletter tables are part of migrations/0001_baseline.sql; new schema
+# changes go in migrations/ and are applied with migrate.py
 import asyncio
 import asyncpg
 import os
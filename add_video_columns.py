@@ -1,4 +1,6 @@
 # add_video_columns.py
+# The video columns and video_analytics are part of migrations/0001_baseline.sql; new schema
+# changes go in migrations/ and are applied with migrate.py
 import asyncio
 import asyncpg
 import os
@@ -1,19 +1,34 @@
+import asyncio
 import boto3
+import functools
 import hmac
 import hashlib
 import base64
 import uuid
-from typing import Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Tuple
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from app.config import settings
 from app.auth.models import UserRole, SubscriptionTier, UserResponse
+from app.utils.http_client import HTTPClient
+from app.utils.timing import span
 import json
 from jose import jwt, JWTError
 from datetime import datetime, timedelta
 
+class CognitoThrottledError(ValueError):
+    """Raised when Cognito rejects a call with TooManyRequestsException"""
+
 class CognitoClient:
     def __init__(self):
-        self.client = boto3.client('cognito-idp', region_name=settings.aws_region)
+        self.client = boto3.client(
+            'cognito-idp',
+            region_name=settings.aws_region,
+            endpoint_url=settings.cognito_endpoint_url,
+            # One HTTP connection per executor thread so concurrent calls don't queue in botocore
+            config=Config(max_pool_connections=settings.cognito_max_workers)
+        )
         self.user_pool_id = settings.cognito_user_pool_id
         self.client_id = settings.cognito_client_id
         self.client_secret = settings.cognito_client_secret
@@ -167,6 +182,19 @@ class CognitoClient:
             # Even if sign out fails, we'll clear cookies
             pass
     
+    def list_users(self, pagination_token: Optional[str] = None, limit: int = 60) -> Dict[str, Any]:
+        """Get one page of users from the user pool (Cognito allows at most 60 per page)"""
+        params = {'UserPoolId': self.user_pool_id, 'Limit': limit}
+        if pagination_token:
+            params['PaginationToken'] = pagination_token
+        
+        try:
+            return self.client.list_users(**params)
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'TooManyRequestsException':
+                raise CognitoThrottledError(f"Failed to list users: {e.response['Error']['Message']}")
+            raise ValueError(f"Failed to list users: {e.response['Error']['Message']}")
+    
     def initiate_google_auth(self) -> str:
         """Generate Google OAuth URL"""
         google_oauth_url = (
@@ -179,10 +207,8 @@ class CognitoClient:
         )
         return google_oauth_url
     
-    def exchange_code_for_tokens(self, code: str) -> Dict[str, Any]:
-        """Exchange authorization code for tokens"""
-        import httpx
-        
+    def _token_request(self, code: str) -> Tuple[str, Dict[str, str], Dict[str, str]]:
+        """Build the URL, form data and headers for the OAuth token endpoint"""
         token_url = f"https://{settings.cognito_domain}/oauth2/token"
         
         data = {
@@ -197,11 +223,76 @@ class CognitoClient:
             'Content-Type': 'application/x-www-form-urlencoded'
         }
         
-        response = httpx.post(token_url, data=data, headers=headers)
+        return token_url, data, headers
+
+class AsyncCognitoClient:
+    """Non-blocking Cognito client for use inside async routes.
+    
+    boto3 is synchronous, so each call runs on a bounded executor dedicated to
+    Cognito; a slow Cognito response then ties up one of its threads instead of
+    the event loop. The OAuth token exchange goes through the shared pooled HTTPClient.
+    """
+    
+    def __init__(self, client: CognitoClient, max_workers: int):
+        self._client = client
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="cognito"
+        )
+    
+    async def _run(self, func, *args, **kwargs):
+        """Run a blocking CognitoClient method on the Cognito executor"""
+        loop = asyncio.get_running_loop()
+        # Timed here on the loop: executor threads don't see the request's context
+        with span(f"cognito.{func.__name__}"):
+            return await loop.run_in_executor(
+                self._executor, functools.partial(func, *args, **kwargs)
+            )
+    
+    async def register_user(self, email: str, password: str, full_name: str) -> Dict[str, Any]:
+        """Register a new user in Cognito"""
+        return await self._run(self._client.register_user, email, password, full_name)
+    
+    async def authenticate_user(self, email: str, password: str) -> Dict[str, Any]:
+        """Authenticate user with Cognito using email as username"""
+        return await self._run(self._client.authenticate_user, email, password)
+    
+    async def refresh_tokens(self, refresh_token: str) -> Dict[str, Any]:
+        """Refresh access token using refresh token"""
+        return await self._run(self._client.refresh_tokens, refresh_token)
+    
+    async def get_user_info(self, access_token: str) -> UserResponse:
+        """Get user information from access token"""
+        return await self._run(self._client.get_user_info, access_token)
+    
+    async def sign_out(self, access_token: str):
+        """Sign out user from Cognito"""
+        return await self._run(self._client.sign_out, access_token)
+    
+    async def list_users(self, pagination_token: Optional[str] = None, limit: int = 60) -> Dict[str, Any]:
+        """Get one page of users from the user pool"""
+        return await self._run(self._client.list_users, pagination_token, limit)
+    
+    def initiate_google_auth(self) -> str:
+        """Generate Google OAuth URL (no network call)"""
+        return self._client.initiate_google_auth()
+    
+    async def exchange_code_for_tokens(self, code: str) -> Dict[str, Any]:
+        """Exchange authorization code for tokens"""
+        token_url, data, headers = self._client._token_request(code)
+        
+        # Pooled client: the TLS connection to the Cognito domain is reused across logins
+        with span("cognito.oauth_token"):
+            response = await HTTPClient.get_client().post(token_url, data=data, headers=headers)
         
         if response.status_code != 200:
             raise ValueError("Failed to exchange code for tokens")
         
         return response.json()
+    
+    def shutdown(self):
+        """Stop the Cognito executor"""
+        self._executor.shutdown(wait=False)
 
-cognito_client = CognitoClient()
\ No newline at end of file
+cognito_client = CognitoClient()
+async_cognito_client = AsyncCognitoClient(cognito_client, max_workers=settings.cognito_max_workers)
\ No newline at end of file
@@ -1,57 +1,144 @@
 # app/auth/enhanced_dependencies.py
 from fastapi import Depends, HTTPException, Cookie, status
 from typing import Optional, Dict, Any
-from app.auth.cognito import cognito_client
+from app.auth.cognito import async_cognito_client
+from app.auth.jwt_verifier import jwt_verifier, user_from_claims, TokenVerificationError
+from app.auth.identity_cache import get_cached_identity, cache_identity, token_cache_key
 from app.auth.models import UserResponse, UserRole, SubscriptionTier
+from app.auth.profile_cache import cache_profile
+from app.auth.revocation import is_token_revoked
+from app.auth.sessions import session_store
 from app.auth.user_service import user_service
 from app.database.connection import get_db_connection, release_db_connection
 from app.database.user_repository import UserRepository
+from app.config import settings
+from app.utils.singleflight import SingleFlight
+from app.utils.timing import span
+import httpx
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Coalesces concurrent resolutions of the same access token
+auth_singleflight = SingleFlight()
+
+async def resolve_cognito_user(access_token: str) -> UserResponse:
+    """Resolve the Cognito user for an access token, verifying it locally when possible"""
+    # Checked before the identity cache, which other workers may still hold
+    if is_token_revoked(access_token):
+        raise TokenVerificationError("Token has been revoked")
+    
+    user = get_cached_identity(access_token)
+    if user:
+        return user
+    
+    if settings.jwt_local_verification:
+        try:
+            with span("auth.jwt_verify"):
+                claims = await jwt_verifier.verify_access_token(access_token)
+            user = user_from_claims(claims)
+        except httpx.HTTPError as e:
+            # JWKS endpoint unreachable - let Cognito validate the token instead
+            logger.warning(f"JWKS fetch failed, falling back to GetUser: {e}")
+    
+    if not user:
+        # Cognito access tokens carry no email, name or custom attributes
+        # (custom:permissions included), so a verified token still needs GetUser
+        # once; the identity cache serves it for the rest of the token's life
+        user = await async_cognito_client.get_user_info(access_token)
+    
+    cache_identity(access_token, user)
+    return user
+
+async def _get_or_create_db_user(cognito_user: UserResponse) -> Dict[str, Any]:
+    """Get the user's database row, creating it if missing.
+
+    Runs on every authenticated request, so an existing user is a (cached)
+    read: upserting here would bump updated_at on each request and pin the
+    request's reads to the primary. Only a missing row goes through the
+    login upsert, which also settles concurrent first requests in one statement.
+    """
+    db_user = await user_service.get_user_profile(cognito_user.id)
+    
+    if not db_user:
+        connection = await get_db_connection()
+        try:
+            user_repo = UserRepository(connection)
+            db_user = await user_repo.upsert_on_login(
+                cognito_sub=cognito_user.id,
+                email=cognito_user.email,
+                display_name=cognito_user.name,
+                role=cognito_user.role,
+                subscription_tier=cognito_user.subscription_tier
+            )
+        finally:
+            await release_db_connection(connection)
+        cache_profile(cognito_user.id, db_user)
+    
+    return db_user
+
+def _combine_user_data(cognito_user: UserResponse, db_user: Dict[str, Any]) -> Dict[str, Any]:
+    """Combined user data with name, role and tier taken from the database"""
+    return {
+        "cognito_user": cognito_user,
+        "db_user": db_user,
+        "user": UserResponse(
+            id=cognito_user.id,
+            email=cognito_user.email,
+            # PUT /auth/profile changes display_name; Cognito's name is only the default
+            name=db_user.get('display_name') or cognito_user.name,
+            role=UserRole(db_user['role']),
+            subscription_tier=SubscriptionTier(db_user['subscription_tier']),
+            permissions=cognito_user.permissions
+        )
+    }
+
+async def _load_user_with_db(access_token: str) -> Dict[str, Any]:
+    """Resolve the Cognito user and their database row (creating it if missing)"""
+    cognito_user = await resolve_cognito_user(access_token)
+    db_user = await _get_or_create_db_user(cognito_user)
+    return _combine_user_data(cognito_user, db_user)
+
+async def _load_session_user(session_id: str) -> Optional[Dict[str, Any]]:
+    """Resolve a server-side session (None if unknown or expired); no Cognito call"""
+    record = await session_store.get(session_id)
+    if record is None:
+        return None
+    
+    db_user = await _get_or_create_db_user(record.user)
+    return _combine_user_data(record.user, db_user)
 
 async def get_current_user_with_db(
-    access_token: Optional[str] = Cookie(None)
+    access_token: Optional[str] = Cookie(None),
+    session_id: Optional[str] = Cookie(None, alias=settings.session_cookie_name)
 ) -> Dict[str, Any]:
     """Get current user from Cognito with database sync"""
-    if not access_token:
+    use_session = settings.session_mode and session_id
+    
+    if not access_token and not use_session:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Not authenticated"
         )
     
     try:
-        # Get user from Cognito
-        cognito_user = cognito_client.get_user_info(access_token)
-        
-        # Get user from database
-        db_user = await user_service.get_user_profile(cognito_user.id)
-        
-        if not db_user:
-            # Create user in database if missing
-            connection = await get_db_connection()
-            try:
-                user_repo = UserRepository(connection)
-                db_user = await user_repo.create_user(
-                    cognito_sub=cognito_user.id,
-                    email=cognito_user.email,
-                    display_name=cognito_user.name,
-                    role=cognito_user.role,
-                    subscription_tier=cognito_user.subscription_tier
+        with span("auth"):
+            if use_session:
+                user_data = await auth_singleflight.do(
+                    token_cache_key(session_id), _load_session_user, session_id
                 )
-            finally:
-                await release_db_connection(connection)
-        
-        # Return combined user data
-        return {
-            "cognito_user": cognito_user,
-            "db_user": db_user,
-            "user": UserResponse(
-                id=cognito_user.id,
-                email=cognito_user.email,
-                name=cognito_user.name,
-                role=UserRole(db_user['role']),
-                subscription_tier=SubscriptionTier(db_user['subscription_tier']),
-                permissions=cognito_user.permissions
+                if user_data is not None:
+                    return user_data
+                if not access_token:
+                    raise ValueError("Session not found or expired")
+                # Stale or evicted session cookie (e.g. the memory backend after a
+                # restart): a valid access token still authenticates
+            
+            # The SPA fires several authenticated calls at once with the same cookie;
+            # they share a single resolution instead of each running the pipeline
+            return await auth_singleflight.do(
+                token_cache_key(access_token), _load_user_with_db, access_token
             )
-        }
         
     except Exception as e:
         raise HTTPException(
@@ -60,8 +147,9 @@ async def get_current_user_with_db(
         )
 
 async def get_current_user_simple(
-    access_token: Optional[str] = Cookie(None)
+    access_token: Optional[str] = Cookie(None),
+    session_id: Optional[str] = Cookie(None, alias=settings.session_cookie_name)
 ) -> UserResponse:
     """Get current user (simple version for backward compatibility)"""
-    user_data = await get_current_user_with_db(access_token)
+    user_data = await get_current_user_with_db(access_token, session_id)
     return user_data["user"]
\ No newline at end of file
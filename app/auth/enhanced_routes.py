@@ -7,9 +7,17 @@ from app.auth.models import (
     UserResponse
 )
 from app.auth.user_service import user_service
-from app.auth.enhanced_dependencies import get_current_user_with_db, get_current_user_simple
-from app.utils.cookies import set_auth_cookies, clear_auth_cookies
-from app.auth.cognito import cognito_client
+from app.auth.enhanced_dependencies import (
+    get_current_user_with_db, get_current_user_simple
+)
+from app.utils.cookies import (
+    set_auth_cookies, clear_auth_cookies, set_session_cookie, clear_session_cookie
+)
+from app.auth.sessions import session_store
+from app.auth.cognito import async_cognito_client
+from app.auth.identity_cache import forget_identity
+from app.auth.jwt_verifier import jwt_verifier, TokenVerificationError
+from app.auth.revocation import revoke_token
 from app.config import settings
 import traceback
 import logging
@@ -17,6 +25,23 @@ import logging
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
+async def _set_login_cookies(
+    response: Response,
+    tokens: Dict[str, Any],
+    user: UserResponse,
+    db_user: Optional[Dict[str, Any]] = None
+):
+    """Issue a session cookie in session mode, otherwise the raw token cookies"""
+    if settings.session_mode:
+        session_id = await session_store.create(tokens, user, db_user)
+        set_session_cookie(response, session_id)
+    else:
+        set_auth_cookies(
+            response=response,
+            access_token=tokens['access_token'],
+            refresh_token=tokens['refresh_token']
+        )
+
 @router.post("/register", response_model=LoginResponse)
 async def register(request: RegisterRequest, response: Response):
     """Register a new user with full database integration"""
@@ -37,10 +62,11 @@ async def register(request: RegisterRequest, response: Response):
         )
         
         # Set cookies
-        set_auth_cookies(
-            response=response,
-            access_token=auth_result['auth_tokens']['access_token'],
-            refresh_token=auth_result['auth_tokens']['refresh_token']
+        await _set_login_cookies(
+            response,
+            auth_result['auth_tokens'],
+            auth_result['user'],
+            auth_result['db_user']
         )
         
         logger.info(f"Registration and auto-login successful for: {request.email}")
@@ -78,10 +104,11 @@ async def login(request: LoginRequest, response: Response):
         )
         
         # Set cookies
-        set_auth_cookies(
-            response=response,
-            access_token=auth_result['auth_tokens']['access_token'],
-            refresh_token=auth_result['auth_tokens']['refresh_token']
+        await _set_login_cookies(
+            response,
+            auth_result['auth_tokens'],
+            auth_result['user'],
+            auth_result['db_user']
         )
         
         logger.info(f"Login successful for: {request.email}")
@@ -159,15 +186,35 @@ async def update_profile(
 @router.post("/logout")
 async def logout(
     response: Response,
-    access_token: Optional[str] = Cookie(None)
+    access_token: Optional[str] = Cookie(None),
+    session_id: Optional[str] = Cookie(None, alias=settings.session_cookie_name)
 ):
     """Logout user"""
+    if session_id:
+        record = await session_store.delete(session_id)
+        if record:
+            access_token = record.access_token
+        clear_session_cookie(response)
+    
     # Sign out from Cognito if token exists
     if access_token:
+        # Only tokens that still verify need revoking; this also keeps arbitrary
+        # cookie values out of the shared denylist. Signature and expiry only:
+        # no users-row lookup or Cognito call that could fail first.
+        try:
+            await jwt_verifier.verify_access_token(access_token)
+        except TokenVerificationError as e:
+            logger.info(f"Logout with an unverifiable access token, nothing to revoke: {e}")
+        except Exception as e:
+            logger.error(f"Could not verify access token at logout, it was not revoked: {e}")
+        else:
+            # Falls back to this worker only (and a background retry) if the database is down
+            await revoke_token(access_token)
+        forget_identity(access_token)
         try:
-            cognito_client.sign_out(access_token)
-        except:
-            pass
+            await async_cognito_client.sign_out(access_token)
+        except Exception as e:
+            logger.warning(f"Cognito sign-out failed at logout: {e}")
     
     # Clear cookies
     clear_auth_cookies(response)
@@ -177,9 +224,19 @@ async def logout(
 @router.post("/refresh")
 async def refresh_token(
     response: Response,
-    refresh_token: Optional[str] = Cookie(None)
+    refresh_token: Optional[str] = Cookie(None),
+    session_id: Optional[str] = Cookie(None, alias=settings.session_cookie_name)
 ):
     """Refresh access token"""
+    if settings.session_mode and session_id:
+        # Tokens stay server-side; the session cookie itself is unchanged
+        if not await session_store.refresh(session_id):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Failed to refresh token"
+            )
+        return {"success": True, "message": "Token refreshed"}
+    
     if not refresh_token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -188,7 +245,7 @@ async def refresh_token(
     
     try:
         # Refresh tokens with Cognito
-        new_tokens = cognito_client.refresh_tokens(refresh_token)
+        new_tokens = await async_cognito_client.refresh_tokens(refresh_token)
         
         # Update access token cookie
         response.set_cookie(
@@ -212,7 +269,7 @@ async def refresh_token(
 @router.get("/google")
 async def google_login():
     """Initiate Google OAuth login"""
-    google_url = cognito_client.initiate_google_auth()
+    google_url = async_cognito_client.initiate_google_auth()
     return RedirectResponse(url=google_url)
 
 @router.get("/callback")
@@ -223,27 +280,21 @@ async def auth_callback(
     """Handle OAuth callback from Cognito"""
     try:
         # Exchange code for tokens
-        tokens = cognito_client.exchange_code_for_tokens(code)
+        tokens = await async_cognito_client.exchange_code_for_tokens(code)
         
-        # Get user info from Cognito and sync with database
-        access_token = tokens['access_token']
-        user_info = cognito_client.get_user_info(access_token)
+        # Get user info from the ID token and sync with database
+        user_info = await user_service.get_login_user(tokens)
         
         # Sync user with database (create if doesn't exist)
         auth_result = await user_service.sync_cognito_user_with_db(user_info)
         
-        # Set cookies
-        set_auth_cookies(
-            response=response,
-            access_token=access_token,
-            refresh_token=tokens['refresh_token']
-        )
-        
-        # Redirect to frontend
-        return RedirectResponse(
+        # Redirect to frontend, carrying the cookies
+        redirect = RedirectResponse(
             url=f"{settings.frontend_url}/browse",
             status_code=status.HTTP_302_FOUND
         )
+        await _set_login_cookies(redirect, tokens, user_info, auth_result['db_user'])
+        return redirect
         
     except Exception as e:
         logger.error(f"OAuth callback failed: {e}")
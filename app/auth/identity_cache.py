@@ -0,0 +1,43 @@
+# app/auth/identity_cache.py
+import hashlib
+import time
+from typing import Optional
+from jose import jwt, JWTError
+from app.auth.models import UserResponse
+from app.config import settings
+from app.utils.cache import TTLCache
+
+# Resolved Cognito identities keyed by a hash of the access token, so raw
+# tokens are never held as dictionary keys
+identity_cache = TTLCache(
+    max_entries=settings.identity_cache_max_entries,
+    ttl_seconds=settings.identity_cache_ttl_seconds
+)
+
+def token_cache_key(access_token: str) -> str:
+    """SHA-256 of the token, used as the cache key"""
+    return hashlib.sha256(access_token.encode()).hexdigest()
+
+def _seconds_until_expiry(access_token: str) -> Optional[float]:
+    """Remaining lifetime from the token's exp claim (None if not a JWT)"""
+    try:
+        exp = jwt.get_unverified_claims(access_token).get("exp")
+    except JWTError:
+        return None
+    return exp - time.time() if exp else None
+
+def get_cached_identity(access_token: str) -> Optional[UserResponse]:
+    """Return the cached user for this token, if any"""
+    if not settings.identity_cache_enabled:
+        return None
+    return identity_cache.get(token_cache_key(access_token))
+
+def cache_identity(access_token: str, user: UserResponse):
+    """Cache a resolved user until the token expires (capped by the cache TTL)"""
+    if not settings.identity_cache_enabled:
+        return
+    identity_cache.set(token_cache_key(access_token), user, ttl=_seconds_until_expiry(access_token))
+
+def forget_identity(access_token: str):
+    """Evict a token's identity, e.g. on logout"""
+    identity_cache.invalidate(token_cache_key(access_token))
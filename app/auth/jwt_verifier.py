@@ -0,0 +1,158 @@
+# app/auth/jwt_verifier.py
+import asyncio
+import json
+import time
+import logging
+from typing import Optional, Dict, Any
+
+import httpx
+from jose import jwt, JWTError
+
+from app.config import settings
+from app.auth.models import UserResponse, UserRole, SubscriptionTier
+from app.utils.http_client import HTTPClient
+from app.utils.timing import span
+
+logger = logging.getLogger(__name__)
+
+class TokenVerificationError(ValueError):
+    """Raised when a Cognito JWT fails local verification"""
+
+class CognitoJWTVerifier:
+    """Verify Cognito-issued JWTs locally against the user pool's JWKS"""
+
+    def __init__(
+        self,
+        jwks_url: Optional[str] = None,
+        issuer: Optional[str] = None,
+        client_id: Optional[str] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        min_refresh_interval: Optional[float] = None
+    ):
+        self.issuer = issuer or (
+            f"https://cognito-idp.{settings.aws_region}.amazonaws.com/{settings.cognito_user_pool_id}"
+        )
+        self.jwks_url = jwks_url or settings.cognito_jwks_url or f"{self.issuer}/.well-known/jwks.json"
+        self.client_id = client_id or settings.cognito_client_id
+        self.http_client = http_client
+        self.min_refresh_interval = (
+            min_refresh_interval if min_refresh_interval is not None
+            else settings.jwks_min_refresh_interval_seconds
+        )
+        self._keys: Dict[str, Dict[str, Any]] = {}
+        self._last_fetch: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    async def verify_access_token(self, token: str) -> Dict[str, Any]:
+        """Verify an access token and return its claims"""
+        claims = await self._verify(token, token_use="access")
+
+        # Access tokens carry the app client in client_id instead of aud
+        if claims.get("client_id") != self.client_id:
+            raise TokenVerificationError("Token was not issued for this client")
+
+        return claims
+
+    async def verify_id_token(self, token: str, access_token: Optional[str] = None) -> Dict[str, Any]:
+        """Verify an ID token (aud must be our client) and return its claims.
+
+        Pass the access token issued alongside it so at_hash can be checked.
+        """
+        return await self._verify(
+            token,
+            token_use="id",
+            audience=self.client_id,
+            access_token=access_token
+        )
+
+    async def _verify(
+        self,
+        token: str,
+        token_use: str,
+        audience: Optional[str] = None,
+        access_token: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Check signature, expiry, issuer and token_use"""
+        try:
+            header = jwt.get_unverified_header(token)
+        except JWTError:
+            raise TokenVerificationError("Malformed token")
+
+        kid = header.get("kid")
+        if not kid:
+            raise TokenVerificationError("Token has no key id")
+
+        key = await self._get_signing_key(kid)
+
+        try:
+            claims = jwt.decode(
+                token,
+                key,
+                algorithms=["RS256"],
+                issuer=self.issuer,
+                audience=audience,
+                access_token=access_token,
+                options={"verify_aud": audience is not None}
+            )
+        except JWTError as e:
+            raise TokenVerificationError(f"Token verification failed: {e}")
+
+        if claims.get("token_use") != token_use:
+            raise TokenVerificationError(f"Expected a {token_use} token")
+
+        return claims
+
+    async def _get_signing_key(self, kid: str) -> Dict[str, Any]:
+        """Return the JWK for kid, re-fetching the key set once if it is unknown"""
+        key = self._keys.get(kid)
+        if key:
+            return key
+
+        async with self._lock:
+            # Another request may have refreshed the keys while we waited
+            key = self._keys.get(kid)
+            if key:
+                return key
+
+            # Don't let tokens with bogus key ids hammer the JWKS endpoint
+            if (self._last_fetch is not None and
+                    time.monotonic() - self._last_fetch < self.min_refresh_interval):
+                raise TokenVerificationError("Unknown signing key")
+
+            await self._refresh_keys()
+
+        key = self._keys.get(kid)
+        if not key:
+            raise TokenVerificationError("Unknown signing key")
+        return key
+
+    async def _refresh_keys(self):
+        """Fetch the JWKS document and replace the cached key set"""
+        client = self.http_client or HTTPClient.get_client()
+        with span("auth.jwks_fetch"):
+            response = await client.get(self.jwks_url)
+
+        response.raise_for_status()
+        self._keys = {key["kid"]: key for key in response.json().get("keys", [])}
+        self._last_fetch = time.monotonic()
+        logger.info(f"Loaded {len(self._keys)} signing keys from {self.jwks_url}")
+
+def user_from_claims(claims: Dict[str, Any]) -> Optional[UserResponse]:
+    """Build a UserResponse from token claims, or None if attributes are missing"""
+    if not claims.get("sub") or "email" not in claims or "name" not in claims:
+        return None
+
+    permissions = claims.get("custom:permissions", "[]")
+    if isinstance(permissions, str):
+        permissions = json.loads(permissions)
+
+    return UserResponse(
+        id=claims["sub"],
+        email=claims["email"],
+        name=claims["name"],
+        role=claims.get("custom:role", UserRole.FREE_USER),
+        subscription_tier=claims.get("custom:subscription_tier", SubscriptionTier.FREE),
+        permissions=permissions
+    )
+
+jwt_verifier = CognitoJWTVerifier()
@@ -0,0 +1,36 @@
+# app/auth/profile_cache.py
+from typing import Any, Dict, Optional
+from app.config import settings
+from app.database.notifications import notification_listener, notify
+from app.utils.cache import TTLCache
+
+USER_CHANGED_CHANNEL = "user_changed"
+
+# users rows keyed by cognito_sub. The TTL bounds how stale a row (and so a
+# subscription tier) can get if a user_changed notification is ever missed.
+user_profile_cache = TTLCache(
+    max_entries=settings.user_profile_cache_max_entries,
+    ttl_seconds=settings.user_profile_cache_ttl_seconds
+)
+
+def get_cached_profile(cognito_sub: str) -> Optional[Dict[str, Any]]:
+    """Return the cached users row for cognito_sub, if any"""
+    if not settings.user_profile_cache_enabled:
+        return None
+    return user_profile_cache.get(cognito_sub)
+
+def cache_profile(cognito_sub: str, db_user: Optional[Dict[str, Any]]):
+    """Cache a users row (missing users are not cached)"""
+    if settings.user_profile_cache_enabled and db_user:
+        user_profile_cache.set(cognito_sub, db_user)
+
+async def publish_user_changed(connection, cognito_sub: str):
+    """Invalidate a user locally and tell every other worker to do the same"""
+    user_profile_cache.invalidate(cognito_sub)
+    await notify(connection, USER_CHANGED_CHANNEL, cognito_sub)
+
+notification_listener.subscribe(
+    USER_CHANGED_CHANNEL,
+    user_profile_cache.invalidate,
+    on_reconnect=user_profile_cache.clear
+)
@@ -0,0 +1,209 @@
+# app/auth/revocation.py
+import asyncio
+import heapq
+import time
+import logging
+from typing import Dict, List, Optional, Tuple
+from jose import jwt, JWTError
+from app.auth.identity_cache import token_cache_key
+from app.config import settings
+from app.database.connection import get_db_connection, release_db_connection
+from app.database.notifications import notification_listener, notify
+from app.utils.tasks import create_detached_task
+
+logger = logging.getLogger(__name__)
+
+TOKEN_REVOKED_CHANNEL = "token_revoked"
+
+class RevocationList:
+    """Revoked token ids, each kept only until the token would have expired anyway.
+
+    Membership is a dict lookup; a heap ordered by expiry lets expired ids be
+    dropped without scanning. If max_entries is exceeded the ids closest to
+    expiry are dropped first, since they are the least dangerous to forget.
+    Not thread-safe: it is meant to be used from the event loop only.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: Dict[str, float] = {}
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self.overflows = 0
+
+    def add(self, token_id: str, expires_at: float):
+        """Revoke token_id until expires_at (epoch seconds)"""
+        if expires_at <= time.time() or self._entries.get(token_id, 0) >= expires_at:
+            return
+        self._entries[token_id] = expires_at
+        heapq.heappush(self._expiry_heap, (expires_at, token_id))
+        self._purge()
+
+    def is_revoked(self, token_id: str) -> bool:
+        expires_at = self._entries.get(token_id)
+        return expires_at is not None and expires_at > time.time()
+
+    def clear(self):
+        self._entries.clear()
+        self._expiry_heap.clear()
+
+    def _purge(self):
+        now = time.time()
+        while self._expiry_heap and (
+            self._expiry_heap[0][0] <= now or len(self._entries) > self.max_entries
+        ):
+            expires_at, token_id = heapq.heappop(self._expiry_heap)
+            # Skip heap entries superseded by a later expiry for the same id
+            if self._entries.get(token_id) != expires_at:
+                continue
+            del self._entries[token_id]
+            if expires_at > now:
+                self.overflows += 1
+                logger.warning(f"Revocation list full, forgetting {token_id} early")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self):
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "overflows": self.overflows
+        }
+
+revocation_list = RevocationList(max_entries=settings.token_revocation_max_entries)
+
+def token_revocation_ids(access_token: str) -> Tuple[List[str], float]:
+    """The ids a logout revokes for this token, and when they stop mattering.
+
+    Cognito JWTs carry jti (this token) and origin_jti (shared by every token
+    from the same sign-in, including refreshed ones). Opaque tokens fall back
+    to their hash and only need to outlive the identity cache.
+    """
+    try:
+        claims = jwt.get_unverified_claims(access_token)
+    except JWTError:
+        claims = {}
+
+    ids = [claims[name] for name in ("jti", "origin_jti") if claims.get(name)]
+    expires_at = claims.get("exp") or time.time() + settings.identity_cache_ttl_seconds
+    return ids or [token_cache_key(access_token)], expires_at
+
+def is_token_revoked(access_token: str) -> bool:
+    """True if the token (or the sign-in it came from) has been logged out"""
+    if not revocation_list:
+        return False
+    ids, _ = token_revocation_ids(access_token)
+    return any(revocation_list.is_revoked(token_id) for token_id in ids)
+
+# Revocations the database hasn't taken yet (token id -> expires_at); they hold
+# in this worker only until _retry_unshared writes them
+_unshared: Dict[str, float] = {}
+_share_task: Optional[asyncio.Task] = None
+
+async def _share_revocations(revocations: List[Tuple[str, float]]):
+    """Persist revocations and notify every worker, in one transaction"""
+    connection = await get_db_connection()
+    try:
+        async with connection.transaction():
+            await connection.executemany("""
+                INSERT INTO revoked_tokens (token_id, expires_at)
+                VALUES ($1, to_timestamp($2))
+                ON CONFLICT (token_id) DO UPDATE
+                SET expires_at = GREATEST(revoked_tokens.expires_at, EXCLUDED.expires_at)
+            """, revocations)
+            for token_id, expires_at in revocations:
+                await notify(connection, TOKEN_REVOKED_CHANNEL, f"{expires_at}:{token_id}")
+    finally:
+        await release_db_connection(connection)
+
+async def revoke_token(access_token: str) -> bool:
+    """Revoke a token in this worker, persist it and tell every other worker.
+
+    Returns False if the database write failed. The token is still revoked
+    here, and the write is retried in the background until it succeeds or
+    the token expires.
+    """
+    ids, expires_at = token_revocation_ids(access_token)
+    for token_id in ids:
+        revocation_list.add(token_id, expires_at)
+
+    try:
+        await _share_revocations([(token_id, expires_at) for token_id in ids])
+        return True
+    except Exception as e:
+        logger.error(f"Failed to share token revocation, retrying in the background: {e}")
+        for token_id in ids:
+            _unshared[token_id] = max(expires_at, _unshared.get(token_id, 0))
+        _schedule_share_retry()
+        return False
+
+def _schedule_share_retry():
+    global _share_task
+    if _share_task is None or _share_task.done():
+        # Not tied to the logout request that failed
+        _share_task = create_detached_task(_retry_unshared())
+
+async def _retry_unshared():
+    delay = settings.token_revocation_retry_delay_seconds
+    while _unshared:
+        await asyncio.sleep(delay)
+        now = time.time()
+        for token_id in [token_id for token_id, expires_at in _unshared.items() if expires_at <= now]:
+            del _unshared[token_id]
+        pending = list(_unshared.items())
+        if not pending:
+            break
+
+        try:
+            await _share_revocations(pending)
+        except Exception as e:
+            delay = min(delay * 2, settings.token_revocation_retry_max_delay_seconds)
+            logger.warning(f"{len(pending)} token revocations still not shared, retrying in {delay:.0f}s: {e}")
+            continue
+
+        for token_id, expires_at in pending:
+            # A later logout may have extended it meanwhile; that one goes next round
+            if _unshared.get(token_id) == expires_at:
+                del _unshared[token_id]
+        logger.info(f"Shared {len(pending)} token revocations after retrying")
+
+def revocation_stats() -> Dict[str, int]:
+    return {**revocation_list.stats(), "unshared": len(_unshared)}
+
+async def load_revocations():
+    """Load every still-relevant revocation (startup, and after missed notifications)"""
+    connection = await get_db_connection()
+    try:
+        await connection.execute("DELETE FROM revoked_tokens WHERE expires_at < CURRENT_TIMESTAMP")
+        rows = await connection.fetch(
+            "SELECT token_id, EXTRACT(EPOCH FROM expires_at)::float8 AS expires_at FROM revoked_tokens"
+        )
+    finally:
+        await release_db_connection(connection)
+
+    for row in rows:
+        revocation_list.add(row['token_id'], row['expires_at'])
+    logger.info(f"Loaded {len(rows)} token revocations")
+
+def _on_token_revoked(payload: str):
+    expires_at, _, token_id = payload.partition(":")
+    revocation_list.add(token_id, float(expires_at))
+
+_reload_task: Optional[asyncio.Task] = None
+
+async def _reload():
+    try:
+        await load_revocations()
+    except Exception as e:
+        logger.error(f"Failed to reload token revocations: {e}")
+
+def _reload_after_reconnect():
+    global _reload_task
+    if _reload_task is None or _reload_task.done():
+        _reload_task = asyncio.get_running_loop().create_task(_reload())
+
+notification_listener.subscribe(
+    TOKEN_REVOKED_CHANNEL,
+    _on_token_revoked,
+    on_reconnect=_reload_after_reconnect
+)
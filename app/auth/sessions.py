@@ -0,0 +1,251 @@
+# app/auth/sessions.py
+import asyncio
+import base64
+from abc import ABC, abstractmethod
+import hashlib
+import secrets
+import time
+import logging
+from typing import Any, Dict, Optional
+from cryptography.fernet import Fernet, InvalidToken
+from pydantic import BaseModel
+from app.auth.cognito import async_cognito_client
+from app.auth.models import UserResponse
+from app.config import settings
+from app.database.connection import get_db_connection, release_db_connection
+from app.utils.cache import TTLCache
+from app.utils.tasks import create_detached_task
+
+logger = logging.getLogger(__name__)
+
+class SessionRecord(BaseModel):
+    """Server-side state behind an opaque session cookie"""
+    user: UserResponse
+    db_user_id: Optional[str] = None
+    access_token: str
+    refresh_token: str
+    id_token: Optional[str] = None
+    access_expires_at: float
+    refresh_expires_at: float
+
+def session_key(session_id: str) -> str:
+    """Store sessions under a hash so a leaked store doesn't leak live cookies"""
+    return hashlib.sha256(session_id.encode()).hexdigest()
+
+class SessionBackend(ABC):
+    """Shared storage for session records (serialized as strings)"""
+
+    @abstractmethod
+    async def load(self, key: str) -> Optional[str]:
+        """The record saved under key, or None if missing or expired"""
+
+    @abstractmethod
+    async def save(self, key: str, data: str, expires_at: float):
+        """Insert or replace the record under key"""
+
+    @abstractmethod
+    async def delete(self, key: str):
+        """Remove the record under key, if any"""
+
+class PostgresSessionBackend(SessionBackend):
+    """Sessions in the auth_sessions table, shared by every worker and node.
+
+    Records hold Cognito refresh tokens, so they are encrypted at rest with a
+    key derived from jwt_secret_key.
+    """
+
+    PURGE_INTERVAL_SECONDS = 600
+
+    def __init__(self):
+        key = base64.urlsafe_b64encode(hashlib.sha256(settings.jwt_secret_key.encode()).digest())
+        self._fernet = Fernet(key)
+        self._last_purge: Optional[float] = None
+
+    async def load(self, key: str) -> Optional[str]:
+        connection = await get_db_connection()
+        try:
+            data = await connection.fetchval("""
+                SELECT data FROM auth_sessions
+                WHERE session_key = $1 AND expires_at > CURRENT_TIMESTAMP
+            """, key)
+        finally:
+            await release_db_connection(connection)
+
+        if data is None:
+            return None
+        try:
+            return self._fernet.decrypt(data.encode()).decode()
+        except InvalidToken:
+            logger.warning("Discarding session that could not be decrypted")
+            return None
+
+    async def save(self, key: str, data: str, expires_at: float):
+        connection = await get_db_connection()
+        try:
+            await connection.execute("""
+                INSERT INTO auth_sessions (session_key, data, expires_at)
+                VALUES ($1, $2, to_timestamp($3))
+                ON CONFLICT (session_key) DO UPDATE
+                SET data = EXCLUDED.data, expires_at = EXCLUDED.expires_at,
+                    updated_at = CURRENT_TIMESTAMP
+            """, key, self._fernet.encrypt(data.encode()).decode(), expires_at)
+
+            now = time.monotonic()
+            if self._last_purge is None or now - self._last_purge > self.PURGE_INTERVAL_SECONDS:
+                self._last_purge = now
+                await connection.execute(
+                    "DELETE FROM auth_sessions WHERE expires_at < CURRENT_TIMESTAMP"
+                )
+        finally:
+            await release_db_connection(connection)
+
+    async def delete(self, key: str):
+        connection = await get_db_connection()
+        try:
+            await connection.execute("DELETE FROM auth_sessions WHERE session_key = $1", key)
+        finally:
+            await release_db_connection(connection)
+
+class SessionStore:
+    """Opaque-cookie sessions: an in-process map in front of an optional shared backend.
+
+    Without a backend the in-process map is the store, which only works with a
+    single worker. With a backend, local entries are kept for
+    session_local_ttl_seconds so a logout on another worker takes effect
+    within that window.
+    """
+
+    def __init__(self, backend: Optional[SessionBackend] = None):
+        self.backend = backend
+        self._local = TTLCache(
+            max_entries=settings.session_max_entries,
+            ttl_seconds=(settings.session_local_ttl_seconds if backend
+                         else settings.refresh_token_expire_days * 86400)
+        )
+        self._refreshing: Dict[str, asyncio.Task] = {}
+
+    async def create(
+        self,
+        tokens: Dict[str, Any],
+        user: UserResponse,
+        db_user: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Create a session for freshly issued tokens and return its opaque id"""
+        now = time.time()
+        session_id = secrets.token_urlsafe(32)
+        record = SessionRecord(
+            user=user,
+            db_user_id=str(db_user['id']) if db_user and db_user.get('id') else None,
+            access_token=tokens['access_token'],
+            refresh_token=tokens['refresh_token'],
+            id_token=tokens.get('id_token'),
+            access_expires_at=now + tokens['expires_in'],
+            refresh_expires_at=now + settings.refresh_token_expire_days * 86400
+        )
+        await self._save(session_key(session_id), record)
+        return session_id
+
+    async def get(self, session_id: str) -> Optional[SessionRecord]:
+        """Resolve a session id; refreshes Cognito tokens in the background near expiry"""
+        key = session_key(session_id)
+        record = await self._load(key)
+        if record is None:
+            return None
+
+        if record.access_expires_at - time.time() < settings.session_refresh_margin_seconds:
+            self._schedule_refresh(key, record)
+
+        return record
+
+    async def delete(self, session_id: str) -> Optional[SessionRecord]:
+        """Drop a session, returning it so the caller can sign out of Cognito"""
+        key = session_key(session_id)
+        record = await self._load(key)
+        self._local.invalidate(key)
+        if self.backend:
+            await self.backend.delete(key)
+        return record
+
+    async def refresh(self, session_id: str) -> Optional[SessionRecord]:
+        """Refresh a session's Cognito tokens now"""
+        key = session_key(session_id)
+        record = await self._load(key)
+        if record is None:
+            return None
+        return await self._refresh(key, record)
+
+    async def _load(self, key: str) -> Optional[SessionRecord]:
+        record = self._local.get(key)
+
+        if record is None and self.backend:
+            data = await self.backend.load(key)
+            if data:
+                record = SessionRecord.model_validate_json(data)
+                self._cache_locally(key, record)
+
+        if record is None or record.refresh_expires_at <= time.time():
+            return None
+        return record
+
+    def _schedule_refresh(self, key: str, record: SessionRecord):
+        if key not in self._refreshing:
+            # Outlives the request: gets its own DB connection and no request spans
+            task = create_detached_task(self._refresh(key, record))
+            self._refreshing[key] = task
+            task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+
+    async def _refresh(self, key: str, record: SessionRecord) -> Optional[SessionRecord]:
+        try:
+            tokens = await async_cognito_client.refresh_tokens(record.refresh_token)
+        except ValueError as e:
+            # Refresh token revoked or user disabled - the session is over
+            logger.info(f"Ending session after failed token refresh: {e}")
+            self._local.invalidate(key)
+            if self.backend:
+                await self.backend.delete(key)
+            return None
+        except Exception as e:
+            logger.warning(f"Background session refresh failed, will retry: {e}")
+            return record
+
+        refreshed = record.model_copy(update={
+            'access_token': tokens['access_token'],
+            'id_token': tokens.get('id_token', record.id_token),
+            'access_expires_at': time.time() + tokens['expires_in']
+        })
+        await self._save(key, refreshed)
+        return refreshed
+
+    async def _save(self, key: str, record: SessionRecord):
+        self._cache_locally(key, record)
+        if self.backend:
+            await self.backend.save(key, record.model_dump_json(), record.refresh_expires_at)
+
+    def _cache_locally(self, key: str, record: SessionRecord):
+        self._local.set(key, record, ttl=record.refresh_expires_at - time.time())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self.backend).__name__ if self.backend else "memory",
+            "local": self._local.stats(),
+            "refreshing": len(self._refreshing)
+        }
+
+def session_backend_name() -> str:
+    if settings.session_backend:
+        return settings.session_backend
+    return "postgres" if settings.web_concurrency > 1 else "memory"
+
+def _create_backend() -> Optional[SessionBackend]:
+    if session_backend_name() == "postgres":
+        return PostgresSessionBackend()
+    if settings.session_mode and settings.web_concurrency > 1:
+        # Each worker would only know its own sessions: requests routed to the
+        # other workers get a 401
+        logger.error(
+            f"session_backend=memory with web_concurrency={settings.web_concurrency}: "
+            "sessions are not shared between workers; use session_backend=postgres"
+        )
+    return None
+
+session_store = SessionStore(_create_backend())
@@ -2,9 +2,13 @@
 from typing import Optional, Dict, Any
 from app.database.connection import get_db_connection, release_db_connection
 from app.database.user_repository import UserRepository
-from app.auth.cognito import cognito_client
+from app.auth.cognito import async_cognito_client
+from app.auth.profile_cache import get_cached_profile, cache_profile
+from app.auth.jwt_verifier import jwt_verifier, user_from_claims, TokenVerificationError
+from app.auth.identity_cache import cache_identity
 from app.auth.models import UserResponse, UserRole, SubscriptionTier
 from app.config import settings
+import httpx
 import logging
 
 logger = logging.getLogger(__name__)
@@ -22,7 +26,7 @@ class UserService:
         connection = None
         try:
             # Step 1: Register in Cognito first
-            cognito_response = cognito_client.register_user(
+            cognito_response = await async_cognito_client.register_user(
                 email=email,
                 password=password,
                 full_name=full_name
@@ -70,10 +74,10 @@ class UserService:
         connection = None
         try:
             # Step 1: Authenticate with Cognito
-            auth_response = cognito_client.authenticate_user(email, password)
+            auth_response = await async_cognito_client.authenticate_user(email, password)
             
-            # Step 2: Get user info from Cognito
-            user_info = cognito_client.get_user_info(auth_response['access_token'])
+            # Step 2: Get user info from the ID token (no second Cognito call)
+            user_info = await self.get_login_user(auth_response)
             
             # Step 3: Try to sync with database (skip in development if connection fails)
             db_user = None
@@ -81,22 +85,15 @@ class UserService:
                 connection = await get_db_connection()
                 user_repo = UserRepository(connection)
                 
-                # Check if user exists in database
-                db_user = await user_repo.get_user_by_cognito_sub(user_info.id)
-                
-                if not db_user:
-                    # Create user in database if doesn't exist
-                    logger.info(f"Creating missing database user for: {email}")
-                    db_user = await user_repo.create_user(
-                        cognito_sub=user_info.id,
-                        email=user_info.email,
-                        display_name=user_info.name,
-                        role=user_info.role,
-                        subscription_tier=user_info.subscription_tier
-                    )
-                else:
-                    # Update last login
-                    await user_repo.update_user_last_login(user_info.id)
+                # Create the user if missing, otherwise record the login
+                db_user = await user_repo.upsert_on_login(
+                    cognito_sub=user_info.id,
+                    email=user_info.email,
+                    display_name=user_info.name,
+                    role=user_info.role,
+                    subscription_tier=user_info.subscription_tier
+                )
+                cache_profile(user_info.id, db_user)
                     
             except Exception as db_error:
                 if settings.environment == "development":
@@ -136,14 +133,44 @@ class UserService:
             if connection:
                 await release_db_connection(connection)
     
+    async def get_login_user(self, tokens: Dict[str, Any]) -> UserResponse:
+        """Build the user from freshly issued tokens.
+        
+        The ID token already carries sub, email, name and the custom attributes,
+        so it is verified locally instead of calling GetUser. GetUser is only used
+        if the ID token can't be verified or lacks attributes.
+        """
+        access_token = tokens['access_token']
+        user = None
+        
+        if settings.jwt_local_verification and tokens.get('id_token'):
+            try:
+                claims = await jwt_verifier.verify_id_token(tokens['id_token'], access_token=access_token)
+                user = user_from_claims(claims)
+            except (TokenVerificationError, httpx.HTTPError) as e:
+                logger.warning(f"ID token verification failed, falling back to GetUser: {e}")
+        
+        if not user:
+            user = await async_cognito_client.get_user_info(access_token)
+        
+        # The next authenticated request with this token skips resolution entirely
+        cache_identity(access_token, user)
+        return user
+    
     async def get_user_profile(self, cognito_sub: str) -> Optional[Dict[str, Any]]:
-        """Get comprehensive user profile from database"""
+        """Get comprehensive user profile from database (read-through cached)"""
+        db_user = get_cached_profile(cognito_sub)
+        if db_user:
+            return db_user
+        
         connection = None
         try:
             connection = await get_db_connection()
             user_repo = UserRepository(connection)
             
-            return await user_repo.get_user_by_cognito_sub(cognito_sub)
+            db_user = await user_repo.get_user_by_cognito_sub(cognito_sub)
+            cache_profile(cognito_sub, db_user)
+            return db_user
             
         except Exception as e:
             if settings.environment == "development":
@@ -192,22 +219,15 @@ class UserService:
             connection = await get_db_connection()
             user_repo = UserRepository(connection)
             
-            # Check if user exists in database
-            db_user = await user_repo.get_user_by_cognito_sub(cognito_user.id)
-            
-            if not db_user:
-                # Create user in database
-                logger.info(f"Creating OAuth user in database: {cognito_user.email}")
-                db_user = await user_repo.create_user(
-                    cognito_sub=cognito_user.id,
-                    email=cognito_user.email,
-                    display_name=cognito_user.name,
-                    role=cognito_user.role,
-                    subscription_tier=cognito_user.subscription_tier
-                )
-            else:
-                # Update last login
-                await user_repo.update_user_last_login(cognito_user.id)
+            # Create the OAuth user if missing, otherwise record the login
+            db_user = await user_repo.upsert_on_login(
+                cognito_sub=cognito_user.id,
+                email=cognito_user.email,
+                display_name=cognito_user.name,
+                role=cognito_user.role,
+                subscription_tier=cognito_user.subscription_tier
+            )
+            cache_profile(cognito_user.id, db_user)
             
             return {
                 "cognito_user": cognito_user,
@@ -8,6 +8,8 @@ class Settings(BaseSettings):
     cognito_client_id: str
     cognito_client_secret: str
     cognito_domain: str
+    cognito_endpoint_url: Optional[str] = None  # Override the Cognito API endpoint (local fakes)
+    cognito_max_workers: int = 16  # Threads (and HTTP connections) dedicated to blocking Cognito calls
     
     # Email Settings (ADD THESE)
     from_email: str
@@ -23,6 +25,34 @@ class Settings(BaseSettings):
     db_password: Optional[str] = None
     db_ssl_mode: str = "require"
     
+    # Database Pool (per worker process)
+    web_concurrency: int = 1  # Worker processes per task; gunicorn reads the same WEB_CONCURRENCY
+    db_pool_total_connections: int = 20  # Connection budget shared by all workers of a task
+    db_pool_min_size: int = 1  # Opened (and initialized) at startup
+    db_pool_max_size: Optional[int] = None  # Default: db_pool_total_connections // web_concurrency
+    db_pool_max_inactive_connection_lifetime: float = 300.0  # Seconds before idle connections close
+    db_pool_acquire_timeout_seconds: float = 5.0  # Fail fast instead of queueing forever when saturated
+    db_command_timeout_seconds: float = 60.0
+    db_statement_cache_size: int = 100  # 0 when behind pgbouncer in transaction mode
+    db_application_name: str = "betterbliss_api"  # Shown in pg_stat_activity
+    db_statement_timeout_ms: int = 30000  # Server-side cap per statement (0 disables)
+    db_request_scoped_connection: bool = True  # One pooled connection per request, acquired on first use
+    
+    # Read replicas (comma-separated URLs); unset sends every query to the primary
+    database_replica_urls: Optional[str] = None
+    db_replica_pool_max_size: Optional[int] = None  # Per replica; defaults to the primary's size
+    db_replica_acquire_timeout_seconds: float = 1.0  # Busy replica: read from the primary instead
+    db_replica_health_check_seconds: float = 5.0
+    db_replica_max_lag_seconds: float = 30.0  # Replicas further behind are taken out of rotation
+    
+    # Query instrumentation (see app/database/query_log.py)
+    db_query_log_enabled: bool = True
+    db_query_log_max_fingerprints: int = 500  # Distinct statements tracked per worker
+    db_slow_query_ms: float = 250.0  # Logged, and kept in the slow-query log, above this
+    db_slow_query_log_size: int = 200
+    db_explain_sample_rate: float = 0.0  # Fraction of slow reads re-run under EXPLAIN ANALYZE (0 disables)
+    db_explain_min_interval_seconds: float = 300.0  # Per statement fingerprint
+    
     # App Settings
     frontend_url: str
     backend_url: str
@@ -36,7 +66,76 @@ class Settings(BaseSettings):
     cookie_httponly: bool = True
     access_token_expire_minutes: int = 15
     refresh_token_expire_days: int = 7
+
+    # Server-side Sessions (opaque session cookie instead of raw Cognito tokens)
+    session_mode: bool = False
+    session_cookie_name: str = "session_id"
+    session_backend: Optional[str] = None  # "memory" (single worker only) or "postgres" (shared); default: postgres with web_concurrency > 1
+    session_max_entries: int = 50000
+    session_local_ttl_seconds: int = 60  # How long a worker trusts its copy of a shared session
+    session_refresh_margin_seconds: int = 300  # Refresh Cognito tokens this long before expiry
+    
+    # Outbound HTTP (Cognito hosted UI, JWKS)
+    http_connect_timeout_seconds: float = 3.0
+    http_read_timeout_seconds: float = 10.0
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry_seconds: float = 60.0
+    
+    # Token Verification
+    jwt_local_verification: bool = True  # Verify Cognito JWTs locally instead of calling GetUser
+    cognito_jwks_url: Optional[str] = None  # Defaults to the user pool's well-known JWKS URL
+    jwks_min_refresh_interval_seconds: int = 60  # Throttle re-fetches triggered by unknown key ids
+    
+    # Identity Cache (resolved users keyed by access-token hash)
+    identity_cache_enabled: bool = True
+    identity_cache_max_entries: int = 10000
+    identity_cache_ttl_seconds: int = 900  # Never longer than the token's own exp
+    
+    # Catalog Cache (categories, featured experts, hero content; invalidated via NOTIFY catalog_changed)
+    catalog_cache_enabled: bool = True
+    catalog_cache_max_entries: int = 64
+    catalog_cache_ttl_seconds: int = 300  # Max staleness if a notification is missed
     
+    # Catalog Snapshot (published content held in memory, rebuilt on NOTIFY catalog_changed)
+    catalog_snapshot_enabled: bool = True
+    catalog_snapshot_refresh_seconds: int = 300  # Periodic rebuild in case a notification is missed
+    catalog_snapshot_max_rows: int = 50000  # Above this, content is served from SQL
+    
+    # HTTP Caching (ETag/304 on /content browse, detail, categories, experts, hero)
+    http_cache_max_age_seconds: int = 60  # Browser freshness for anonymous and public responses
+    http_cache_shared_max_age_seconds: int = 300  # CDN freshness; signed-in responses are never shared
+    http_cache_stale_while_revalidate_seconds: int = 60
+    http_response_memo_max_entries: int = 1024  # Encoded bodies of catalog responses, reused while the data is unchanged
+    
+    # Content Search (/content/search ranks the newest matches, not all of them)
+    content_search_max_candidates: int = 200  # Matches ranked per query; paging stops after these
+    
+    # Content Suggestions (/content/suggest results keyed by normalized prefix)
+    content_suggest_cache_enabled: bool = True
+    content_suggest_cache_max_entries: int = 2000
+    content_suggest_cache_ttl_seconds: int = 60  # New titles show up within this
+    
+    # User Profile Cache (users rows keyed by cognito_sub, invalidated via NOTIFY user_changed)
+    user_profile_cache_enabled: bool = True
+    user_profile_cache_max_entries: int = 10000
+    user_profile_cache_ttl_seconds: int = 30  # Max staleness of tier checks if a notification is missed
+    
+    # Token Revocation (logged-out token ids, shared via revoked_tokens + NOTIFY token_revoked)
+    token_revocation_max_entries: int = 100000
+    token_revocation_retry_delay_seconds: float = 1.0  # First retry of a revocation the database didn't take
+    token_revocation_retry_max_delay_seconds: float = 60.0  # Backoff cap; retries stop once the token expires
+    
+    # Request Timing (Server-Timing header + structured log line per sampled request)
+    request_timing_enabled: bool = False
+    request_timing_sample_rate: float = 1.0  # Fraction of requests timed when enabled
+    request_timing_header: bool = True  # Send Server-Timing to clients (disable to log only)
+    
+    # Cognito -> users reconciliation (sync_cognito_users.py)
+    cognito_sync_batch_size: int = 5000  # Users per COPY + merge; bounds the job's memory
+    cognito_sync_max_retries: int = 5  # Retries per ListUsers page when Cognito throttles
+    cognito_sync_retry_base_delay_seconds: float = 0.5  # Backoff cap doubles per retry; the wait is jittered
+
     class Config:
         env_file = ".env"
         extra = "ignore"  # This line allows extra env vars without errors
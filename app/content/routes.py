@@ -1,8 +1,11 @@
 # app/content/routes.py - Fixed to use enhanced authentication
-from fastapi import APIRouter, Depends, HTTPException, Query, status, Cookie
-from typing import Optional, Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status, Cookie
+from typing import Optional, Dict, Any, Tuple
 from app.auth.models import UserResponse
+from app.services.catalog_snapshot import CatalogSnapshot, catalog_snapshot
 from app.services.content_service import content_service
+from app.utils.conditional import conditional_responses, has_auth_cookies
+from app.config import settings
 import logging
 
 # CRITICAL: Import from enhanced_dependencies ONLY
@@ -12,19 +15,31 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/content", tags=["Content"])
 
 async def get_optional_user_enhanced(
-    access_token: Optional[str] = Cookie(None)
+    access_token: Optional[str] = Cookie(None),
+    session_id: Optional[str] = Cookie(None, alias=settings.session_cookie_name)
 ) -> Optional[Dict[str, Any]]:
     """Optional user dependency using enhanced auth system"""
-    if not access_token:
+    if not access_token and not (settings.session_mode and session_id):
         return None
     
     try:
-        return await get_current_user_with_db(access_token)
+        return await get_current_user_with_db(access_token, session_id)
     except:
         return None
 
+def _snapshot_memo_key(snapshot: Optional[CatalogSnapshot], *parts) -> Optional[Tuple]:
+    """Memo key for a response the service built from snapshot, None if it may have used SQL.
+
+    The service reads the snapshot without awaiting, so if it's still current
+    after the call it is the one the response came from.
+    """
+    if snapshot is None or catalog_snapshot.get() is not snapshot:
+        return None
+    return (snapshot.version, *parts)
+
 @router.get("/browse")
 async def get_browse_content(
+    request: Request,
     category: Optional[str] = Query(None, description="Filter by category slug"),
     limit: int = Query(20, ge=1, le=50, description="Number of items to return"),
     user_data: Optional[Dict[str, Any]] = Depends(get_optional_user_enhanced)
@@ -41,6 +56,7 @@ async def get_browse_content(
         # Extract user from enhanced auth data
         user = user_data["user"] if user_data else None
         
+        snapshot = catalog_snapshot.get()
         result = await content_service.get_browse_content(
             user=user,
             category_slug=category,
@@ -55,7 +71,12 @@ async def get_browse_content(
             'auth_system': 'enhanced'
         }
         
-        return response_data
+        # Anonymous pages are the same for everyone, so a CDN may share them
+        return conditional_responses.respond(
+            request, response_data,
+            public=not has_auth_cookies(request),
+            memo_key=_snapshot_memo_key(snapshot, 'browse', category, limit, result.get('user_access_level'))
+        )
         
     except HTTPException:
         raise
@@ -68,6 +89,7 @@ async def get_browse_content(
 
 @router.get("/detail/{content_slug}")
 async def get_content_detail(
+    request: Request,
     content_slug: str,
     user_data: Optional[Dict[str, Any]] = Depends(get_optional_user_enhanced)
 ):
@@ -83,6 +105,7 @@ async def get_content_detail(
         # Extract user from enhanced auth data
         user = user_data["user"] if user_data else None
         
+        snapshot = catalog_snapshot.get()
         content_detail = await content_service.get_content_detail(
             content_slug=content_slug,
             user=user
@@ -94,7 +117,13 @@ async def get_content_detail(
                 detail="Content not found"
             )
         
-        return content_detail
+        return conditional_responses.respond(
+            request, content_detail,
+            public=not has_auth_cookies(request),
+            memo_key=_snapshot_memo_key(
+                snapshot, 'detail', content_slug, user.subscription_tier if user else 'anonymous'
+            )
+        )
         
     except HTTPException:
         raise
@@ -106,15 +135,15 @@ async def get_content_detail(
         )
 
 @router.get("/categories")
-async def get_categories():
+async def get_categories(request: Request):
     """Get all active categories (public endpoint)"""
     try:
         categories = await content_service.get_categories()
         
-        return {
+        return conditional_responses.respond(request, {
             'categories': categories,
             'total': len(categories)
-        }
+        }, public=True, vary_cookie=False, memo_key=('categories',), source=categories)
         
     except Exception as e:
         logger.error(f"Categories request failed: {e}")
@@ -125,16 +154,17 @@ async def get_categories():
 
 @router.get("/experts")
 async def get_featured_experts(
+    request: Request,
     limit: int = Query(6, ge=1, le=20, description="Number of experts to return")
 ):
     """Get featured experts (public endpoint)"""
     try:
         experts = await content_service.get_featured_experts(limit=limit)
         
-        return {
+        return conditional_responses.respond(request, {
             'experts': experts,
             'total': len(experts)
-        }
+        }, public=True, vary_cookie=False, memo_key=('experts', limit), source=experts)
         
     except Exception as e:
         logger.error(f"Featured experts request failed: {e}")
@@ -143,15 +173,66 @@ async def get_featured_experts(
             detail="Failed to retrieve experts"
         )
 
+@router.get("/hero")
+async def get_hero_content(request: Request):
+    """Get active hero banners for the landing page (public endpoint)"""
+    try:
+        hero_content = await content_service.get_hero_content()
+        
+        return conditional_responses.respond(request, {
+            'hero_content': hero_content,
+            'total': len(hero_content)
+        }, public=True, vary_cookie=False, memo_key=('hero',), source=hero_content)
+        
+    except Exception as e:
+        logger.error(f"Hero content request failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to retrieve hero content"
+        )
+
+@router.get("/suggest")
+async def suggest_content(
+    q: str = Query(..., min_length=2, max_length=50, description="What the user has typed so far"),
+    limit: int = Query(8, ge=1, le=20, description="Number of suggestions to return"),
+    user_data: Optional[Dict[str, Any]] = Depends(get_optional_user_enhanced)
+):
+    """Typo-tolerant autocomplete over title words and phrases, experts and categories"""
+    try:
+        if not q.strip():
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Search query cannot be empty"
+            )
+        
+        user = user_data["user"] if user_data else None
+        suggestions = await content_service.suggest(q, user=user, limit=limit)
+        
+        return {
+            'query': q.strip(),
+            'suggestions': suggestions
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Suggest request failed for '{q}': {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Suggestions failed"
+        )
+
 @router.get("/search")
 async def search_content(
     q: str = Query(..., min_length=2, max_length=100, description="Search query"),
     category: Optional[str] = Query(None, description="Filter by category"),
+    limit: int = Query(20, ge=1, le=50, description="Number of items to return"),
+    cursor: Optional[str] = Query(None, max_length=200, description="next_cursor from the previous page"),
     user_data: Optional[Dict[str, Any]] = Depends(get_optional_user_enhanced)
 ):
     """Search content securely"""
     try:
-        # Sanitize search query to prevent injection
+        # Parameterised all the way down; only surrounding whitespace is trimmed
         search_query = q.strip()
         if not search_query:
             raise HTTPException(
@@ -159,35 +240,42 @@ async def search_content(
                 detail="Search query cannot be empty"
             )
         
+        if category and not category.replace('-', '').replace('_', '').isalnum():
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid category format"
+            )
+        
         # Extract user from enhanced auth data
         user = user_data["user"] if user_data else None
         
-        # Basic search implementation
-        result = await content_service.get_browse_content(
+        # Full-text search in Postgres: tier and category filters run in SQL
+        result = await content_service.search(
+            query=search_query,
             user=user,
             category_slug=category,
-            limit=20
+            limit=limit,
+            cursor=cursor
         )
         
-        # Filter results by search query
-        filtered_content = []
-        for item in result['content']:
-            if (search_query.lower() in item['title'].lower() or 
-                search_query.lower() in item['description'].lower()):
-                filtered_content.append(item)
-        
         return {
-            'content': filtered_content,
+            'content': result['content'],
             'query': search_query,
-            'total_results': len(filtered_content),
+            'total_results': result['total'],
+            'next_cursor': result['next_cursor'],
             'user_authenticated': user is not None
         }
         
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"Search request failed for query '{q}': {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Search failed"
-        )
\ No newline at end of file
+        )
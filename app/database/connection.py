@@ -1,8 +1,18 @@
 # app/database/connection.py
+import asyncio
 import asyncpg
+import json
 import os
-from typing import Optional
+import time
+from contextvars import ContextVar, Token
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import quote
 from dotenv import load_dotenv
+from app.config import settings
+from app.database.query_log import query_log
+from app.database.statements import is_write, statement_registry
+from app.utils.metrics import Histogram
+from app.utils.timing import span
 import logging
 
 # Ensure environment variables are loaded
@@ -10,32 +20,165 @@ load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+def get_database_url() -> str:
+    """Primary database URL: DATABASE_URL, else built from the db_* settings"""
+    db_url = os.getenv('DATABASE_URL') or settings.database_url
+    if db_url:
+        return db_url
+    
+    if settings.db_host and settings.db_name:
+        credentials = ""
+        if settings.db_username:
+            credentials = quote(settings.db_username, safe="")
+            if settings.db_password:
+                credentials += ":" + quote(settings.db_password, safe="")
+            credentials += "@"
+        port = f":{settings.db_port}" if settings.db_port else ""
+        return (f"postgresql://{credentials}{settings.db_host}{port}/{settings.db_name}"
+                f"?sslmode={settings.db_ssl_mode}")
+    
+    raise ValueError("DATABASE_URL environment variable not set")
+
+def pool_max_size() -> int:
+    """Per-worker pool size: explicit setting, else the task's budget split across workers"""
+    if settings.db_pool_max_size:
+        return settings.db_pool_max_size
+    return max(1, settings.db_pool_total_connections // max(1, settings.web_concurrency))
+
+class PoolMetrics:
+    """Acquire-side counters for the pool, in this worker"""
+    
+    def __init__(self):
+        self.acquire_wait_ms = Histogram()
+        self.acquired = 0
+        self.acquire_timeouts = 0
+        self.acquire_errors = 0
+        # Request-scoped connections: pool waits and acquisitions per request,
+        # and how many get_db_connection calls reused the request's connection
+        self.request_pool_wait_ms = Histogram()
+        self.request_acquires = Histogram(buckets=(0, 1, 2, 3, 4, 5, 10))
+        self.request_reuses = 0
+
+class AppConnection(asyncpg.Connection):
+    """Pool connection class.
+    
+    Any write through it, registered statement or raw SQL, pins the rest of
+    the request's reads to the primary (see note_primary_write).
+    """
+    
+    async def execute(self, query: str, *args, **kwargs):
+        if is_write(query):
+            note_primary_write()
+        return await super().execute(query, *args, **kwargs)
+    
+    async def executemany(self, command: str, args, **kwargs):
+        if is_write(command):
+            note_primary_write()
+        return await super().executemany(command, args, **kwargs)
+    
+    async def fetch(self, query: str, *args, **kwargs):
+        if is_write(query):
+            note_primary_write()
+        return await super().fetch(query, *args, **kwargs)
+    
+    async def fetchrow(self, query: str, *args, **kwargs):
+        if is_write(query):
+            note_primary_write()
+        return await super().fetchrow(query, *args, **kwargs)
+    
+    async def fetchval(self, query: str, *args, **kwargs):
+        if is_write(query):
+            note_primary_write()
+        return await super().fetchval(query, *args, **kwargs)
+    
+    async def prepare_cached(self, query: str):
+        """Parse query into this connection's statement cache without running it.
+        
+        Later fetch/execute calls with the same SQL then skip the Parse round
+        trip. A plain prepare() wouldn't do: asyncpg invalidates
+        PreparedStatement objects once their connection goes back to the pool.
+        """
+        await self._prepare(query, use_cache=True)
+
+async def init_connection(connection: AppConnection):
+    """Runs once per new pool connection, before it is handed out"""
+    # json/jsonb in and out as Python objects instead of strings
+    for type_name in ('json', 'jsonb'):
+        await connection.set_type_codec(
+            type_name, encoder=json.dumps, decoder=json.loads, schema='pg_catalog'
+        )
+    
+    # Registered statements are parsed now, not by the first request that needs
+    # them. Without a statement cache (pgbouncer transaction pooling) there is
+    # nowhere to keep them.
+    if settings.db_statement_cache_size:
+        await statement_registry.prepare_all(connection)
+    
+    # Timing for every query on this connection, keyed by statement fingerprint
+    if settings.db_query_log_enabled:
+        connection.add_query_logger(query_log.record)
+
+async def create_app_pool(db_url: str, max_size: int, label: str, read_only: bool = False) -> asyncpg.Pool:
+    """Pool with the app's connection class, init hook and server settings"""
+    server_settings = {
+        'application_name': settings.db_application_name,
+        'statement_timeout': str(settings.db_statement_timeout_ms)
+    }
+    if read_only:
+        # A write routed here by mistake fails loudly, even on a server that isn't a standby
+        server_settings['default_transaction_read_only'] = 'on'
+    
+    if settings.db_statement_cache_size and settings.db_statement_cache_size < len(statement_registry):
+        logger.warning(f"db_statement_cache_size={settings.db_statement_cache_size} is below the "
+                       f"{len(statement_registry)} registered statements; some will be re-prepared")
+    started = time.perf_counter()
+    
+    # create_pool opens min_size connections up front, each through init_connection
+    pool = await asyncpg.create_pool(
+        db_url,
+        min_size=min(settings.db_pool_min_size, max_size),
+        max_size=max_size,
+        max_inactive_connection_lifetime=settings.db_pool_max_inactive_connection_lifetime,
+        command_timeout=settings.db_command_timeout_seconds,
+        statement_cache_size=settings.db_statement_cache_size,
+        connection_class=AppConnection,
+        init=init_connection,
+        # Sent in the startup packet: no extra round trip, and unlike SET
+        # they survive the RESET ALL the pool runs on release
+        server_settings=server_settings
+    )
+    logger.info(f"Database connection pool created ({label}, max_size={max_size}, "
+                f"workers={settings.web_concurrency}, warm={pool.get_size()}, "
+                f"statements={len(statement_registry)}, "
+                f"{(time.perf_counter() - started) * 1000:.0f} ms)")
+    return pool
+
 class DatabaseConnection:
     _pool: Optional[asyncpg.Pool] = None
+    _pool_lock: Optional[asyncio.Lock] = None
+    metrics = PoolMetrics()
     
     @classmethod
     async def get_pool(cls) -> asyncpg.Pool:
         """Get or create database connection pool"""
         if cls._pool is None:
-            try:
-                db_url = os.getenv('DATABASE_URL')
-                print(f"DEBUG: DATABASE_URL = {db_url}")
-                
-                if not db_url:
-                    raise ValueError("DATABASE_URL environment variable not set")
-                
-                cls._pool = await asyncpg.create_pool(
-                    db_url,
-                    min_size=1,
-                    max_size=10,
-                    command_timeout=60
-                )
-                logger.info("Database connection pool created")
-            except Exception as e:
-                logger.error(f"Failed to create database pool: {e}")
-                raise
+            if cls._pool_lock is None:
+                cls._pool_lock = asyncio.Lock()
+            
+            # Concurrent first callers (startup, /health, early requests) share one creation
+            async with cls._pool_lock:
+                if cls._pool is None:
+                    cls._pool = await cls._create_pool()
         return cls._pool
     
+    @classmethod
+    async def _create_pool(cls) -> asyncpg.Pool:
+        try:
+            return await create_app_pool(get_database_url(), pool_max_size(), label="primary")
+        except Exception as e:
+            logger.error(f"Failed to create database pool: {e}")
+            raise
+    
     @classmethod
     async def close_pool(cls):
         """Close database connection pool"""
@@ -43,13 +186,162 @@ class DatabaseConnection:
             await cls._pool.close()
             cls._pool = None
             logger.info("Database connection pool closed")
+    
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        """Live pool occupancy plus acquire wait/timeout metrics"""
+        pool = cls._pool
+        size = pool.get_size() if pool else 0
+        idle = pool.get_idle_size() if pool else 0
+        return {
+            "size": size,
+            "idle": idle,
+            "in_use": size - idle,
+            "min_size": pool.get_min_size() if pool else None,
+            "max_size": pool.get_max_size() if pool else pool_max_size(),
+            "acquired": cls.metrics.acquired,
+            "acquire_timeouts": cls.metrics.acquire_timeouts,
+            "acquire_errors": cls.metrics.acquire_errors,
+            "acquire_wait_ms": cls.metrics.acquire_wait_ms.stats(),
+            "request_scoped": {
+                "enabled": settings.db_request_scoped_connection,
+                "reuses": cls.metrics.request_reuses,
+                "acquires_per_request": cls.metrics.request_acquires.stats(),
+                "pool_wait_ms_per_request": cls.metrics.request_pool_wait_ms.stats()
+            }
+        }
+
+class RequestConnection:
+    """One pooled connection shared by everything that runs for a request.
+    
+    get_db_connection() acquires it on first use and hands the same connection
+    to later callers (auth dependency, services, repositories); their
+    release_db_connection() calls are no-ops and the connection goes back to
+    the pool when the response completes. A task that asks while another task
+    is using it (asyncio.gather, a coalesced lookup still running) gets its own
+    pool connection instead, since asyncpg connections can't be used
+    concurrently.
+    
+    It also records whether the request has written to the primary, after
+    which its reads stop going to replicas.
+    """
+    
+    __slots__ = ("connection", "owner", "borrowers", "closed", "acquires", "pool_wait_ms", "wrote")
+    
+    def __init__(self):
+        self.connection = None
+        self.owner: Optional[asyncio.Task] = None
+        self.borrowers = 0
+        self.closed = False
+        self.acquires = 0
+        self.pool_wait_ms = 0.0
+        self.wrote = False
+    
+    def can_borrow(self) -> bool:
+        return not self.closed and (self.borrowers == 0 or self.owner is asyncio.current_task())
+    
+    async def close(self):
+        """End of the request: release now, or when the last borrower is done"""
+        if self.closed:
+            return
+        self.closed = True
+        if self.acquires:
+            DatabaseConnection.metrics.request_acquires.observe(self.acquires)
+            DatabaseConnection.metrics.request_pool_wait_ms.observe(self.pool_wait_ms)
+        if self.borrowers == 0:
+            await self._release()
+    
+    async def _release(self):
+        connection, self.connection = self.connection, None
+        if connection is not None:
+            pool = await DatabaseConnection.get_pool()
+            await pool.release(connection)
+
+# The current request's connection scope; None outside requests or when disabled
+_request_connection: ContextVar[Optional[RequestConnection]] = ContextVar("request_connection", default=None)
+
+def start_request_connection() -> Tuple[Optional[RequestConnection], Optional[Token]]:
+    """Open a request scope (nothing is acquired until first use)"""
+    if not settings.db_request_scoped_connection and not settings.database_replica_urls:
+        return None, None
+    scope = RequestConnection()
+    return scope, _request_connection.set(scope)
+
+async def finish_request_connection(scope: RequestConnection, token: Token):
+    try:
+        await scope.close()
+    finally:
+        _request_connection.reset(token)
+
+async def _acquire_from_pool(scope: Optional[RequestConnection] = None):
+    with span("db.acquire"):
+        pool = await DatabaseConnection.get_pool()
+        metrics = DatabaseConnection.metrics
+        started = time.perf_counter()
+        try:
+            connection = await pool.acquire(timeout=settings.db_pool_acquire_timeout_seconds)
+        except asyncio.TimeoutError:
+            metrics.acquire_timeouts += 1
+            logger.warning(f"Timed out after {settings.db_pool_acquire_timeout_seconds}s waiting for "
+                           f"a database connection (pool max_size={pool.get_max_size()})")
+            raise
+        except Exception:
+            metrics.acquire_errors += 1
+            raise
+        wait_ms = (time.perf_counter() - started) * 1000
+        metrics.acquire_wait_ms.observe(wait_ms)
+        metrics.acquired += 1
+        if scope is not None:
+            scope.acquires += 1
+            scope.pool_wait_ms += wait_ms
+        return connection
 
 async def get_db_connection():
-    """Get database connection from pool"""
-    pool = await DatabaseConnection.get_pool()
-    return await pool.acquire()
+    """Get database connection: the request's shared one, else one from the pool"""
+    scope = _request_connection.get()
+    if scope is None or not settings.db_request_scoped_connection or not scope.can_borrow():
+        return await _acquire_from_pool(scope if scope and not scope.closed else None)
+    
+    scope.borrowers += 1
+    scope.owner = asyncio.current_task()
+    if scope.connection is not None:
+        DatabaseConnection.metrics.request_reuses += 1
+        return scope.connection
+    
+    try:
+        scope.connection = await _acquire_from_pool(scope)
+    except Exception:
+        scope.borrowers -= 1
+        raise
+    return scope.connection
 
 async def release_db_connection(connection):
-    """Release database connection back to pool"""
+    """Release database connection back to pool (request-shared ones at the end of the request)"""
+    scope = _request_connection.get()
+    if scope is not None and connection is scope.connection:
+        scope.borrowers -= 1
+        if scope.closed and scope.borrowers == 0:
+            await scope._release()
+        return
+    
     pool = await DatabaseConnection.get_pool()
-    await pool.release(connection)
\ No newline at end of file
+    await pool.release(connection)
+
+def note_primary_write():
+    """Record that this request wrote to the primary (AppConnection and registered writes do this)"""
+    scope = _request_connection.get()
+    if scope is not None:
+        scope.wrote = True
+
+def reads_stick_to_primary() -> bool:
+    """Whether this request's reads must see its own writes"""
+    scope = _request_connection.get()
+    return scope is not None and scope.wrote
+
+async def request_db_connection():
+    """FastAPI dependency yielding the request's shared connection"""
+    connection = await get_db_connection()
+    try:
+        yield connection
+    finally:
+        await release_db_connection(connection)
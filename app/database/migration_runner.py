@@ -0,0 +1,167 @@
+# app/database/migration_runner.py
+import hashlib
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).resolve().parents[2] / "migrations"
+
+# Any constant works; it only has to be the same for every runner
+MIGRATION_LOCK_ID = 727_101_001
+
+_FILENAME = re.compile(r"^(\d{4})_(\w+)\.sql$")
+_NO_TRANSACTION = "-- migrate: no-transaction"
+_CONCURRENT_INDEX = re.compile(
+    r"CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+IF\s+NOT\s+EXISTS\s+(\w+)", re.IGNORECASE
+)
+
+SCHEMA_MIGRATIONS_SQL = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version VARCHAR(10) PRIMARY KEY,
+        name VARCHAR(200) NOT NULL,
+        checksum VARCHAR(64) NOT NULL,
+        duration_ms INTEGER,
+        applied_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+class Migration:
+    """One migrations/NNNN_name.sql file"""
+
+    def __init__(self, path: Path):
+        match = _FILENAME.match(path.name)
+        if not match:
+            raise ValueError(f"Migration file {path.name} is not named NNNN_name.sql")
+        self.path = path
+        self.version, self.name = match.groups()
+        self.sql = path.read_text()
+        self.checksum = hashlib.sha256(self.sql.encode()).hexdigest()
+        # CREATE/DROP INDEX CONCURRENTLY refuses to run inside a transaction block
+        self.transactional = not self.sql.lstrip().startswith(_NO_TRANSACTION)
+
+    def statements(self) -> List[str]:
+        """The file's statements, one per execute (comment lines dropped).
+
+        Only used for no-transaction migrations: a ';' at the end of a line
+        ends a statement, unless it is inside a $$ body (a DO block that
+        commits between batches, say).
+        """
+        statements, current, in_body = [], [], False
+        for line in self.sql.splitlines():
+            if not in_body and line.strip().startswith("--"):
+                continue
+            current.append(line)
+            if line.count("$$") % 2:
+                in_body = not in_body
+            if not in_body and line.rstrip().endswith(";"):
+                statements.append("\n".join(current).strip()[:-1].strip())
+                current = []
+        statements.append("\n".join(current).strip())
+        return [statement for statement in statements if statement]
+
+def load_migrations(directory: Path = MIGRATIONS_DIR) -> List[Migration]:
+    """Every migration in version order"""
+    migrations = [Migration(path) for path in sorted(directory.glob("*.sql"))]
+    versions = [migration.version for migration in migrations]
+    duplicates = {version for version in versions if versions.count(version) > 1}
+    if duplicates:
+        raise ValueError(f"Duplicate migration versions: {', '.join(sorted(duplicates))}")
+    return migrations
+
+class MigrationRunner:
+    """Applies pending migrations in order and records them in schema_migrations.
+
+    Transactional migrations run as a whole, together with their
+    schema_migrations row. No-transaction migrations (CREATE INDEX
+    CONCURRENTLY, which doesn't block writes, and backfills that commit batch
+    by batch) run statement by statement; an
+    index left INVALID by an interrupted build is dropped and rebuilt on the
+    next run. A session advisory lock keeps two deploys from migrating at once.
+    """
+
+    def __init__(self, connection, migrations: Optional[List[Migration]] = None):
+        self.connection = connection
+        self.migrations = load_migrations() if migrations is None else migrations
+
+    async def applied(self) -> Dict[str, Any]:
+        await self.connection.execute(SCHEMA_MIGRATIONS_SQL)
+        rows = await self.connection.fetch(
+            "SELECT version, name, checksum, duration_ms, applied_at FROM schema_migrations"
+        )
+        return {row['version']: row for row in rows}
+
+    async def pending(self) -> List[Migration]:
+        applied = await self.applied()
+        for migration in self.migrations:
+            row = applied.get(migration.version)
+            if row and row['checksum'] != migration.checksum:
+                logger.warning(f"Migration {migration.version}_{migration.name} changed after it was applied")
+        return [migration for migration in self.migrations if migration.version not in applied]
+
+    async def status(self) -> List[Dict[str, Any]]:
+        applied = await self.applied()
+        return [
+            {
+                "version": migration.version,
+                "name": migration.name,
+                "applied_at": applied[migration.version]['applied_at'] if migration.version in applied else None,
+                "duration_ms": applied[migration.version]['duration_ms'] if migration.version in applied else None
+            }
+            for migration in self.migrations
+        ]
+
+    async def run(self, target: Optional[str] = None) -> List[Migration]:
+        """Apply pending migrations up to and including target; returns those applied"""
+        await self.connection.execute("SELECT pg_advisory_lock($1)", MIGRATION_LOCK_ID)
+        try:
+            # Index builds on big tables outlast any statement timeout the role has
+            await self.connection.execute("SET statement_timeout = 0")
+            applied = []
+            for migration in await self.pending():
+                if target and migration.version > target:
+                    break
+                await self.apply(migration)
+                applied.append(migration)
+            return applied
+        finally:
+            await self.connection.execute("SELECT pg_advisory_unlock($1)", MIGRATION_LOCK_ID)
+
+    async def apply(self, migration: Migration):
+        logger.info(f"Applying migration {migration.version}_{migration.name}")
+        started = time.perf_counter()
+        if migration.transactional:
+            async with self.connection.transaction():
+                await self.connection.execute(migration.sql)
+                await self._record(migration, started)
+            return
+
+        for statement in migration.statements():
+            index_name = _CONCURRENT_INDEX.search(statement)
+            if index_name:
+                await self._drop_if_invalid(index_name.group(1))
+            await self.connection.execute(statement)
+        await self._record(migration, started)
+
+    async def _drop_if_invalid(self, index_name: str):
+        """IF NOT EXISTS would skip an index a failed concurrent build left behind"""
+        invalid = await self.connection.fetchval("""
+            SELECT NOT i.indisvalid
+            FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE c.relname = $1 AND pg_catalog.pg_table_is_visible(c.oid)
+        """, index_name)
+        if invalid:
+            logger.warning(f"Dropping invalid index {index_name} left by an interrupted build")
+            await self.connection.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}")
+
+    async def _record(self, migration: Migration, started: float):
+        duration_ms = int((time.perf_counter() - started) * 1000)
+        await self.connection.execute("""
+            INSERT INTO schema_migrations (version, name, checksum, duration_ms)
+            VALUES ($1, $2, $3, $4)
+        """, migration.version, migration.name, migration.checksum, duration_ms)
+        logger.info(f"Applied migration {migration.version}_{migration.name} in {duration_ms} ms")
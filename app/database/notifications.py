@@ -0,0 +1,103 @@
+# app/database/notifications.py
+import asyncio
+import asyncpg
+import logging
+from typing import Callable, Dict, List, Optional
+from app.database.connection import get_database_url
+
+logger = logging.getLogger(__name__)
+
+class NotificationListener:
+    """Long-lived LISTEN connection that fans Postgres NOTIFY payloads out to callbacks.
+
+    Each worker process runs one listener on a dedicated connection (outside the
+    pool). If the connection drops, notifications sent meanwhile are lost, so
+    every subscriber's on_reconnect hook runs once the listener is back.
+    """
+
+    def __init__(self, reconnect_delay: float = 1.0, max_reconnect_delay: float = 30.0):
+        self._handlers: Dict[str, List[Callable[[str], None]]] = {}
+        self._reconnect_hooks: List[Callable[[], None]] = []
+        self._connection: Optional[asyncpg.Connection] = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._reconnect_delay = reconnect_delay
+        self._max_reconnect_delay = max_reconnect_delay
+        self._running = False
+
+    def subscribe(
+        self,
+        channel: str,
+        handler: Callable[[str], None],
+        on_reconnect: Optional[Callable[[], None]] = None
+    ):
+        """Register a handler for a channel (call before start())"""
+        self._handlers.setdefault(channel, []).append(handler)
+        if on_reconnect:
+            self._reconnect_hooks.append(on_reconnect)
+
+    @property
+    def connected(self) -> bool:
+        return self._connection is not None and not self._connection.is_closed()
+
+    async def start(self):
+        """Open the listener connection and LISTEN on every subscribed channel"""
+        self._running = True
+        await self._connect()
+
+    async def stop(self):
+        """Stop listening and close the connection"""
+        self._running = False
+        if self._reconnect_task:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+        if self._connection and not self._connection.is_closed():
+            await self._connection.close()
+        self._connection = None
+
+    async def _connect(self):
+        connection = await asyncpg.connect(
+            get_database_url(),
+            server_settings={'application_name': 'betterbliss_listener'}
+        )
+        for channel in self._handlers:
+            await connection.add_listener(channel, self._dispatch)
+        connection.add_termination_listener(self._on_terminated)
+        self._connection = connection
+        logger.info(f"Listening for notifications on: {', '.join(self._handlers) or 'no channels'}")
+
+    def _dispatch(self, connection, pid, channel, payload):
+        for handler in self._handlers.get(channel, []):
+            try:
+                handler(payload)
+            except Exception as e:
+                logger.error(f"Notification handler for {channel} failed: {e}")
+
+    def _on_terminated(self, connection):
+        self._connection = None
+        if self._running and not self._reconnect_task:
+            logger.warning("Notification listener connection lost, reconnecting")
+            self._reconnect_task = asyncio.get_running_loop().create_task(self._reconnect())
+
+    async def _reconnect(self):
+        delay = self._reconnect_delay
+        try:
+            while self._running:
+                try:
+                    await self._connect()
+                    break
+                except Exception as e:
+                    logger.warning(f"Notification listener reconnect failed: {e}")
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, self._max_reconnect_delay)
+
+            # Anything published while we were disconnected was missed
+            for hook in self._reconnect_hooks:
+                hook()
+        finally:
+            self._reconnect_task = None
+
+async def notify(connection, channel: str, payload: str):
+    """Publish a notification (delivered when the surrounding transaction commits)"""
+    await connection.execute("SELECT pg_notify($1, $2)", channel, payload)
+
+notification_listener = NotificationListener()
@@ -0,0 +1,204 @@
+# app/database/query_log.py
+import asyncio
+import functools
+import hashlib
+import random
+import re
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Tuple
+from app.config import settings
+from app.utils.metrics import Histogram
+import logging
+
+logger = logging.getLogger(__name__)
+
+EXPLAIN_PREFIX = "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) "
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![$\w])\d+(?:\.\d+)?\b")
+_VALUE_LIST = re.compile(r"\(\s*(?:\?|\$\d+)(?:\s*,\s*(?:\?|\$\d+))+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+@functools.lru_cache(maxsize=2048)
+def fingerprint(query: str) -> Tuple[str, str]:
+    """(id, normalized text) for a query: literals, value lists and layout don't matter"""
+    normalized = _STRING_LITERAL.sub("?", query)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _WHITESPACE.sub(" ", normalized).strip().lower()
+    normalized = _VALUE_LIST.sub("(?...)", normalized)
+    return hashlib.sha1(normalized.encode()).hexdigest()[:16], normalized
+
+def is_read_only(normalized: str) -> bool:
+    """Safe to re-run under EXPLAIN ANALYZE: a query replica routing would also send to a replica"""
+    # Imported here: statements imports connection, which imports this module
+    from app.database.statements import is_write
+    return normalized.startswith(("select", "with")) and not is_write(normalized)
+
+class QueryStats:
+    """Latency of one statement fingerprint in this worker"""
+
+    __slots__ = ("fingerprint", "query", "latency_ms", "errors", "slow", "last_explained")
+
+    def __init__(self, fingerprint_id: str, query: str):
+        self.fingerprint = fingerprint_id
+        self.query = query
+        self.latency_ms = Histogram()
+        self.errors = 0
+        self.slow = 0
+        self.last_explained = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        histogram = self.latency_ms
+        return {
+            "fingerprint": self.fingerprint,
+            "query": self.query[:500],
+            "calls": histogram.count,
+            "errors": self.errors,
+            "slow": self.slow,
+            "total_ms": round(histogram.total, 3),
+            "latency_ms": histogram.stats()
+        }
+
+class QueryLog:
+    """Per-fingerprint latency histograms, a slow-query log and sampled plans.
+
+    Installed as an asyncpg query logger on every pool connection, so it sees
+    each execute/fetch* call whatever code path made it. asyncpg invokes it
+    after the query with the measured time, off the query's own await.
+    Slow read-only statements can be re-run under EXPLAIN (ANALYZE, BUFFERS)
+    on an idle primary connection, at most once per fingerprint per
+    db_explain_min_interval_seconds.
+    """
+
+    def __init__(self):
+        self._stats: Dict[str, QueryStats] = {}
+        self._slow: Deque[Dict[str, Any]] = deque(maxlen=settings.db_slow_query_log_size)
+        self._plans: Dict[str, Dict[str, Any]] = {}
+        self._explaining: set = set()
+        self.dropped = 0  # Queries not tracked because max fingerprints was reached
+
+    def record(self, logged):
+        """asyncpg query logger callback (a LoggedQuery record)"""
+        if logged.query.startswith(EXPLAIN_PREFIX):
+            return
+
+        fingerprint_id, normalized = fingerprint(logged.query)
+        stats = self._stats.get(fingerprint_id)
+        if stats is None:
+            if len(self._stats) >= settings.db_query_log_max_fingerprints:
+                self.dropped += 1
+                return
+            stats = self._stats[fingerprint_id] = QueryStats(fingerprint_id, normalized)
+
+        duration_ms = logged.elapsed * 1000
+        stats.latency_ms.observe(duration_ms)
+        if logged.exception is not None:
+            stats.errors += 1
+
+        if duration_ms >= settings.db_slow_query_ms:
+            self._record_slow(stats, logged, duration_ms)
+
+    def _record_slow(self, stats: QueryStats, logged, duration_ms: float):
+        stats.slow += 1
+        entry = {
+            "at": time.time(),
+            "fingerprint": stats.fingerprint,
+            "query": stats.query[:500],
+            "duration_ms": round(duration_ms, 2),
+            "params": len(logged.args or ()),
+            "error": type(logged.exception).__name__ if logged.exception else None
+        }
+        self._slow.append(entry)
+        logger.warning(
+            f"Slow query {stats.fingerprint} {duration_ms:.1f}ms: {stats.query[:200]}",
+            extra={
+                "query_fingerprint": stats.fingerprint,
+                "duration_ms": entry["duration_ms"],
+                "query": entry["query"],
+                "query_error": entry["error"]
+            }
+        )
+
+        if (
+            settings.db_explain_sample_rate
+            and logged.exception is None
+            and is_read_only(stats.query)
+            and time.monotonic() - stats.last_explained >= settings.db_explain_min_interval_seconds
+            and stats.fingerprint not in self._explaining
+            and random.random() < settings.db_explain_sample_rate
+        ):
+            stats.last_explained = time.monotonic()
+            self._explaining.add(stats.fingerprint)
+            asyncio.get_running_loop().create_task(self._explain(stats, logged.query, logged.args))
+
+    async def _explain(self, stats: QueryStats, query: str, args):
+        # Imported here: connection installs this module's logger in its init hook
+        from app.database.connection import DatabaseConnection
+        try:
+            pool = DatabaseConnection._pool
+            # Never queue behind requests for a diagnostic
+            if pool is None or pool.get_idle_size() == 0:
+                return
+            async with pool.acquire(timeout=1) as connection:
+                # ANALYZE runs the statement; the transaction keeps it side-effect free
+                async with connection.transaction(readonly=True):
+                    plan = await connection.fetchval(EXPLAIN_PREFIX + query, *(args or ()))
+            plan = plan[0] if isinstance(plan, list) else plan
+            self._plans[stats.fingerprint] = {
+                "at": time.time(),
+                "fingerprint": stats.fingerprint,
+                "query": stats.query[:500],
+                "execution_ms": plan.get("Execution Time"),
+                "planning_ms": plan.get("Planning Time"),
+                "plan": plan.get("Plan")
+            }
+            logger.info(
+                f"Captured plan for slow query {stats.fingerprint}: "
+                f"{plan.get('Execution Time')} ms, top node {plan.get('Plan', {}).get('Node Type')}",
+                extra={
+                    "query_fingerprint": stats.fingerprint,
+                    "execution_ms": plan.get("Execution Time"),
+                    "plan_node": plan.get("Plan", {}).get("Node Type")
+                }
+            )
+        except Exception as e:
+            logger.warning(f"EXPLAIN for slow query {stats.fingerprint} failed: {e}")
+        finally:
+            self._explaining.discard(stats.fingerprint)
+
+    def top(self, limit: int = 20, order_by: str = "total") -> List[Dict[str, Any]]:
+        """Fingerprints ordered by total time, p95, calls or slow count"""
+        keys = {
+            "total": lambda s: s.latency_ms.total,
+            "p95": lambda s: s.latency_ms.percentile(0.95),
+            "calls": lambda s: s.latency_ms.count,
+            "slow": lambda s: s.slow
+        }
+        ordered = sorted(self._stats.values(), key=keys[order_by], reverse=True)
+        return [stats.stats() for stats in ordered[:limit]]
+
+    def slow_queries(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recent slow queries first"""
+        return list(reversed(self._slow))[:limit]
+
+    def plans(self) -> List[Dict[str, Any]]:
+        return sorted(self._plans.values(), key=lambda plan: plan["at"], reverse=True)
+
+    def reset(self):
+        self._stats.clear()
+        self._slow.clear()
+        self._plans.clear()
+        self.dropped = 0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "fingerprints": len(self._stats),
+            "dropped": self.dropped,
+            "slow_logged": len(self._slow),
+            "plans": len(self._plans),
+            "slow_query_ms": settings.db_slow_query_ms
+        }
+
+# Global query log, installed on every pool connection
+query_log = QueryLog()
@@ -0,0 +1,198 @@
+# app/database/replicas.py
+import asyncio
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+import asyncpg
+from app.config import settings
+from app.database.connection import (
+    create_app_pool, pool_max_size, get_db_connection, release_db_connection, reads_stick_to_primary
+)
+from app.utils.timing import span
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Lag is 0 when not in recovery (a plain second server) or when replay has
+# caught up with everything received, so an idle primary doesn't look like lag
+REPLICA_HEALTH_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END AS lag_seconds
+"""
+
+class Replica:
+    """One read replica: its pool and last known health"""
+
+    def __init__(self, url: str):
+        self.url = url
+        parts = urlsplit(url)
+        self.name = f"{parts.hostname}:{parts.port or 5432}"
+        self.pool: Optional[asyncpg.Pool] = None
+        self.healthy = False
+        self.lag_seconds: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.acquired = 0
+
+    def mark_down(self, error: Exception):
+        if self.healthy:
+            logger.warning(f"Replica {self.name} taken out of rotation: {error}")
+        self.healthy = False
+        self.last_error = str(error)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "healthy": self.healthy,
+            "lag_seconds": self.lag_seconds,
+            "last_error": self.last_error,
+            "acquired": self.acquired,
+            "pool_size": self.pool.get_size() if self.pool else 0
+        }
+
+class ReplicaSet:
+    """Routes read-only queries to healthy replicas, falling back to the primary.
+
+    A background task checks every replica (reachable, lag within
+    db_replica_max_lag_seconds) and takes failing ones out of rotation until
+    they recover. Reads go to the primary when no replica is healthy, when a
+    replica is saturated, and for the rest of a request once it has written.
+    """
+
+    def __init__(self, urls: Optional[List[str]] = None):
+        if urls is None:
+            urls = [url.strip() for url in (settings.database_replica_urls or "").split(",") if url.strip()]
+        self.replicas = [Replica(url) for url in urls]
+        self._next = 0
+        self._checked_out: Dict[int, Replica] = {}
+        self._health_task: Optional[asyncio.Task] = None
+        self.routed = 0
+        self.fallbacks = 0
+        self.sticky_reads = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replicas)
+
+    async def start(self):
+        """Connect and check every replica, then keep checking in the background"""
+        if not self.enabled or self._health_task:
+            return
+        await self.check_all()
+        self._health_task = asyncio.get_running_loop().create_task(self._health_loop())
+        healthy = sum(replica.healthy for replica in self.replicas)
+        logger.info(f"Read replicas: {healthy}/{len(self.replicas)} healthy")
+
+    async def stop(self):
+        if self._health_task:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+        for replica in self.replicas:
+            if replica.pool:
+                await replica.pool.close()
+                replica.pool = None
+            replica.healthy = False
+
+    async def check_all(self):
+        await asyncio.gather(*(self.check(replica) for replica in self.replicas))
+
+    async def check(self, replica: Replica):
+        timeout = settings.db_replica_health_check_seconds
+        try:
+            if replica.pool is None:
+                max_size = settings.db_replica_pool_max_size or pool_max_size()
+                replica.pool = await asyncio.wait_for(
+                    create_app_pool(replica.url, max_size, label=f"replica {replica.name}", read_only=True),
+                    timeout
+                )
+            async with replica.pool.acquire(timeout=timeout) as connection:
+                lag = await connection.fetchval(REPLICA_HEALTH_SQL, timeout=timeout)
+        except Exception as e:
+            replica.mark_down(e)
+            return
+
+        replica.lag_seconds = float(lag) if lag is not None else None
+        if replica.lag_seconds is not None and replica.lag_seconds > settings.db_replica_max_lag_seconds:
+            replica.mark_down(ValueError(f"replication lag {replica.lag_seconds:.1f}s"))
+            return
+
+        if not replica.healthy:
+            logger.info(f"Replica {replica.name} in rotation (lag {replica.lag_seconds}s)")
+        replica.healthy = True
+        replica.last_error = None
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(settings.db_replica_health_check_seconds)
+            try:
+                await self.check_all()
+            except Exception as e:
+                logger.warning(f"Replica health check failed: {e}")
+
+    async def acquire(self):
+        """A connection from the next healthy replica, or None to use the primary"""
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[self._next % len(self.replicas)]
+            self._next += 1
+            if not replica.healthy or replica.pool is None:
+                continue
+            try:
+                with span("db.acquire_replica"):
+                    connection = await replica.pool.acquire(
+                        timeout=settings.db_replica_acquire_timeout_seconds
+                    )
+            except asyncio.TimeoutError:
+                # Saturated, not broken: this read goes elsewhere
+                continue
+            except Exception as e:
+                replica.mark_down(e)
+                continue
+            replica.acquired += 1
+            self._checked_out[id(connection)] = replica
+            return connection
+        return None
+
+    async def release(self, connection) -> bool:
+        """Return a replica connection to its pool; False if it isn't one"""
+        replica = self._checked_out.pop(id(connection), None)
+        if replica is None:
+            return False
+        await replica.pool.release(connection)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "routed": self.routed,
+            "fallbacks": self.fallbacks,
+            "sticky_reads": self.sticky_reads,
+            "replicas": {replica.name: replica.stats() for replica in self.replicas}
+        }
+
+# Global replica set (empty unless DATABASE_REPLICA_URLS is set)
+replica_set = ReplicaSet()
+
+async def get_read_connection():
+    """Connection for reads that may lag slightly: a healthy replica, else the primary"""
+    if not replica_set.enabled:
+        return await get_db_connection()
+
+    if reads_stick_to_primary():
+        replica_set.sticky_reads += 1
+        return await get_db_connection()
+
+    connection = await replica_set.acquire()
+    if connection is None:
+        replica_set.fallbacks += 1
+        return await get_db_connection()
+
+    replica_set.routed += 1
+    return connection
+
+async def release_read_connection(connection):
+    """Release a connection from get_read_connection, wherever it came from"""
+    if not await replica_set.release(connection):
+        await release_db_connection(connection)
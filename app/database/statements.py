@@ -0,0 +1,172 @@
+# app/database/statements.py
+import functools
+import re
+import time
+from typing import Any, Dict, List, Optional
+import asyncpg
+# Module import: connection imports this module for its init hook
+from app.database import connection as db_connection
+import logging
+
+logger = logging.getLogger(__name__)
+
+_WRITE_KEYWORDS = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE|TRUNCATE|CREATE|ALTER|DROP|GRANT|LOCK)\b", re.IGNORECASE)
+
+@functools.lru_cache(maxsize=2048)
+def is_write(query: str) -> bool:
+    """Whether query must run on the primary (SELECT ... FOR UPDATE counts too)"""
+    return bool(_WRITE_KEYWORDS.search(query))
+
+class Statement:
+    """A registered query and its call statistics in this worker"""
+
+    __slots__ = ("name", "query", "settings", "writes", "calls", "errors", "rows", "total_ms", "max_ms")
+
+    def __init__(self, name: str, query: str, settings: Optional[Dict[str, str]] = None):
+        self.name = name
+        self.query = query
+        # Server settings the statement runs under (SET LOCAL), e.g. plan_cache_mode
+        self.settings = dict(settings or {})
+        # Writes pin the rest of the request's reads to the primary
+        self.writes = is_write(query)
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, duration_ms: float, rows: int):
+        if self.writes:
+            db_connection.note_primary_write()
+        self.calls += 1
+        self.rows += rows
+        self.total_ms += duration_ms
+        if duration_ms > self.max_ms:
+            self.max_ms = duration_ms
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "rows": self.rows,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.calls, 3) if self.calls else None,
+            "max_ms": round(self.max_ms, 3)
+        }
+
+def _status_rows(status: str) -> int:
+    """Row count from a command tag such as 'UPDATE 3' or 'INSERT 0 1'"""
+    count = status.rsplit(" ", 1)[-1] if status else ""
+    return int(count) if count.isdigit() else 0
+
+class StatementRegistry:
+    """Named, parameterised statements, prepared once per pool connection.
+
+    Modules register their SQL at import time and run it by name. The pool's
+    init hook prepares every registered statement into the connection's
+    statement cache, so requests only ever bind and execute. Connections
+    that weren't warmed (statement cache off, a plain asyncpg.connect) run
+    the same SQL and prepare it on first use, or on every use without a cache.
+    """
+
+    def __init__(self):
+        self._statements: Dict[str, Statement] = {}
+
+    def register(self, name: str, query: str, settings: Optional[Dict[str, str]] = None) -> str:
+        """Register query under name; returns the name.
+
+        Modules that share a statement may each register it: re-registering
+        the same SQL (whitespace aside) is a no-op, different SQL is an error.
+        settings are applied with SET LOCAL in a transaction around each run,
+        so they never leak to the next user of the pooled connection.
+        """
+        existing = self._statements.get(name)
+        if existing is None:
+            self._statements[name] = Statement(name, query, settings)
+        elif existing.query.split() != query.split() or existing.settings != dict(settings or {}):
+            raise ValueError(f"Statement {name} is already registered with different SQL")
+        return name
+
+    def __len__(self) -> int:
+        return len(self._statements)
+
+    def query(self, name: str) -> str:
+        return self._statements[name].query
+
+    async def prepare_all(self, connection) -> int:
+        """Prepare every registered statement on a new connection; returns how many succeeded"""
+        prepared = 0
+        for statement in list(self._statements.values()):
+            try:
+                await connection.prepare_cached(statement.query)
+                prepared += 1
+            except asyncpg.PostgresError as e:
+                # e.g. a table not created yet - the statement fails when used, not the pool
+                logger.warning(f"Could not prepare statement {statement.name}: {e}")
+        return prepared
+
+    async def _run(self, connection, statement: Statement, method: str, *args) -> Any:
+        if not statement.settings:
+            return await getattr(connection, method)(statement.query, *args)
+        async with connection.transaction():
+            await connection.execute("; ".join(
+                f"SET LOCAL {setting} = '{value}'" for setting, value in statement.settings.items()
+            ))
+            return await getattr(connection, method)(statement.query, *args)
+
+    async def fetch(self, connection, name: str, *args) -> List[asyncpg.Record]:
+        statement = self._statements[name]
+        started = time.perf_counter()
+        try:
+            rows = await self._run(connection, statement, "fetch", *args)
+        except Exception:
+            statement.errors += 1
+            raise
+        statement.record((time.perf_counter() - started) * 1000, len(rows))
+        return rows
+
+    async def fetchrow(self, connection, name: str, *args) -> Optional[asyncpg.Record]:
+        statement = self._statements[name]
+        started = time.perf_counter()
+        try:
+            row = await self._run(connection, statement, "fetchrow", *args)
+        except Exception:
+            statement.errors += 1
+            raise
+        statement.record((time.perf_counter() - started) * 1000, 0 if row is None else 1)
+        return row
+
+    async def fetchval(self, connection, name: str, *args) -> Any:
+        statement = self._statements[name]
+        started = time.perf_counter()
+        try:
+            value = await self._run(connection, statement, "fetchval", *args)
+        except Exception:
+            statement.errors += 1
+            raise
+        statement.record((time.perf_counter() - started) * 1000, 0 if value is None else 1)
+        return value
+
+    async def execute(self, connection, name: str, *args) -> str:
+        """Run a statement for its effect; returns the command tag"""
+        statement = self._statements[name]
+        started = time.perf_counter()
+        try:
+            status = await self._run(connection, statement, "execute", *args)
+        except Exception:
+            statement.errors += 1
+            raise
+        statement.record((time.perf_counter() - started) * 1000, _status_rows(status))
+        return status
+
+    def reset_stats(self):
+        for name, statement in self._statements.items():
+            self._statements[name] = Statement(name, statement.query, statement.settings)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-statement counters, busiest (by total time) first"""
+        ordered = sorted(self._statements.values(), key=lambda s: s.total_ms, reverse=True)
+        return {statement.name: statement.stats() for statement in ordered}
+
+# Global registry; every module registers into this one
+statement_registry = StatementRegistry()
@@ -4,14 +4,88 @@ from typing import Optional, Dict, Any
 from datetime import datetime
 import uuid
 from app.auth.models import UserRole, SubscriptionTier
+# Module import (not the function) so app.database and profile_cache can import each other
+from app.auth import profile_cache
+from app.database.statements import statement_registry
+from app.utils.timing import timed
 import logging
 
 logger = logging.getLogger(__name__)
 
+USER_COLUMNS = """id, cognito_sub, email, display_name, avatar_url,
+                  subscription_tier, role, status, created_at, updated_at"""
+
+statement_registry.register('users.create', """
+    INSERT INTO users (id, cognito_sub, email, display_name, role, subscription_tier)
+    VALUES ($1, $2, $3, $4, $5, $6)
+    RETURNING id, cognito_sub, email, display_name, role, subscription_tier, 
+             status, created_at, updated_at
+""")
+
+statement_registry.register('users.upsert_on_login', f"""
+    INSERT INTO users (id, cognito_sub, email, display_name, role, subscription_tier)
+    VALUES ($1, $2, $3, $4, $5, $6)
+    ON CONFLICT (cognito_sub) DO UPDATE SET updated_at = CURRENT_TIMESTAMP
+    RETURNING {USER_COLUMNS}, (xmax = 0) AS inserted
+""")
+
+statement_registry.register('users.by_cognito_sub', f"""
+    SELECT {USER_COLUMNS}
+    FROM users 
+    WHERE cognito_sub = $1
+""")
+
+statement_registry.register('users.by_email', f"""
+    SELECT {USER_COLUMNS}
+    FROM users 
+    WHERE email = $1
+""")
+
+statement_registry.register('users.touch_login', """
+    UPDATE users 
+    SET updated_at = CURRENT_TIMESTAMP 
+    WHERE cognito_sub = $1
+""")
+
+# update_user_profile changes any non-empty subset of these columns; each
+# subset gets its own fixed statement instead of SQL assembled per call
+PROFILE_FIELDS = ('display_name', 'avatar_url')
+
+def _profile_update_name(fields) -> str:
+    return 'users.update_profile.' + '+'.join(fields)
+
+def _register_profile_updates():
+    for mask in range(1, 2 ** len(PROFILE_FIELDS)):
+        fields = [field for bit, field in enumerate(PROFILE_FIELDS) if mask & (1 << bit)]
+        assignments = ', '.join(f"{field} = ${index}" for index, field in enumerate(fields, start=1))
+        statement_registry.register(_profile_update_name(fields), f"""
+            UPDATE users 
+            SET {assignments}, updated_at = CURRENT_TIMESTAMP
+            WHERE cognito_sub = ${len(fields) + 1}
+            RETURNING {USER_COLUMNS}
+        """)
+
+_register_profile_updates()
+
+statement_registry.register('users.update_subscription', f"""
+    UPDATE users 
+    SET subscription_tier = $1, updated_at = CURRENT_TIMESTAMP
+    WHERE cognito_sub = $2
+    RETURNING {USER_COLUMNS}
+""")
+
+statement_registry.register('users.update_subscription_and_role', f"""
+    UPDATE users 
+    SET subscription_tier = $1, role = $2, updated_at = CURRENT_TIMESTAMP
+    WHERE cognito_sub = $3
+    RETURNING {USER_COLUMNS}
+""")
+
 class UserRepository:
     def __init__(self, connection: asyncpg.Connection):
         self.conn = connection
     
+    @timed("db.create_user")
     async def create_user(
         self,
         cognito_sub: str,
@@ -24,15 +98,9 @@ class UserRepository:
         try:
             user_id = str(uuid.uuid4())
             
-            query = """
-                INSERT INTO users (id, cognito_sub, email, display_name, role, subscription_tier)
-                VALUES ($1, $2, $3, $4, $5, $6)
-                RETURNING id, cognito_sub, email, display_name, role, subscription_tier, 
-                         status, created_at, updated_at
-            """
-            
-            result = await self.conn.fetchrow(
-                query, user_id, cognito_sub, email, display_name, role, subscription_tier
+            result = await statement_registry.fetchrow(
+                self.conn, 'users.create',
+                user_id, cognito_sub, email, display_name, role, subscription_tier
             )
             
             logger.info(f"Created user in database: {email} (cognito_sub: {cognito_sub})")
@@ -46,56 +114,64 @@ class UserRepository:
             logger.error(f"Failed to create user {email}: {e}")
             raise
     
+    @timed("db.upsert_on_login")
+    async def upsert_on_login(
+        self,
+        cognito_sub: str,
+        email: str,
+        display_name: str,
+        role: str = UserRole.FREE_USER,
+        subscription_tier: str = SubscriptionTier.FREE
+    ) -> Dict[str, Any]:
+        """Create the user or record the login, in a single round trip"""
+        try:
+            result = dict(await statement_registry.fetchrow(
+                self.conn, 'users.upsert_on_login',
+                str(uuid.uuid4()), cognito_sub, email, display_name, role, subscription_tier
+            ))
+            
+            if result.pop('inserted'):
+                logger.info(f"Created user in database on login: {email} (cognito_sub: {cognito_sub})")
+            return result
+            
+        except Exception as e:
+            logger.error(f"Failed to upsert user {email} on login: {e}")
+            raise
+    
+    @timed("db.get_user_by_cognito_sub")
     async def get_user_by_cognito_sub(self, cognito_sub: str) -> Optional[Dict[str, Any]]:
         """Get user by Cognito sub ID"""
         try:
-            query = """
-                SELECT id, cognito_sub, email, display_name, avatar_url, 
-                       subscription_tier, role, status, created_at, updated_at
-                FROM users 
-                WHERE cognito_sub = $1
-            """
-            
-            result = await self.conn.fetchrow(query, cognito_sub)
+            result = await statement_registry.fetchrow(self.conn, 'users.by_cognito_sub', cognito_sub)
             return dict(result) if result else None
             
         except Exception as e:
             logger.error(f"Failed to get user by cognito_sub {cognito_sub}: {e}")
             raise
     
+    @timed("db.get_user_by_email")
     async def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
         """Get user by email"""
         try:
-            query = """
-                SELECT id, cognito_sub, email, display_name, avatar_url, 
-                       subscription_tier, role, status, created_at, updated_at
-                FROM users 
-                WHERE email = $1
-            """
-            
-            result = await self.conn.fetchrow(query, email)
+            result = await statement_registry.fetchrow(self.conn, 'users.by_email', email)
             return dict(result) if result else None
             
         except Exception as e:
             logger.error(f"Failed to get user by email {email}: {e}")
             raise
     
+    @timed("db.update_user_last_login")
     async def update_user_last_login(self, cognito_sub: str):
         """Update user's last login timestamp"""
         try:
-            query = """
-                UPDATE users 
-                SET updated_at = CURRENT_TIMESTAMP 
-                WHERE cognito_sub = $1
-            """
-            
-            await self.conn.execute(query, cognito_sub)
+            await statement_registry.execute(self.conn, 'users.touch_login', cognito_sub)
             logger.info(f"Updated last login for user: {cognito_sub}")
             
         except Exception as e:
             logger.error(f"Failed to update last login for {cognito_sub}: {e}")
             raise
     
+    @timed("db.update_user_profile")
     async def update_user_profile(
         self, 
         cognito_sub: str, 
@@ -104,42 +180,25 @@ class UserRepository:
     ) -> Dict[str, Any]:
         """Update user profile information"""
         try:
-            updates = []
-            params = []
-            param_count = 1
-            
-            if display_name is not None:
-                updates.append(f"display_name = ${param_count}")
-                params.append(display_name)
-                param_count += 1
+            values = {'display_name': display_name, 'avatar_url': avatar_url}
+            fields = [field for field in PROFILE_FIELDS if values[field] is not None]
             
-            if avatar_url is not None:
-                updates.append(f"avatar_url = ${param_count}")
-                params.append(avatar_url)
-                param_count += 1
-            
-            if not updates:
+            if not fields:
                 # Nothing to update
                 return await self.get_user_by_cognito_sub(cognito_sub)
             
-            updates.append(f"updated_at = CURRENT_TIMESTAMP")
-            params.append(cognito_sub)
-            
-            query = f"""
-                UPDATE users 
-                SET {', '.join(updates)}
-                WHERE cognito_sub = ${param_count}
-                RETURNING id, cognito_sub, email, display_name, avatar_url, 
-                         subscription_tier, role, status, created_at, updated_at
-            """
-            
-            result = await self.conn.fetchrow(query, *params)
+            result = await statement_registry.fetchrow(
+                self.conn, _profile_update_name(fields),
+                *[values[field] for field in fields], cognito_sub
+            )
+            await profile_cache.publish_user_changed(self.conn, cognito_sub)
             return dict(result) if result else None
             
         except Exception as e:
             logger.error(f"Failed to update user profile for {cognito_sub}: {e}")
             raise
     
+    @timed("db.update_user_subscription")
     async def update_user_subscription(
         self, 
         cognito_sub: str, 
@@ -149,24 +208,16 @@ class UserRepository:
         """Update user subscription and role"""
         try:
             if role:
-                query = """
-                    UPDATE users 
-                    SET subscription_tier = $1, role = $2, updated_at = CURRENT_TIMESTAMP
-                    WHERE cognito_sub = $3
-                    RETURNING id, cognito_sub, email, display_name, avatar_url, 
-                             subscription_tier, role, status, created_at, updated_at
-                """
-                result = await self.conn.fetchrow(query, subscription_tier, role, cognito_sub)
+                result = await statement_registry.fetchrow(
+                    self.conn, 'users.update_subscription_and_role', subscription_tier, role, cognito_sub
+                )
             else:
-                query = """
-                    UPDATE users 
-                    SET subscription_tier = $1, updated_at = CURRENT_TIMESTAMP
-                    WHERE cognito_sub = $2
-                    RETURNING id, cognito_sub, email, display_name, avatar_url, 
-                             subscription_tier, role, status, created_at, updated_at
-                """
-                result = await self.conn.fetchrow(query, subscription_tier, cognito_sub)
+                result = await statement_registry.fetchrow(
+                    self.conn, 'users.update_subscription', subscription_tier, cognito_sub
+                )
             
+            # Tier changes must reach every worker's profile cache promptly
+            await profile_cache.publish_user_changed(self.conn, cognito_sub)
             return dict(result) if result else None
             
         except Exception as e:
@@ -4,7 +4,15 @@ from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 from app.config import settings
 from app.middleware.cors import setup_cors
+from app.middleware.timing import setup_timing
+from app.middleware.request_connection import setup_request_connection
 from app.database.connection import DatabaseConnection
+from app.database.notifications import notification_listener
+from app.database.replicas import replica_set
+from app.auth.cognito import async_cognito_client
+from app.utils.http_client import HTTPClient
+from app.services.catalog_snapshot import catalog_snapshot
+from app.auth.revocation import load_revocations
 
 
 import logging
@@ -18,9 +26,16 @@ async def lifespan(app: FastAPI):
     """Application lifespan events"""
     # Startup
     logger.info("Starting Better & Bliss API...")
+    HTTPClient.get_client()
+    
     try:
+        # Opens and initializes min_size connections before traffic arrives
         await DatabaseConnection.get_pool()
         logger.info("Database connection pool initialized")
+        await replica_set.start()
+        await notification_listener.start()
+        await catalog_snapshot.start()
+        await load_revocations()
     except Exception as e:
         if settings.environment == "development":
             logger.warning(f"Database connection failed (development mode): {e}")
@@ -33,10 +48,16 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Shutting down Better & Bliss API...")
     try:
+        await catalog_snapshot.stop()
+        await notification_listener.stop()
+        await replica_set.stop()
         await DatabaseConnection.close_pool()
         logger.info("Database connections closed")
     except Exception as e:
         logger.warning(f"Error closing database connections: {e}")
+    
+    await HTTPClient.close_client()
+    async_cognito_client.shutdown()
 
 app = FastAPI(
     title="Better & Bliss API",
@@ -48,6 +69,13 @@ app = FastAPI(
 # Setup CORS
 setup_cors(app)
 
+# One pooled connection per request (DB_REQUEST_SCOPED_CONNECTION)
+setup_request_connection(app)
+
+# Per-request Server-Timing breakdown (REQUEST_TIMING_ENABLED); added last so it
+# wraps the other middleware
+setup_timing(app)
+
 # CRITICAL: Use ONLY the enhanced auth router
 from app.auth.enhanced_routes import router as auth_router
 app.include_router(auth_router)
@@ -63,6 +91,9 @@ app.include_router(streaming_router)
 from app.routes.newsletter import router as newsletter_router
 app.include_router(newsletter_router)
 
+from app.routes.admin import router as admin_router
+app.include_router(admin_router)
+
 @app.get("/")
 async def root():
     return {"message": "Better & Bliss API", "status": "healthy"}
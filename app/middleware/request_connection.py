@@ -0,0 +1,40 @@
+# app/middleware/request_connection.py
+from fastapi import FastAPI
+from app.config import settings
+from app.database.connection import start_request_connection, finish_request_connection
+
+class RequestConnectionMiddleware:
+    """Gives each HTTP request one lazily acquired database connection.
+
+    The connection is released as soon as the final response body is sent, so
+    background tasks and slow clients don't hold it; anything that needs the
+    database after that acquires from the pool as usual.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_scope, token = start_request_connection()
+        if request_scope is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_and_release(message):
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                await request_scope.close()
+
+        try:
+            await self.app(scope, receive, send_and_release)
+        finally:
+            await finish_request_connection(request_scope, token)
+
+def setup_request_connection(app: FastAPI):
+    """Install request scopes: shared connections and/or replica stickiness (none when both are off)"""
+    if settings.db_request_scoped_connection or settings.database_replica_urls:
+        app.add_middleware(RequestConnectionMiddleware)
@@ -0,0 +1,61 @@
+# app/middleware/timing.py
+import logging
+from fastapi import FastAPI
+from starlette.datastructures import MutableHeaders
+from app.config import settings
+from app.utils.timing import start_request_timings, stop_request_timings
+
+logger = logging.getLogger(__name__)
+
+class ServerTimingMiddleware:
+    """Times sampled requests and reports their spans.
+
+    Spans recorded with app.utils.timing.span/timed during the request are sent
+    back in a Server-Timing header and logged with structured fields.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings, token = start_request_timings()
+        if timings is None:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = None
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.request_timing_header:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", timings.server_timing(timings.elapsed_ms()))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            stop_request_timings(token)
+            total_ms = timings.elapsed_ms()
+            spans = {name: round(total["dur"], 2) for name, total in timings.totals().items()}
+            logger.info(
+                f"{scope['method']} {scope['path']} {status_code} {total_ms:.1f}ms {spans}",
+                extra={
+                    "http_method": scope["method"],
+                    "http_path": scope["path"],
+                    "http_status": status_code,
+                    "duration_ms": round(total_ms, 2),
+                    "spans": spans
+                }
+            )
+
+def setup_timing(app: FastAPI):
+    """Install request timing (no middleware at all when it is disabled)"""
+    if settings.request_timing_enabled:
+        app.add_middleware(ServerTimingMiddleware)
@@ -1,13 +1,31 @@
 # app/newsletter/service.py
 import uuid
 import time
-import json
 import logging
 from typing import Dict, Any, Optional
 from app.database.connection import get_db_connection, release_db_connection
+from app.database.statements import statement_registry
 
 logger = logging.getLogger(__name__)
 
+# Also run by the /api/newsletter routes, which import these names
+BY_EMAIL_STATEMENT = statement_registry.register('newsletter.by_email', """
+    SELECT id, status FROM newsletter_subscribers WHERE email = $1
+""")
+
+REACTIVATE_STATEMENT = statement_registry.register('newsletter.reactivate', """
+    UPDATE newsletter_subscribers 
+    SET status = 'active', updated_at = CURRENT_TIMESTAMP 
+    WHERE email = $1
+""")
+
+statement_registry.register('newsletter.insert_pending', """
+    INSERT INTO newsletter_subscribers (
+        id, email, name, source, status, metadata, 
+        client_ip, request_id, created_at
+    ) VALUES ($1, $2, $3, $4, 'pending', $5, $6, $7, CURRENT_TIMESTAMP)
+""")
+
 class NewsletterService:
     async def subscribe(
         self,
@@ -39,10 +57,7 @@ class NewsletterService:
             connection = await get_db_connection()
             
             # Check if already subscribed
-            existing = await connection.fetchrow(
-                "SELECT id, status FROM newsletter_subscribers WHERE email = $1",
-                email
-            )
+            existing = await statement_registry.fetchrow(connection, BY_EMAIL_STATEMENT, email)
             
             if existing:
                 if existing['status'] == 'active':
@@ -50,24 +65,17 @@ class NewsletterService:
                     return {"status": "already_subscribed"}
                 else:
                     # Reactivate subscription
-                    await connection.execute(
-                        "UPDATE newsletter_subscribers SET status = 'active', updated_at = CURRENT_TIMESTAMP WHERE email = $1",
-                        email
-                    )
+                    await statement_registry.execute(connection, REACTIVATE_STATEMENT, email)
                     logger.info(f"Reactivated subscription: {email}")
                     return {"status": "reactivated"}
             
             # Create new subscription
             subscription_id = str(uuid.uuid4())
             
-            await connection.execute("""
-                INSERT INTO newsletter_subscribers (
-                    id, email, name, source, status, metadata, 
-                    client_ip, request_id, created_at
-                ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, CURRENT_TIMESTAMP)
-            """, 
-                subscription_id, email, name, source, 'pending',
-                json.dumps(metadata) if metadata else None,
+            await statement_registry.execute(
+                connection, 'newsletter.insert_pending',
+                subscription_id, email, name, source,
+                metadata or None,  # jsonb codec on pool connections encodes it
                 client_ip, request_id
             )
             
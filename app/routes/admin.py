@@ -0,0 +1,104 @@
+# app/routes/admin.py - Operational endpoints, admin role required
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import Dict, Any
+from app.auth.enhanced_dependencies import get_current_user_with_db, auth_singleflight
+from app.auth.identity_cache import identity_cache
+from app.auth.models import UserRole
+from app.auth.profile_cache import user_profile_cache
+from app.auth.revocation import revocation_stats
+from app.auth.sessions import session_store
+from app.database.connection import DatabaseConnection
+from app.database.notifications import notification_listener
+from app.database.query_log import query_log
+from app.database.replicas import replica_set
+from app.database.statements import statement_registry
+from app.services.catalog_cache import catalog_cache
+from app.services.catalog_snapshot import catalog_snapshot
+from app.services.content_service import suggestion_cache
+from app.utils.conditional import conditional_responses
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+async def require_admin(
+    user_data: Dict[str, Any] = Depends(get_current_user_with_db)
+) -> Dict[str, Any]:
+    """Authenticated user with the admin role"""
+    if user_data["user"].role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return user_data
+
+@router.get("/stats")
+async def get_stats(user_data: Dict[str, Any] = Depends(require_admin)):
+    """Pool, cache, session and revocation counters for this worker (kept off the public /health)"""
+    return {
+        "database_pool": DatabaseConnection.stats(),
+        "read_replicas": replica_set.stats() if replica_set.enabled else None,
+        "statements": statement_registry.stats(),
+        "query_log": query_log.summary(),
+        "identity_cache": identity_cache.stats(),
+        "user_profile_cache": user_profile_cache.stats(),
+        "catalog_cache": catalog_cache.stats(),
+        "catalog_snapshot": catalog_snapshot.stats(),
+        "content_suggest_cache": suggestion_cache.stats(),
+        "conditional_get": conditional_responses.stats(),
+        "auth_singleflight": auth_singleflight.stats(),
+        "sessions": session_store.stats(),
+        "revoked_tokens": revocation_stats(),
+        "notifications_connected": notification_listener.connected
+    }
+
+@router.get("/db/queries")
+async def get_query_stats(
+    limit: int = Query(20, ge=1, le=500),
+    order_by: str = Query("total", pattern="^(total|p95|calls|slow)$"),
+    user_data: Dict[str, Any] = Depends(require_admin)
+):
+    """Latency histograms per statement fingerprint, worst first (this worker only)"""
+    return {
+        "summary": query_log.summary(),
+        "queries": query_log.top(limit, order_by),
+        "statements": statement_registry.stats(),
+        "database_pool": DatabaseConnection.stats()
+    }
+
+@router.get("/db/slow-queries")
+async def get_slow_queries(
+    limit: int = Query(50, ge=1, le=500),
+    user_data: Dict[str, Any] = Depends(require_admin)
+):
+    """Most recent queries over db_slow_query_ms"""
+    return {"slow_queries": query_log.slow_queries(limit)}
+
+@router.get("/db/plans")
+async def get_query_plans(user_data: Dict[str, Any] = Depends(require_admin)):
+    """Sampled EXPLAIN (ANALYZE, BUFFERS) plans of slow statements"""
+    return {"plans": query_log.plans()}
+
+@router.post("/db/queries/reset")
+async def reset_query_stats(user_data: Dict[str, Any] = Depends(require_admin)):
+    """Start a fresh measurement window"""
+    query_log.reset()
+    statement_registry.reset_stats()
+    logger.info(f"Query statistics reset by {user_data['user'].email}")
+    return {"message": "Query statistics reset"}
+
+@router.get("/catalog/snapshot")
+async def get_catalog_snapshot(user_data: Dict[str, Any] = Depends(require_admin)):
+    """In-memory catalog snapshot: freshness, rebuilds and approximate memory use"""
+    snapshot = catalog_snapshot.current
+    return {
+        "stats": catalog_snapshot.stats(),
+        "memory": snapshot.memory_report() if snapshot else None
+    }
+
+@router.post("/catalog/snapshot/rebuild")
+async def rebuild_catalog_snapshot(user_data: Dict[str, Any] = Depends(require_admin)):
+    """Rebuild now instead of waiting for a notification or the periodic refresh"""
+    snapshot = await catalog_snapshot.load()
+    logger.info(f"Catalog snapshot rebuilt by {user_data['user'].email}")
+    return {"stats": catalog_snapshot.stats(), "loaded": snapshot is not None}
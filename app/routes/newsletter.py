@@ -5,11 +5,57 @@ import logging
 from datetime import datetime
 import uuid
 from app.database.connection import get_db_connection, release_db_connection
+from app.database.replicas import get_read_connection, release_read_connection
+from app.database.statements import statement_registry
+from app.newsletter.service import BY_EMAIL_STATEMENT, REACTIVATE_STATEMENT
 from app.services.email_service import email_service
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/newsletter", tags=["newsletter"])
 
+statement_registry.register('newsletter.insert_active', """
+    INSERT INTO newsletter_subscribers (
+        id, email, name, source, status, 
+        client_ip, created_at, updated_at
+    ) VALUES ($1, $2, $3, $4, 'active', $5, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+""")
+
+statement_registry.register('newsletter.count', """
+    SELECT COUNT(*) FROM newsletter_subscribers
+""")
+
+statement_registry.register('newsletter.count_active', """
+    SELECT COUNT(*) FROM newsletter_subscribers WHERE status = 'active'
+""")
+
+statement_registry.register('newsletter.recent', """
+    SELECT id, email, name, source, status, 
+           created_at, updated_at, client_ip
+    FROM newsletter_subscribers 
+    ORDER BY created_at DESC 
+    LIMIT 50
+""")
+
+statement_registry.register('newsletter.stats', """
+    SELECT 
+        COUNT(*) as total_subscribers,
+        COUNT(*) FILTER (WHERE status = 'active') as active_subscribers,
+        COUNT(*) FILTER (WHERE status = 'pending') as pending_subscribers,
+        COUNT(*) FILTER (WHERE created_at > NOW() - INTERVAL '7 days') as this_week,
+        COUNT(*) FILTER (WHERE created_at > NOW() - INTERVAL '30 days') as this_month,
+        COUNT(DISTINCT source) as unique_sources
+    FROM newsletter_subscribers
+""")
+
+statement_registry.register('newsletter.top_sources', """
+    SELECT source, COUNT(*) as count 
+    FROM newsletter_subscribers 
+    WHERE status = 'active'
+    GROUP BY source 
+    ORDER BY count DESC 
+    LIMIT 10
+""")
+
 class SubscribeRequest(BaseModel):
     email: EmailStr
     name: str = None
@@ -31,10 +77,7 @@ async def subscribe_newsletter(
         connection = await get_db_connection()
         
         # Check if already subscribed
-        existing = await connection.fetchrow(
-            "SELECT id, status FROM newsletter_subscribers WHERE email = $1",
-            request.email.lower()
-        )
+        existing = await statement_registry.fetchrow(connection, BY_EMAIL_STATEMENT, request.email.lower())
         
         if existing:
             if existing['status'] == 'active':
@@ -45,12 +88,7 @@ async def subscribe_newsletter(
                 )
             else:
                 # Reactivate subscription
-                await connection.execute(
-                    """UPDATE newsletter_subscribers 
-                       SET status = 'active', updated_at = CURRENT_TIMESTAMP 
-                       WHERE email = $1""",
-                    request.email.lower()
-                )
+                await statement_registry.execute(connection, REACTIVATE_STATEMENT, request.email.lower())
                 logger.info(f"Reactivated subscription: {request.email}")
                 
                 # Send welcome email for reactivated subscription
@@ -69,17 +107,13 @@ async def subscribe_newsletter(
         # Create new subscription
         subscription_id = str(uuid.uuid4())
         
-        await connection.execute("""
-            INSERT INTO newsletter_subscribers (
-                id, email, name, source, status, 
-                client_ip, created_at, updated_at
-            ) VALUES ($1, $2, $3, $4, $5, $6, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
-        """, 
+        await statement_registry.execute(
+            connection,
+            'newsletter.insert_active',
             subscription_id,
             request.email.lower(),
             request.name,
             request.source,
-            'active',
             req.client.host if req.client else None
         )
         
@@ -113,25 +147,15 @@ async def get_subscribers():
     """Admin endpoint to view newsletter subscribers"""
     connection = None
     try:
-        connection = await get_db_connection()
+        connection = await get_read_connection()
         
         # Get subscriber statistics
-        total_count = await connection.fetchval(
-            "SELECT COUNT(*) FROM newsletter_subscribers"
-        )
+        total_count = await statement_registry.fetchval(connection, 'newsletter.count')
         
-        active_count = await connection.fetchval(
-            "SELECT COUNT(*) FROM newsletter_subscribers WHERE status = 'active'"
-        )
+        active_count = await statement_registry.fetchval(connection, 'newsletter.count_active')
         
         # Get recent subscribers (last 50)
-        recent_subscribers = await connection.fetch("""
-            SELECT id, email, name, source, status, 
-                   created_at, updated_at, client_ip
-            FROM newsletter_subscribers 
-            ORDER BY created_at DESC 
-            LIMIT 50
-        """)
+        recent_subscribers = await statement_registry.fetch(connection, 'newsletter.recent')
         
         # Convert to dict format
         subscribers_list = []
@@ -162,40 +186,20 @@ async def get_subscribers():
         )
     finally:
         if connection:
-            await release_db_connection(connection)
+            await release_read_connection(connection)
 
 @router.get("/stats")
 async def get_newsletter_stats():
     """Get newsletter subscription statistics"""
     connection = None
     try:
-        connection = await get_db_connection()
+        connection = await get_read_connection()
         
         # Get comprehensive stats
-        stats_query = """
-            SELECT 
-                COUNT(*) as total_subscribers,
-                COUNT(*) FILTER (WHERE status = 'active') as active_subscribers,
-                COUNT(*) FILTER (WHERE status = 'pending') as pending_subscribers,
-                COUNT(*) FILTER (WHERE created_at > NOW() - INTERVAL '7 days') as this_week,
-                COUNT(*) FILTER (WHERE created_at > NOW() - INTERVAL '30 days') as this_month,
-                COUNT(DISTINCT source) as unique_sources
-            FROM newsletter_subscribers
-        """
-        
-        stats = await connection.fetchrow(stats_query)
+        stats = await statement_registry.fetchrow(connection, 'newsletter.stats')
         
         # Get top sources
-        sources_query = """
-            SELECT source, COUNT(*) as count 
-            FROM newsletter_subscribers 
-            WHERE status = 'active'
-            GROUP BY source 
-            ORDER BY count DESC 
-            LIMIT 10
-        """
-        
-        top_sources = await connection.fetch(sources_query)
+        top_sources = await statement_registry.fetch(connection, 'newsletter.top_sources')
         
         return {
             "total_subscribers": stats['total_subscribers'],
@@ -216,4 +220,4 @@ async def get_newsletter_stats():
         )
     finally:
         if connection:
-            await release_db_connection(connection)
\ No newline at end of file
+            await release_read_connection(connection)
\ No newline at end of file
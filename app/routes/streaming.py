@@ -2,7 +2,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Body
 from typing import Optional, Dict, Any
 from app.services.streaming_service import streaming_service
-from app.database.connection import get_db_connection, release_db_connection
+from app.database.connection import request_db_connection
+from app.database.statements import statement_registry
+from app.utils.timing import span
 import logging
 
 # CRITICAL: Use enhanced dependencies that REQUIRE authentication
@@ -22,7 +24,6 @@ async def get_video_stream(
     This endpoint now properly validates user authentication and subscription
     """
     
-    connection = None
     try:
         user = user_data["user"]  # Extract user from enhanced auth
         db_user = user_data["db_user"]
@@ -30,22 +31,9 @@ async def get_video_stream(
         # Log access attempt for security monitoring
         logger.info(f"Video access attempt by user {user.id} for content {content_slug}")
         
-        # Get content from database
-        connection = await get_db_connection()
-        
-        query = """
-            SELECT id, title, slug, description, access_tier, status,
-                   s3_key_video_720p, s3_key_video_1080p, 
-                   s3_key_thumbnail, s3_key_poster,
-                   video_duration_seconds, video_format, has_video,
-                   e.name as expert_name, c.name as category_name
-            FROM content co
-            LEFT JOIN experts e ON co.expert_id = e.id
-            LEFT JOIN categories c ON co.category_id = c.id
-            WHERE co.slug = $1 AND co.status = 'published'
-        """
-        
-        content = await connection.fetchrow(query, content_slug)
+        # Catalog snapshot lookup; the database only when no snapshot is loaded
+        with span("db.stream_content"):
+            content = await streaming_service.get_streaming_content(content_slug)
         
         if not content:
             logger.warning(f"User {user.id} attempted to access non-existent content: {content_slug}")
@@ -73,7 +61,8 @@ async def get_video_stream(
                 )
         
         # Get streaming URLs using the service
-        streaming_data = streaming_service.get_streaming_urls(content_data, user)
+        with span("stream.urls"):
+            streaming_data = streaming_service.get_streaming_urls(content_data, user)
         
         # Add additional content metadata
         streaming_data.update({
@@ -105,38 +94,30 @@ async def get_video_stream(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to get video stream"
         )
-    finally:
-        if connection:
-            await release_db_connection(connection)
 
 @router.post("/{content_slug}/video-event")
 async def log_video_event(
     content_slug: str,
     event_data: Dict[str, Any] = Body(...),
-    user_data: Dict[str, Any] = Depends(get_current_user_with_db)  # REQUIRED AUTH
+    user_data: Dict[str, Any] = Depends(get_current_user_with_db),  # REQUIRED AUTH
+    connection = Depends(request_db_connection)
 ):
     """
     SECURED: Log video analytics events - AUTHENTICATION REQUIRED
     """
     
-    connection = None
     try:
         user = user_data["user"]
         
         # Get content ID
-        connection = await get_db_connection()
+        content_id = await streaming_service.content_id_for_slug(connection, content_slug)
         
-        content_id_query = "SELECT id FROM content WHERE slug = $1 AND status = 'published'"
-        result = await connection.fetchrow(content_id_query, content_slug)
-        
-        if not result:
+        if not content_id:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Content not found"
             )
         
-        content_id = str(result['id'])
-        
         # Validate event data
         required_fields = ['event_type', 'session_id']
         if not all(field in event_data for field in required_fields):
@@ -154,16 +135,9 @@ async def log_video_event(
             )
         
         # Insert analytics event with authenticated user
-        analytics_query = """
-            INSERT INTO video_analytics (
-                content_id, user_id, session_id, event_type,
-                timestamp_seconds, watch_duration_seconds,
-                quality_level, device_type
-            ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
-        """
-        
-        await connection.execute(
-            analytics_query,
+        await statement_registry.execute(
+            connection,
+            'video_analytics.insert',
             content_id,
             str(user.id),  # Always authenticated user from DB
             event_data['session_id'],
@@ -185,7 +159,4 @@ async def log_video_event(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to log video event"
-        )
-    finally:
-        if connection:
-            await release_db_connection(connection)
\ No newline at end of file
+        )
\ No newline at end of file
@@ -0,0 +1,95 @@
+# app/services/catalog_cache.py
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+from app.config import settings
+from app.database.notifications import notification_listener
+from app.utils.cache import TTLCache
+from app.utils.singleflight import SingleFlight
+import logging
+
+logger = logging.getLogger(__name__)
+
+CATALOG_CHANGED_CHANNEL = "catalog_changed"
+
+# Tables whose writes fire catalog_changed (payload: the table name), migration 0008
+CATALOG_TABLES = ("categories", "experts", "hero_content")
+
+class CatalogCache:
+    """Version-stamped cache for listings built from rarely changing tables.
+
+    Each table has a version that a catalog_changed notification bumps. An
+    entry remembers the version its table had when the load started, so a
+    load that races with a write is never served as current. The TTL is a
+    safety net for notifications missed while the listener is down.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self._entries = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self._versions: Dict[str, int] = {table: 0 for table in CATALOG_TABLES}
+        self._loads = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0  # Entries found but superseded by a notification
+
+    def version(self, table: str) -> int:
+        return self._versions.get(table, 0)
+
+    async def get_or_load(self, key: Hashable, table: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Cached value for key, else loader() (one load per key at a time).
+
+        Exceptions from loader propagate and nothing is cached.
+        """
+        if settings.catalog_cache_enabled:
+            entry: Tuple[int, Any] = self._entries.get(key)
+            if entry is not None:
+                version, value = entry
+                if version == self.version(table):
+                    self.hits += 1
+                    return value
+                self.stale += 1
+                self._entries.invalidate(key)
+        self.misses += 1
+        # Taken now, not when the load task first runs: a write in between must win
+        version = self.version(table)
+        return await self._loads.do((key, version), self._load, key, version, loader)
+
+    async def _load(self, key: Hashable, version: int, loader: Callable[[], Awaitable[Any]]) -> Any:
+        value = await loader()
+        if settings.catalog_cache_enabled:
+            self._entries.set(key, (version, value))
+        return value
+
+    def invalidate_table(self, table: str):
+        """catalog_changed handler: entries loaded from table become stale"""
+        self._versions[table] = self.version(table) + 1
+        logger.debug(f"Catalog cache: {table} now at version {self._versions[table]}")
+
+    def invalidate_all(self):
+        """After a listener reconnect any notification may have been missed"""
+        for table in list(self._versions):
+            self.invalidate_table(table)
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "expirations": self._entries.expirations,
+            "versions": dict(self._versions),
+            "loads": self._loads.stats()
+        }
+
+# Categories, featured experts and hero content; shared by every request in this worker
+catalog_cache = CatalogCache(
+    max_entries=settings.catalog_cache_max_entries,
+    ttl_seconds=settings.catalog_cache_ttl_seconds
+)
+
+notification_listener.subscribe(
+    CATALOG_CHANGED_CHANNEL,
+    catalog_cache.invalidate_table,
+    on_reconnect=catalog_cache.invalidate_all
+)
@@ -0,0 +1,275 @@
+# app/services/catalog_snapshot.py
+import asyncio
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from app.config import settings
+from app.database.connection import get_db_connection, release_db_connection
+from app.database.notifications import notification_listener
+from app.database.statements import statement_registry
+from app.services.catalog_cache import CATALOG_CHANGED_CHANNEL
+import logging
+
+logger = logging.getLogger(__name__)
+
+# content columns served from the snapshot (content.detail selects the same)
+CONTENT_COLUMNS = (
+    "id", "title", "slug", "description", "content_type", "expert_id", "category_id",
+    "series_id", "episode_number", "video_url", "thumbnail_url", "duration_seconds",
+    "access_tier", "is_first_episode", "featured", "trending", "is_new", "status",
+    "view_count", "like_count", "created_at", "updated_at",
+    "s3_key_video_720p", "s3_key_video_1080p", "s3_key_thumbnail", "s3_key_poster",
+    "video_duration_seconds", "video_format", "has_video"
+)
+DETAIL_JOINED_COLUMNS = ("expert_name", "expert_title", "expert_bio", "category_name", "category_color")
+
+# Response shapes, matching the SQL each one replaces
+BROWSE_FIELDS = (
+    "id", "title", "slug", "description", "access_tier", "duration_seconds", "featured",
+    "content_type", "expert_name", "expert_title", "category_name", "category_color"
+)
+DETAIL_FIELDS = CONTENT_COLUMNS + DETAIL_JOINED_COLUMNS
+STREAMING_FIELDS = (
+    "id", "title", "slug", "description", "access_tier", "status",
+    "s3_key_video_720p", "s3_key_video_1080p", "s3_key_thumbnail", "s3_key_poster",
+    "video_duration_seconds", "video_format", "has_video", "expert_name", "category_name"
+)
+
+# Low-cardinality strings repeated on every row; one shared copy each
+_INTERNED = ("content_type", "access_tier", "status", "video_format",
+             "expert_name", "expert_title", "expert_bio", "category_name", "category_color", "category_slug")
+
+# Tables whose catalog_changed notifications outdate the snapshot
+SNAPSHOT_TABLES = ("content", "experts", "categories")
+
+statement_registry.register('content.catalog_snapshot', f"""
+    SELECT {', '.join('c.' + column for column in CONTENT_COLUMNS)},
+           e.name as expert_name, e.title as expert_title, e.bio as expert_bio,
+           cat.name as category_name, cat.color as category_color, cat.slug as category_slug
+    FROM content c
+    LEFT JOIN experts e ON c.expert_id = e.id
+    LEFT JOIN categories cat ON c.category_id = cat.id
+    WHERE c.status = 'published'
+    ORDER BY c.featured DESC, c.created_at DESC
+""")
+
+class CatalogEntry:
+    """One published content row with its expert and category names"""
+
+    __slots__ = CONTENT_COLUMNS + DETAIL_JOINED_COLUMNS + ("category_slug",)
+
+    def __init__(self, row):
+        for field in self.__slots__:
+            value = row[field]
+            if field in _INTERNED and isinstance(value, str):
+                value = sys.intern(value)
+            setattr(self, field, value)
+
+    def as_dict(self, fields: Iterable[str]) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in fields}
+
+def _sort_key(entry: CatalogEntry) -> Tuple[bool, bool, bool, datetime]:
+    """ORDER BY featured DESC, created_at DESC when sorted in reverse: NULLs first, as in Postgres"""
+    return (
+        entry.featured is None, bool(entry.featured),
+        entry.created_at is None, entry.created_at or datetime.min
+    )
+
+class CatalogSnapshot:
+    """Immutable view of the published catalog with lookup indexes.
+
+    Every list index is ordered like browse (featured, then newest first),
+    so a browse is a slice. Never modified after construction: a rebuild
+    makes a new snapshot and swaps the reference.
+    """
+
+    def __init__(self, rows, version: int):
+        self.version = version
+        self.loaded_at = time.time()
+        self.entries: Tuple[CatalogEntry, ...] = tuple(
+            sorted((CatalogEntry(row) for row in rows), key=_sort_key, reverse=True)
+        )
+        self.by_slug: Dict[str, CatalogEntry] = {entry.slug: entry for entry in self.entries}
+        self.by_id: Dict[str, CatalogEntry] = {str(entry.id): entry for entry in self.entries}
+
+        by_category: Dict[str, List[CatalogEntry]] = {}
+        by_tier: Dict[str, List[CatalogEntry]] = {}
+        by_category_tier: Dict[Tuple[str, str], List[CatalogEntry]] = {}
+        for entry in self.entries:
+            by_tier.setdefault(entry.access_tier, []).append(entry)
+            if entry.category_slug:
+                by_category.setdefault(entry.category_slug, []).append(entry)
+                by_category_tier.setdefault((entry.category_slug, entry.access_tier), []).append(entry)
+        self.by_category = {key: tuple(value) for key, value in by_category.items()}
+        self.by_tier = {key: tuple(value) for key, value in by_tier.items()}
+        self.by_category_tier = {key: tuple(value) for key, value in by_category_tier.items()}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def browse(self, category_slug: Optional[str], free_only: bool, limit: int) -> List[Dict[str, Any]]:
+        """Same rows, order and fields as the content.browse* statements"""
+        if category_slug and free_only:
+            entries = self.by_category_tier.get((category_slug, 'free'), ())
+        elif category_slug:
+            entries = self.by_category.get(category_slug, ())
+        elif free_only:
+            entries = self.by_tier.get('free', ())
+        else:
+            entries = self.entries
+        return [entry.as_dict(BROWSE_FIELDS) for entry in entries[:limit]]
+
+    def get_by_slug(self, slug: str) -> Optional[CatalogEntry]:
+        return self.by_slug.get(slug)
+
+    def get_by_id(self, content_id) -> Optional[CatalogEntry]:
+        return self.by_id.get(str(content_id))
+
+    def memory_report(self) -> Dict[str, Any]:
+        """Approximate bytes held: records, their (unshared) values and the indexes"""
+        seen = set()
+
+        def size(obj) -> int:
+            if id(obj) in seen:
+                return 0
+            seen.add(id(obj))
+            return sys.getsizeof(obj)
+
+        entry_bytes = sum(size(entry) for entry in self.entries)
+        value_bytes = sum(size(getattr(entry, field)) for entry in self.entries for field in CatalogEntry.__slots__)
+        index_bytes = size(self.entries) + size(self.by_slug) + size(self.by_id)
+        index_bytes += sum(size(key) for key in self.by_id)
+        for index in (self.by_category, self.by_tier, self.by_category_tier):
+            index_bytes += size(index) + sum(size(entries) for entries in index.values())
+        total = entry_bytes + value_bytes + index_bytes
+        return {
+            "entries": len(self.entries),
+            "entry_bytes": entry_bytes,
+            "value_bytes": value_bytes,
+            "index_bytes": index_bytes,
+            "total_bytes": total,
+            "bytes_per_entry": round(total / len(self.entries)) if self.entries else 0
+        }
+
+class CatalogSnapshotStore:
+    """Holds the current snapshot and rebuilds it when the catalog changes.
+
+    A catalog_changed notification for content, experts or categories
+    schedules a rebuild; notifications arriving during one just cause one
+    more. Readers keep using the previous snapshot until the new one is
+    complete. A periodic rebuild covers missed notifications. With no
+    snapshot (disabled, not loaded yet, or the catalog outgrew
+    catalog_snapshot_max_rows) callers fall back to SQL.
+    """
+
+    def __init__(self):
+        self.current: Optional[CatalogSnapshot] = None
+        self._version = 0
+        self._dirty = False
+        self._rebuild_task: Optional[asyncio.Task] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.rebuilds = 0
+        self.failures = 0
+        self.last_build_ms: Optional[float] = None
+
+    def get(self) -> Optional[CatalogSnapshot]:
+        return self.current if settings.catalog_snapshot_enabled else None
+
+    async def load(self) -> Optional[CatalogSnapshot]:
+        """Build a snapshot from the primary (one query) and swap it in"""
+        started = time.perf_counter()
+        rows = await self._fetch_rows()
+        if len(rows) > settings.catalog_snapshot_max_rows:
+            logger.warning(f"Catalog has {len(rows)} published rows, above catalog_snapshot_max_rows="
+                           f"{settings.catalog_snapshot_max_rows}; serving content from SQL")
+            self.current = None
+            return None
+
+        self._version += 1
+        snapshot = CatalogSnapshot(rows, self._version)
+        self.current = snapshot
+        self.rebuilds += 1
+        self.last_build_ms = (time.perf_counter() - started) * 1000
+        logger.info(f"Catalog snapshot v{snapshot.version}: {len(snapshot)} entries, "
+                    f"{snapshot.memory_report()['total_bytes'] / 1024:.0f} KiB, {self.last_build_ms:.0f} ms")
+        return snapshot
+
+    async def _fetch_rows(self):
+        # The primary: a lagging replica would pin stale rows until the next rebuild
+        connection = await get_db_connection()
+        try:
+            return await statement_registry.fetch(connection, 'content.catalog_snapshot')
+        finally:
+            await release_db_connection(connection)
+
+    async def start(self):
+        if not settings.catalog_snapshot_enabled:
+            return
+        try:
+            await self.load()
+        except Exception as e:
+            self.failures += 1
+            logger.warning(f"Catalog snapshot load failed, serving content from SQL: {e}")
+        self._refresh_task = asyncio.get_running_loop().create_task(self._refresh_loop())
+
+    async def stop(self):
+        for task in (self._refresh_task, self._rebuild_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._refresh_task = None
+        self._rebuild_task = None
+
+    def on_catalog_changed(self, table: str):
+        if table in SNAPSHOT_TABLES:
+            self.schedule_rebuild()
+
+    def schedule_rebuild(self):
+        if not settings.catalog_snapshot_enabled:
+            return
+        self._dirty = True
+        if self._rebuild_task is None:
+            self._rebuild_task = asyncio.get_running_loop().create_task(self._rebuild())
+
+    async def _rebuild(self):
+        try:
+            while self._dirty:
+                self._dirty = False
+                try:
+                    await self.load()
+                except Exception as e:
+                    # The previous snapshot stays; the periodic refresh retries
+                    self.failures += 1
+                    logger.warning(f"Catalog snapshot rebuild failed: {e}")
+        finally:
+            self._rebuild_task = None
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(settings.catalog_snapshot_refresh_seconds)
+            self.schedule_rebuild()
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self.current
+        return {
+            "enabled": settings.catalog_snapshot_enabled,
+            "version": snapshot.version if snapshot else None,
+            "entries": len(snapshot) if snapshot else None,
+            "age_seconds": round(time.time() - snapshot.loaded_at, 1) if snapshot else None,
+            "rebuilds": self.rebuilds,
+            "failures": self.failures,
+            "last_build_ms": round(self.last_build_ms, 1) if self.last_build_ms is not None else None
+        }
+
+# Global snapshot store, loaded at startup
+catalog_snapshot = CatalogSnapshotStore()
+
+notification_listener.subscribe(
+    CATALOG_CHANGED_CHANNEL,
+    catalog_snapshot.on_catalog_changed,
+    on_reconnect=catalog_snapshot.schedule_rebuild
+)
@@ -0,0 +1,206 @@
+# app/services/cognito_sync_service.py
+import asyncio
+import random
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from app.auth.cognito import CognitoThrottledError, async_cognito_client
+from app.auth.models import UserRole, SubscriptionTier
+from app.auth.profile_cache import USER_CHANGED_CHANNEL
+from app.config import settings
+from app.database.connection import get_db_connection, release_db_connection
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Column order of the staging table and of the records COPY'd into it
+STAGING_COLUMNS = ['cognito_sub', 'email', 'display_name', 'role', 'subscription_tier']
+
+UserRecord = Tuple[str, str, str, str, str]
+
+# One statement per batch: insert users missing from the table, refresh the
+# Cognito-owned columns (email, name) of existing ones, and tell workers to drop
+# their cached rows. Role and tier are owned by the database and never
+# overwritten. Rows whose email already belongs to a different cognito_sub
+# (user deleted and re-created in Cognito) are skipped and reported.
+MERGE_BATCH_SQL = """
+    WITH conflicts AS (
+        SELECT s.cognito_sub
+        FROM cognito_sync_staging s
+        JOIN users u ON u.email = s.email AND u.cognito_sub <> s.cognito_sub
+    ),
+    merged AS (
+        INSERT INTO users (cognito_sub, email, display_name, role, subscription_tier)
+        SELECT s.cognito_sub, s.email, s.display_name, s.role, s.subscription_tier
+        FROM cognito_sync_staging s
+        WHERE s.cognito_sub NOT IN (SELECT cognito_sub FROM conflicts)
+        ON CONFLICT (cognito_sub) DO UPDATE
+        SET email = EXCLUDED.email,
+            display_name = EXCLUDED.display_name,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE (users.email, users.display_name)
+              IS DISTINCT FROM (EXCLUDED.email, EXCLUDED.display_name)
+        RETURNING cognito_sub, (xmax = 0) AS inserted
+    ),
+    notified AS (
+        SELECT pg_notify($1, cognito_sub) FROM merged WHERE NOT inserted
+    )
+    SELECT
+        (SELECT count(*) FROM merged WHERE inserted) AS inserted,
+        (SELECT count(*) FROM merged WHERE NOT inserted) AS updated,
+        (SELECT count(*) FROM conflicts) AS email_conflicts,
+        (SELECT count(*) FROM notified) AS notified
+"""
+
+def cognito_user_record(user: Dict[str, Any]) -> Optional[UserRecord]:
+    """Map a ListUsers entry to a staging row (None if it has no sub or email)"""
+    attributes = {attr['Name']: attr['Value'] for attr in user.get('Attributes', [])}
+    sub = attributes.get('sub')
+    email = attributes.get('email')
+    if not sub or not email:
+        return None
+
+    return (
+        sub,
+        email,
+        (attributes.get('name') or email.split('@')[0])[:100],
+        attributes.get('custom:role', UserRole.FREE_USER.value),
+        attributes.get('custom:subscription_tier', SubscriptionTier.FREE.value)
+    )
+
+class CognitoSyncService:
+    """Reconciles the users table with the Cognito user pool.
+
+    Users are streamed page by page from ListUsers and loaded in batches, so
+    memory stays bounded by the batch size however large the pool is.
+    """
+
+    def __init__(self, cognito=None, batch_size: Optional[int] = None):
+        self.cognito = cognito or async_cognito_client
+        self.batch_size = batch_size or settings.cognito_sync_batch_size
+
+    async def iter_cognito_users(self, stats: Optional[Dict[str, int]] = None) -> AsyncIterator[UserRecord]:
+        """Yield every user in the pool, fetching the next page while the caller works"""
+        stats = stats if stats is not None else {}
+        next_page = asyncio.ensure_future(self._list_users(None, stats))
+        try:
+            while next_page:
+                page = await next_page
+                token = page.get('PaginationToken')
+                next_page = asyncio.ensure_future(self._list_users(token, stats)) if token else None
+                stats['pages'] = stats.get('pages', 0) + 1
+
+                for user in page.get('Users', []):
+                    record = cognito_user_record(user)
+                    if record is None:
+                        stats['skipped'] = stats.get('skipped', 0) + 1
+                        continue
+                    yield record
+        finally:
+            if next_page and not next_page.done():
+                next_page.cancel()
+
+    async def _list_users(self, pagination_token: Optional[str], stats: Dict[str, int]) -> Dict[str, Any]:
+        """One ListUsers page, retried with jittered exponential backoff while Cognito throttles"""
+        attempt = 0
+        while True:
+            try:
+                return await self.cognito.list_users(pagination_token)
+            except CognitoThrottledError:
+                if attempt >= settings.cognito_sync_max_retries:
+                    raise
+                # Full jitter, so a sync and other ListUsers callers don't retry in lockstep
+                delay = random.uniform(0, settings.cognito_sync_retry_base_delay_seconds * 2 ** attempt)
+                attempt += 1
+                stats['throttled'] = stats.get('throttled', 0) + 1
+                logger.warning(f"ListUsers throttled, retry {attempt} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    async def iter_user_batches(self, stats: Optional[Dict[str, int]] = None) -> AsyncIterator[List[UserRecord]]:
+        """Group the user stream into lists of at most batch_size unique users"""
+        # Keyed by sub: a pool that changes mid-listing can repeat a user, and
+        # the merge cannot touch the same row twice in one statement
+        batch: Dict[str, UserRecord] = {}
+        async for record in self.iter_cognito_users(stats):
+            batch[record[0]] = record
+            if len(batch) >= self.batch_size:
+                yield list(batch.values())
+                batch = {}
+        if batch:
+            yield list(batch.values())
+
+    async def sync_users(self, dry_run: bool = False) -> Dict[str, Any]:
+        """Create missing users and refresh changed ones; returns a diff report.
+
+        With dry_run the merges run and are counted, then rolled back.
+        """
+        started = time.monotonic()
+        stats = {'pages': 0, 'skipped': 0, 'throttled': 0}
+        report = {'seen': 0, 'inserted': 0, 'updated': 0, 'unchanged': 0, 'email_conflicts': 0}
+
+        connection = None
+        try:
+            connection = await get_db_connection()
+            await connection.execute("""
+                CREATE TEMP TABLE cognito_sync_staging (
+                    cognito_sub TEXT PRIMARY KEY, email TEXT, display_name TEXT,
+                    role TEXT, subscription_tier TEXT
+                );
+                CREATE TEMP TABLE cognito_sync_seen (cognito_sub TEXT);
+            """)
+
+            async for batch in self.iter_user_batches(stats):
+                counts = await self._merge_batch(connection, batch, dry_run)
+                report['seen'] += len(batch)
+                for key in ('inserted', 'updated', 'email_conflicts'):
+                    report[key] += counts[key]
+                report['unchanged'] += len(batch) - counts['inserted'] - counts['updated'] - counts['email_conflicts']
+                logger.info(f"Synced {report['seen']} Cognito users ({report['inserted']} inserted, "
+                            f"{report['updated']} updated)")
+
+            # Rows Cognito no longer knows about are reported, never deleted
+            report['only_in_database'] = await connection.fetchval("""
+                SELECT count(*) FROM users u
+                WHERE NOT EXISTS (SELECT 1 FROM cognito_sync_seen s WHERE s.cognito_sub = u.cognito_sub)
+            """)
+        finally:
+            if connection:
+                await connection.execute("""
+                    DROP TABLE IF EXISTS cognito_sync_staging;
+                    DROP TABLE IF EXISTS cognito_sync_seen;
+                """)
+                await release_db_connection(connection)
+
+        report.update(stats)
+        report['dry_run'] = dry_run
+        report['elapsed_seconds'] = round(time.monotonic() - started, 2)
+        return report
+
+    async def _merge_batch(self, connection, batch: List[UserRecord], dry_run: bool) -> Dict[str, int]:
+        """COPY a batch into staging and merge it into users in one statement"""
+        transaction = connection.transaction()
+        await transaction.start()
+        try:
+            await connection.execute("TRUNCATE cognito_sync_staging")
+            await connection.copy_records_to_table(
+                'cognito_sync_staging', records=batch, columns=STAGING_COLUMNS
+            )
+            await connection.copy_records_to_table(
+                'cognito_sync_seen', records=[(record[0],) for record in batch]
+            )
+            counts = dict(await connection.fetchrow(MERGE_BATCH_SQL, USER_CHANGED_CHANNEL))
+        except Exception:
+            await transaction.rollback()
+            raise
+
+        if dry_run:
+            # Undo the merge but keep the subs so only_in_database stays accurate
+            await transaction.rollback()
+            await connection.copy_records_to_table(
+                'cognito_sync_seen', records=[(record[0],) for record in batch]
+            )
+        else:
+            await transaction.commit()
+        return counts
+
+# Global service instance
+cognito_sync_service = CognitoSyncService()
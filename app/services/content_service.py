@@ -1,14 +1,223 @@
 # app/services/content_service.py
-from typing import Optional, List, Dict, Any
+import base64
+import binascii
+import json
+from typing import Optional, List, Dict, Any, Tuple
 from app.database.connection import get_db_connection, release_db_connection
+from app.database.replicas import get_read_connection, release_read_connection
+from app.database.statements import statement_registry
 from app.auth.models import UserResponse
+from app.services.catalog_cache import catalog_cache
+from app.services.catalog_snapshot import catalog_snapshot, CONTENT_COLUMNS, DETAIL_FIELDS
+from app.config import settings
+from app.utils.cache import TTLCache
+from app.utils.timing import timed
 import logging
 
 logger = logging.getLogger(__name__)
 
+BROWSE_BASE_SQL = """
+    SELECT c.id, c.title, c.slug, c.description, c.access_tier,
+           c.duration_seconds, c.featured, c.content_type,
+           e.name as expert_name, e.title as expert_title,
+           cat.name as category_name, cat.color as category_color
+    FROM content c
+    LEFT JOIN experts e ON c.expert_id = e.id
+    LEFT JOIN categories cat ON c.category_id = cat.id
+    WHERE c.status = 'published'
+"""
+
+def _browse_statement_name(by_category: bool, free_only: bool) -> str:
+    return 'content.browse' + ('.category' if by_category else '') + ('.free' if free_only else '')
+
+def _register_browse_statements():
+    """One fixed statement per filter combination, instead of SQL assembled per request"""
+    for by_category in (False, True):
+        for free_only in (False, True):
+            query = BROWSE_BASE_SQL
+            if by_category:
+                query += " AND cat.slug = $2"
+            if free_only:
+                query += " AND c.access_tier = 'free'"
+            query += " ORDER BY c.featured DESC, c.created_at DESC LIMIT $1"
+            statement_registry.register(_browse_statement_name(by_category, free_only), query)
+
+_register_browse_statements()
+
+statement_registry.register('content.categories', """
+    SELECT name, slug, description, icon, color, sort_order
+    FROM categories
+    WHERE is_active = true
+    ORDER BY sort_order, name
+""")
+
+statement_registry.register('content.featured_experts', """
+    SELECT name, slug, title, bio, specialties, verified, featured
+    FROM experts
+    WHERE featured = true AND status = 'active'
+    ORDER BY created_at DESC
+    LIMIT $1
+""")
+
+statement_registry.register('content.detail', f"""
+    SELECT {', '.join('c.' + column for column in CONTENT_COLUMNS)},
+           e.name as expert_name, e.title as expert_title, e.bio as expert_bio,
+           cat.name as category_name, cat.color as category_color
+    FROM content c
+    LEFT JOIN experts e ON c.expert_id = e.id
+    LEFT JOIN categories cat ON c.category_id = cat.id
+    WHERE c.slug = $1 AND c.status = 'published'
+""")
+
+statement_registry.register('content.hero', """
+    SELECT id, title, subtitle, description, background_image_url, cta_text, sort_order
+    FROM hero_content
+    WHERE is_active = true
+    ORDER BY sort_order, created_at
+""")
+
+# $1 query text, $2 limit, $3/$4 rank and id of the previous page's last row
+# (NULL for the first page), $5 category slug. search_vector and its GIN
+# index come from migrations 0005/0006.
+#
+# Only the newest content_search_max_candidates matches (browse order) are
+# ranked, so ts_rank_cd runs a bounded number of times however many rows
+# match, and paging ends there. A common term walks idx_content_browse[_free]
+# and stops at the cap; a rare one is read from the GIN index. Which is
+# cheaper depends on $1, so the statement is planned per call: the generic
+# plan would always read every match from the GIN index.
+SEARCH_SQL = """
+    SELECT * FROM (
+        SELECT c.id, c.title, c.slug, c.description, c.access_tier,
+               c.duration_seconds, c.featured, c.content_type,
+               e.name as expert_name, e.title as expert_title,
+               cat.name as category_name, cat.color as category_color,
+               ts_rank_cd(c.search_vector, tsq) AS rank
+        FROM (
+            SELECT c.* FROM content c
+            WHERE c.search_vector @@ websearch_to_tsquery('english', $1) AND c.status = 'published'{filters}
+            ORDER BY c.featured DESC, c.created_at DESC
+            LIMIT {candidates}
+        ) c
+        CROSS JOIN websearch_to_tsquery('english', $1) tsq
+        LEFT JOIN experts e ON c.expert_id = e.id
+        LEFT JOIN categories cat ON c.category_id = cat.id
+    ) ranked
+    WHERE $3::real IS NULL OR (rank, id) < ($3::real, $4::uuid)
+    ORDER BY rank DESC, id DESC
+    LIMIT $2
+"""
+
+def _search_statement_name(by_category: bool, free_only: bool) -> str:
+    return 'content.search' + ('.category' if by_category else '') + ('.free' if free_only else '')
+
+def _register_search_statements():
+    """Same filter combinations as browse; tier and category are applied in SQL"""
+    for by_category in (False, True):
+        for free_only in (False, True):
+            filters = ""
+            if by_category:
+                filters += " AND c.category_id = (SELECT id FROM categories WHERE slug = $5)"
+            if free_only:
+                filters += " AND c.access_tier = 'free'"
+            statement_registry.register(
+                _search_statement_name(by_category, free_only),
+                SEARCH_SQL.format(filters=filters, candidates=settings.content_search_max_candidates),
+                settings={'plan_cache_mode': 'force_custom_plan'}
+            )
+
+_register_search_statements()
+
+# $1 lowercased prefix, $2 limit. <% (word_similarity above the threshold)
+# matches "anxi" to "anxiety" and tolerates typos: at 0.3 (pg_trgm's
+# similarity_threshold) a swapped pair of letters ("anxeity", 0.375) still
+# matches, where the default 0.6 did not. Prefix matches rank first. Titles are matched through their words and
+# two-word phrases in suggest_terms (migration 0010), a few thousand rows
+# however many titles share a word; expert and category names through their
+# trigram indexes (migration 0007).
+SUGGEST_SQL = """
+    SELECT kind, label, slug FROM (
+        (SELECT 'term' AS kind, t.term AS label, NULL AS slug,
+                word_similarity($1, t.term) + starts_with(t.term, $1)::int AS score
+         FROM suggest_terms t
+         WHERE $1 <% t.term{tier_filter}
+         ORDER BY score DESC, t.content_count DESC
+         LIMIT $2)
+        UNION ALL
+        (SELECT 'expert', e.name, e.slug,
+                word_similarity($1, e.name) + starts_with(lower(e.name), $1)::int
+         FROM experts e
+         WHERE $1 <% e.name AND e.status = 'active'
+         ORDER BY 4 DESC
+         LIMIT $2)
+        UNION ALL
+        (SELECT 'category', cat.name, cat.slug,
+                word_similarity($1, cat.name) + starts_with(lower(cat.name), $1)::int
+         FROM categories cat
+         WHERE $1 <% cat.name AND cat.is_active = true
+         ORDER BY 4 DESC
+         LIMIT $2)
+    ) suggestions
+    ORDER BY score DESC, length(label)
+    LIMIT $2
+"""
+
+SUGGEST_SETTINGS = {'pg_trgm.word_similarity_threshold': '0.3'}
+
+statement_registry.register('content.suggest', SUGGEST_SQL.format(tier_filter=""), settings=SUGGEST_SETTINGS)
+statement_registry.register('content.suggest.free', SUGGEST_SQL.format(tier_filter=" AND t.free_count > 0"),
+                            settings=SUGGEST_SETTINGS)
+
+# Hot prefixes ("anx", "mindf") are typed by everyone; keyed by (prefix, free_only, limit)
+suggestion_cache = TTLCache(
+    max_entries=settings.content_suggest_cache_max_entries,
+    ttl_seconds=settings.content_suggest_cache_ttl_seconds
+)
+
+def normalize_prefix(text: str) -> str:
+    """Lowercased, single-spaced; what suggestions are matched and cached by"""
+    return " ".join(text.lower().split())[:50]
+
+def encode_search_cursor(rank: float, content_id) -> str:
+    """Opaque cursor for the page after a row with this rank and id"""
+    payload = json.dumps([rank, str(content_id)], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+def decode_search_cursor(cursor: str) -> Tuple[float, str]:
+    try:
+        payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        rank, content_id = json.loads(payload)
+        return float(rank), str(content_id)
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise ValueError(f"Invalid search cursor: {e}")
+
+async def _fetch_catalog(name: str, *args) -> List[Dict[str, Any]]:
+    """Catalog cache fills read the primary: right after a catalog_changed
+    notification a replica may not have replayed the write yet"""
+    connection = await get_db_connection()
+    try:
+        rows = await statement_registry.fetch(connection, name, *args)
+    finally:
+        await release_db_connection(connection)
+    return [dict(row) for row in rows]
+
+@timed("db.get_categories")
+async def _load_categories() -> List[Dict[str, Any]]:
+    return await _fetch_catalog('content.categories')
+
+@timed("db.get_featured_experts")
+async def _load_featured_experts(limit: int) -> List[Dict[str, Any]]:
+    return await _fetch_catalog('content.featured_experts', limit)
+
+@timed("db.get_hero_content")
+async def _load_hero_content() -> List[Dict[str, Any]]:
+    return await _fetch_catalog('content.hero')
+
 class ContentService:
-    """Service for managing content operations"""
+    """Service for managing content operations (read-only: served by replicas when
+    configured, except catalog cache fills)"""
     
+    @timed("db.get_browse_content")
     async def get_browse_content(
         self, 
         user: Optional[UserResponse] = None, 
@@ -16,41 +225,27 @@ class ContentService:
         limit: int = 20
     ) -> Dict[str, Any]:
         """Get content for browse page with access control"""
+        # Filter by category if specified, and by access level based on user subscription
+        free_only = not user or user.subscription_tier == 'free'
+        
+        snapshot = catalog_snapshot.get()
+        if snapshot:
+            content_list = snapshot.browse(category_slug, free_only, limit)
+            return {
+                "content": content_list,
+                "total": len(content_list),
+                "user_access_level": user.subscription_tier if user else "anonymous"
+            }
+        
         connection = None
         try:
-            connection = await get_db_connection()
-            
-            # Base query
-            query = """
-                SELECT c.id, c.title, c.slug, c.description, c.access_tier,
-                       c.duration_seconds, c.featured, c.content_type,
-                       e.name as expert_name, e.title as expert_title,
-                       cat.name as category_name, cat.color as category_color
-                FROM content c
-                LEFT JOIN experts e ON c.expert_id = e.id
-                LEFT JOIN categories cat ON c.category_id = cat.id
-                WHERE c.status = 'published'
-            """
-            
-            params = []
-            param_count = 1
-            
-            # Filter by category if specified
-            if category_slug:
-                query += f" AND cat.slug = ${param_count}"
-                params.append(category_slug)
-                param_count += 1
-            
-            # Filter by access level based on user subscription
-            if not user or user.subscription_tier == 'free':
-                query += f" AND c.access_tier = 'free'"
+            connection = await get_read_connection()
             
-            # Order and limit
-            query += " ORDER BY c.featured DESC, c.created_at DESC"
-            query += f" LIMIT ${param_count}"
-            params.append(limit)
+            params = [limit, category_slug] if category_slug else [limit]
             
-            content_list = await connection.fetch(query, *params)
+            content_list = await statement_registry.fetch(
+                connection, _browse_statement_name(bool(category_slug), free_only), *params
+            )
             
             return {
                 "content": [dict(row) for row in content_list],
@@ -63,96 +258,163 @@ class ContentService:
             return {"content": [], "total": 0}
         finally:
             if connection:
-                await release_db_connection(connection)
+                await release_read_connection(connection)
     
     async def get_categories(self) -> List[Dict[str, Any]]:
-        """Get all active categories"""
-        connection = None
+        """Get all active categories (cached until categories changes)"""
         try:
-            connection = await get_db_connection()
-            
-            categories = await connection.fetch("""
-                SELECT name, slug, description, icon, color, sort_order
-                FROM categories
-                WHERE is_active = true
-                ORDER BY sort_order, name
-            """)
-            
-            return [dict(row) for row in categories]
-            
+            return await catalog_cache.get_or_load(('categories',), 'categories', _load_categories)
         except Exception as e:
             logger.error(f"Failed to get categories: {e}")
             return []
-        finally:
-            if connection:
-                await release_db_connection(connection)
     
     async def get_featured_experts(self, limit: int = 6) -> List[Dict[str, Any]]:
-        """Get featured experts"""
-        connection = None
+        """Get featured experts (cached until experts changes)"""
         try:
-            connection = await get_db_connection()
-            
-            experts = await connection.fetch("""
-                SELECT name, slug, title, bio, specialties, verified, featured
-                FROM experts
-                WHERE featured = true AND status = 'active'
-                ORDER BY created_at DESC
-                LIMIT $1
-            """, limit)
-            
-            return [dict(row) for row in experts]
-            
+            return await catalog_cache.get_or_load(
+                ('featured_experts', limit), 'experts', lambda: _load_featured_experts(limit)
+            )
         except Exception as e:
             logger.error(f"Failed to get featured experts: {e}")
             return []
-        finally:
-            if connection:
-                await release_db_connection(connection)
+    
+    async def get_hero_content(self) -> List[Dict[str, Any]]:
+        """Get active hero banners in display order (cached until hero_content changes)"""
+        try:
+            return await catalog_cache.get_or_load(('hero_content',), 'hero_content', _load_hero_content)
+        except Exception as e:
+            logger.error(f"Failed to get hero content: {e}")
+            return []
 
+    @timed("db.get_content_detail")
     async def get_content_detail(
         self, 
         content_slug: str, 
         user: Optional[UserResponse] = None
     ) -> Optional[Dict[str, Any]]:
         """Get detailed content with access control"""
+        snapshot = catalog_snapshot.get()
+        if snapshot:
+            entry = snapshot.get_by_slug(content_slug)
+            return self._apply_access(entry.as_dict(DETAIL_FIELDS), user) if entry else None
+        
         connection = None
         try:
-            connection = await get_db_connection()
+            connection = await get_read_connection()
             
-            content = await connection.fetchrow("""
-                SELECT c.*, 
-                       e.name as expert_name, e.title as expert_title, e.bio as expert_bio,
-                       cat.name as category_name, cat.color as category_color
-                FROM content c
-                LEFT JOIN experts e ON c.expert_id = e.id
-                LEFT JOIN categories cat ON c.category_id = cat.id
-                WHERE c.slug = $1 AND c.status = 'published'
-            """, content_slug)
+            content = await statement_registry.fetchrow(connection, 'content.detail', content_slug)
             
             if not content:
                 return None
             
-            content_dict = dict(content)
-            
-            # Check access permissions
-            if content_dict['access_tier'] == 'premium':
-                if not user or user.subscription_tier == 'free':
-                    # Return limited info for premium content
-                    return {
-                        **content_dict,
-                        'access_denied': True,
-                        'message': 'Premium subscription required'
-                    }
-            
-            return content_dict
+            return self._apply_access(dict(content), user)
             
         except Exception as e:
             logger.error(f"Failed to get content detail for {content_slug}: {e}")
             return None
         finally:
             if connection:
-                await release_db_connection(connection)
+                await release_read_connection(connection)
+
+    def _apply_access(self, content_dict: Dict[str, Any], user: Optional[UserResponse]) -> Dict[str, Any]:
+        """Flag premium content the user can't watch"""
+        if content_dict['access_tier'] == 'premium':
+            if not user or user.subscription_tier == 'free':
+                # Return limited info for premium content
+                return {
+                    **content_dict,
+                    'access_denied': True,
+                    'message': 'Premium subscription required'
+                }
+        
+        return content_dict
+
+    @timed("db.search_content")
+    async def search(
+        self,
+        query: str,
+        user: Optional[UserResponse] = None,
+        category_slug: Optional[str] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Full-text search over the newest content_search_max_candidates
+        matches, best first, paged with an opaque cursor.
+
+        Accepts web-search syntax ("quoted phrases", -excluded, or). Raises
+        ValueError for a malformed cursor.
+        """
+        after_rank, after_id = decode_search_cursor(cursor) if cursor else (None, None)
+        
+        connection = None
+        try:
+            connection = await get_read_connection()
+            
+            free_only = not user or user.subscription_tier == 'free'
+            params = [query, limit + 1, after_rank, after_id]
+            if category_slug:
+                params.append(category_slug)
+            
+            # One extra row tells whether there is a next page
+            rows = await statement_registry.fetch(
+                connection, _search_statement_name(bool(category_slug), free_only), *params
+            )
+            
+            page = [dict(row) for row in rows[:limit]]
+            next_cursor = None
+            if len(rows) > limit:
+                next_cursor = encode_search_cursor(page[-1]['rank'], page[-1]['id'])
+            
+            return {
+                "content": page,
+                "total": len(page),
+                "next_cursor": next_cursor,
+                "user_access_level": user.subscription_tier if user else "anonymous"
+            }
+            
+        except Exception as e:
+            logger.error(f"Failed to search content: {e}")
+            return {"content": [], "total": 0, "next_cursor": None}
+        finally:
+            if connection:
+                await release_read_connection(connection)
+
+    @timed("db.suggest_content")
+    async def suggest(
+        self,
+        prefix: str,
+        user: Optional[UserResponse] = None,
+        limit: int = 8
+    ) -> List[Dict[str, Any]]:
+        """Autocomplete: title words and phrases, experts and categories matching a partial word"""
+        prefix = normalize_prefix(prefix)
+        free_only = not user or user.subscription_tier == 'free'
+        cache_key = (prefix, free_only, limit)
+        
+        if settings.content_suggest_cache_enabled:
+            cached = suggestion_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        connection = None
+        try:
+            connection = await get_read_connection()
+            
+            rows = await statement_registry.fetch(
+                connection, 'content.suggest.free' if free_only else 'content.suggest', prefix, limit
+            )
+            suggestions = [dict(row) for row in rows]
+            
+        except Exception as e:
+            logger.error(f"Failed to get suggestions for '{prefix}': {e}")
+            return []
+        finally:
+            if connection:
+                await release_read_connection(connection)
+        
+        if settings.content_suggest_cache_enabled:
+            suggestion_cache.set(cache_key, suggestions)
+        return suggestions
 
 # Global service instance
 content_service = ContentService()
\ No newline at end of file
@@ -5,12 +5,62 @@ from typing import Optional, Dict, Any, List
 from app.config import settings
 from app.auth.models import UserResponse, SubscriptionTier
 from app.database.connection import get_db_connection, release_db_connection
+from app.database.replicas import get_read_connection, release_read_connection
+from app.database.statements import statement_registry
+from app.services.catalog_snapshot import catalog_snapshot, STREAMING_FIELDS
+from app.utils.timing import span
 from datetime import datetime, timedelta
 import logging
 import uuid
 
 logger = logging.getLogger(__name__)
 
+statement_registry.register('content.streaming_by_slug', """
+    SELECT co.id, co.title, co.slug, co.description, co.access_tier, co.status,
+           co.s3_key_video_720p, co.s3_key_video_1080p, 
+           co.s3_key_thumbnail, co.s3_key_poster,
+           co.video_duration_seconds, co.video_format, co.has_video,
+           e.name as expert_name, c.name as category_name
+    FROM content co
+    LEFT JOIN experts e ON co.expert_id = e.id
+    LEFT JOIN categories c ON co.category_id = c.id
+    WHERE co.slug = $1 AND co.status = 'published'
+""")
+
+statement_registry.register('content.id_by_slug', """
+    SELECT id FROM content WHERE slug = $1 AND status = 'published'
+""")
+
+statement_registry.register('video_analytics.insert', """
+    INSERT INTO video_analytics (
+        content_id, user_id, session_id, event_type,
+        timestamp_seconds, watch_duration_seconds,
+        quality_level, device_type
+    ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+""")
+
+statement_registry.register('video_analytics.progress_for_content', """
+    SELECT content_id, MAX(timestamp_seconds) as last_position,
+           SUM(watch_duration_seconds) as total_watch_time,
+           COUNT(*) as session_count
+    FROM video_analytics 
+    WHERE user_id = $1 AND content_id = $2
+    GROUP BY content_id
+""")
+
+statement_registry.register('video_analytics.progress', """
+    SELECT va.content_id, c.title, c.slug,
+           MAX(va.timestamp_seconds) as last_position,
+           SUM(va.watch_duration_seconds) as total_watch_time,
+           COUNT(*) as session_count,
+           c.video_duration_seconds
+    FROM video_analytics va
+    JOIN content c ON va.content_id = c.id
+    WHERE va.user_id = $1
+    GROUP BY va.content_id, c.title, c.slug, c.video_duration_seconds
+    ORDER BY MAX(va.created_at) DESC
+""")
+
 class StreamingService:
     """Service class for handling secure video streaming operations"""
     
@@ -38,12 +88,8 @@ class StreamingService:
         Returns:
             Dictionary with streaming URLs and content metadata
         """
-        connection = None
         try:
-            # Get content from database
-            connection = await get_db_connection()
-            
-            content_data = await self._get_content_by_slug(connection, content_slug)
+            content_data = await self.get_streaming_content(content_slug)
             if not content_data:
                 raise ValueError("Content not found")
             
@@ -74,9 +120,6 @@ class StreamingService:
         except Exception as e:
             logger.error(f"Failed to get streaming data for {content_slug}: {e}")
             raise
-        finally:
-            if connection:
-                await release_db_connection(connection)
     
     async def log_video_analytics(
         self,
@@ -100,14 +143,11 @@ class StreamingService:
             connection = await get_db_connection()
             
             # Get content ID
-            content_id_query = "SELECT id FROM content WHERE slug = $1 AND status = 'published'"
-            result = await connection.fetchrow(content_id_query, content_slug)
+            content_id = await self.content_id_for_slug(connection, content_slug)
             
-            if not result:
+            if not content_id:
                 raise ValueError("Content not found")
             
-            content_id = str(result['id'])
-            
             # Validate event data
             self._validate_event_data(event_data)
             
@@ -141,32 +181,15 @@ class StreamingService:
         """
         connection = None
         try:
-            connection = await get_db_connection()
+            # Analytics read: a replica's slight lag is fine
+            connection = await get_read_connection()
             
             if content_id:
-                query = """
-                    SELECT content_id, MAX(timestamp_seconds) as last_position,
-                           SUM(watch_duration_seconds) as total_watch_time,
-                           COUNT(*) as session_count
-                    FROM video_analytics 
-                    WHERE user_id = $1 AND content_id = $2
-                    GROUP BY content_id
-                """
-                progress = await connection.fetch(query, user_id, content_id)
+                progress = await statement_registry.fetch(
+                    connection, 'video_analytics.progress_for_content', user_id, content_id
+                )
             else:
-                query = """
-                    SELECT va.content_id, c.title, c.slug,
-                           MAX(va.timestamp_seconds) as last_position,
-                           SUM(va.watch_duration_seconds) as total_watch_time,
-                           COUNT(*) as session_count,
-                           c.video_duration_seconds
-                    FROM video_analytics va
-                    JOIN content c ON va.content_id = c.id
-                    WHERE va.user_id = $1
-                    GROUP BY va.content_id, c.title, c.slug, c.video_duration_seconds
-                    ORDER BY MAX(va.created_at) DESC
-                """
-                progress = await connection.fetch(query, user_id)
+                progress = await statement_registry.fetch(connection, 'video_analytics.progress', user_id)
             
             return [dict(record) for record in progress]
             
@@ -175,25 +198,37 @@ class StreamingService:
             raise
         finally:
             if connection:
-                await release_db_connection(connection)
+                await release_read_connection(connection)
+    
+    async def get_streaming_content(self, content_slug: str) -> Optional[Dict[str, Any]]:
+        """Published content with its video keys, or None; a connection is only taken without a snapshot"""
+        if catalog_snapshot.get():
+            return await self._get_content_by_slug(None, content_slug)
+        
+        connection = await get_db_connection()
+        try:
+            return await self._get_content_by_slug(connection, content_slug)
+        finally:
+            await release_db_connection(connection)
+    
+    async def content_id_for_slug(self, connection, content_slug: str) -> Optional[str]:
+        """Id of published content by slug, from the snapshot when loaded"""
+        snapshot = catalog_snapshot.get()
+        if snapshot:
+            entry = snapshot.get_by_slug(content_slug)
+            return str(entry.id) if entry else None
+        result = await statement_registry.fetchrow(connection, 'content.id_by_slug', content_slug)
+        return str(result['id']) if result else None
     
     # Private helper methods
     
     async def _get_content_by_slug(self, connection, content_slug: str) -> Optional[Dict[str, Any]]:
-        """Get content data from database by slug"""
-        query = """
-            SELECT co.id, co.title, co.slug, co.description, co.access_tier, co.status,
-                   co.s3_key_video_720p, co.s3_key_video_1080p, 
-                   co.s3_key_thumbnail, co.s3_key_poster,
-                   co.video_duration_seconds, co.video_format, co.has_video,
-                   e.name as expert_name, c.name as category_name
-            FROM content co
-            LEFT JOIN experts e ON co.expert_id = e.id
-            LEFT JOIN categories c ON co.category_id = c.id
-            WHERE co.slug = $1 AND co.status = 'published'
-        """
-        
-        result = await connection.fetchrow(query, content_slug)
+        """Get content data by slug: from the catalog snapshot, else the database"""
+        snapshot = catalog_snapshot.get()
+        if snapshot:
+            entry = snapshot.get_by_slug(content_slug)
+            return entry.as_dict(STREAMING_FIELDS) if entry else None
+        result = await statement_registry.fetchrow(connection, 'content.streaming_by_slug', content_slug)
         return dict(result) if result else None
     
     def _validate_user_access(self, content_data: Dict[str, Any], user: UserResponse) -> bool:
@@ -294,16 +329,17 @@ class StreamingService:
     def _generate_s3_presigned_url(self, s3_key: str, expiry_seconds: int) -> str:
         """Generate S3 presigned URL with security headers"""
         try:
-            presigned_url = self.s3_client.generate_presigned_url(
-                'get_object',
-                Params={
-                    'Bucket': self.bucket_name,
-                    'Key': s3_key,
-                    'ResponseContentType': self._get_content_type(s3_key),
-                    'ResponseContentDisposition': 'inline'
-                },
-                ExpiresIn=expiry_seconds
-            )
+            with span("s3.presign"):
+                presigned_url = self.s3_client.generate_presigned_url(
+                    'get_object',
+                    Params={
+                        'Bucket': self.bucket_name,
+                        'Key': s3_key,
+                        'ResponseContentType': self._get_content_type(s3_key),
+                        'ResponseContentDisposition': 'inline'
+                    },
+                    ExpiresIn=expiry_seconds
+                )
             
             return presigned_url
             
@@ -314,7 +350,8 @@ class StreamingService:
     def _verify_s3_object_exists(self, s3_key: str) -> bool:
         """Check if S3 object exists"""
         try:
-            self.s3_client.head_object(Bucket=self.bucket_name, Key=s3_key)
+            with span("s3.head_object"):
+                self.s3_client.head_object(Bucket=self.bucket_name, Key=s3_key)
             return True
         except ClientError as e:
             if e.response['Error']['Code'] == '404':
@@ -366,16 +403,9 @@ class StreamingService:
         user: UserResponse
     ) -> None:
         """Insert video analytics event into database"""
-        analytics_query = """
-            INSERT INTO video_analytics (
-                content_id, user_id, session_id, event_type,
-                timestamp_seconds, watch_duration_seconds,
-                quality_level, device_type
-            ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
-        """
-        
-        await connection.execute(
-            analytics_query,
+        await statement_registry.execute(
+            connection,
+            'video_analytics.insert',
             content_id,
             str(user.id),
             event_data['session_id'],
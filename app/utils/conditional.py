@@ -0,0 +1,133 @@
+# app/utils/conditional.py - ETag / If-None-Match / 304 handling for cacheable GET endpoints
+import hashlib
+import json
+from typing import Any, Dict, Hashable, Optional, Tuple
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from app.config import settings
+from app.utils.cache import TTLCache
+
+# Cookies that make a response user-specific (see get_optional_user_enhanced)
+AUTH_COOKIES = ("access_token", "refresh_token", settings.session_cookie_name)
+
+def has_auth_cookies(request: Request) -> bool:
+    """Whether the request could be answered for a signed-in user.
+
+    A refresh_token alone counts: the SPA is about to refresh, and an
+    anonymous page cached publicly would outlive the sign-in.
+    """
+    return any(name in request.cookies for name in AUTH_COOKIES)
+
+def serialize(payload: Any) -> bytes:
+    """The exact bytes JSONResponse would send"""
+    return json.dumps(
+        jsonable_encoder(payload), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+def make_etag(body: bytes) -> str:
+    """Strong validator for these exact bytes; the same on every worker"""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match uses the weak comparison: W/ prefixes (added by CDNs that compress) are ignored"""
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+def cache_control(public: bool) -> str:
+    if public:
+        return (f"public, max-age={settings.http_cache_max_age_seconds}, "
+                f"s-maxage={settings.http_cache_shared_max_age_seconds}, "
+                f"stale-while-revalidate={settings.http_cache_stale_while_revalidate_seconds}")
+    # Browsers may keep it, but revalidate (cheaply, with If-None-Match) before every use
+    return "private, no-cache"
+
+class ConditionalResponder:
+    """Builds 200/304 JSON responses validated by ETag.
+
+    The ETag is a hash of the serialized body rather than a catalog
+    version: versions are counters local to each worker, while the body is
+    the same on all of them. There is no Last-Modified: nothing these
+    endpoints serve has a modification time every worker agrees on
+    (updated_at isn't maintained, and an expert rename changes content
+    without touching it), so If-Modified-Since is ignored.
+
+    Serializing and hashing happen once per version of the data: callers
+    that build the payload from cached catalog data pass a memo_key, and
+    later requests reuse the encoded body and its ETag.
+    """
+
+    def __init__(self, memo_max_entries: int = settings.http_response_memo_max_entries):
+        self.responses = 0
+        self.not_modified = 0
+        self.bytes_saved = 0
+        self.memo_hits = 0
+        # Entries for superseded data age out with the catalog cache
+        self._bodies = TTLCache(max_entries=memo_max_entries, ttl_seconds=settings.catalog_cache_ttl_seconds)
+
+    def respond(
+        self,
+        request: Request,
+        payload: Any,
+        public: bool,
+        vary_cookie: bool = True,
+        memo_key: Optional[Hashable] = None,
+        source: Any = None
+    ) -> Response:
+        """payload as JSON, or an empty 304 if the client's copy is current.
+
+        public: whether shared caches (a CDN, the browser across sign-ins)
+        may store the response. vary_cookie: whether the body depends on
+        the auth cookies. memo_key: everything the body depends on (a
+        snapshot version, the filters, the user's tier); source: the cached
+        object payload was built from, if memo_key has no version. The
+        memoized body is reused only while the same source object is passed.
+        """
+        body, etag = self._encode(payload, memo_key, source)
+        headers = {
+            "ETag": etag,
+            "Cache-Control": cache_control(public)
+        }
+        if vary_cookie:
+            headers["Vary"] = "Cookie"
+
+        self.responses += 1
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None and etag_matches(if_none_match, etag):
+            self.not_modified += 1
+            self.bytes_saved += len(body)
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def _encode(self, payload: Any, memo_key: Optional[Hashable], source: Any) -> Tuple[bytes, str]:
+        if memo_key is not None:
+            entry = self._bodies.get(memo_key)
+            # Identity, not equality: a reloaded listing is a new object even if it compares equal
+            if entry is not None and entry[0] is source:
+                self.memo_hits += 1
+                return entry[1], entry[2]
+
+        body = serialize(payload)
+        etag = make_etag(body)
+        if memo_key is not None:
+            self._bodies.set(memo_key, (source, body, etag))
+        return body, etag
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "responses": self.responses,
+            "not_modified": self.not_modified,
+            "not_modified_ratio": round(self.not_modified / self.responses, 4) if self.responses else None,
+            "bytes_saved": self.bytes_saved,
+            "memo_hits": self.memo_hits,
+            "memo_size": len(self._bodies)
+        }
+
+# Shared by the /content endpoints in this worker
+conditional_responses = ConditionalResponder()
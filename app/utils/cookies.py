@@ -38,4 +38,24 @@ def clear_auth_cookies(response: Response):
     response.delete_cookie(
         key="refresh_token",
         domain=settings.cookie_domain
+    )
+
+def set_session_cookie(response: Response, session_id: str):
+    """Set the opaque server-side session cookie"""
+    response.set_cookie(
+        key=settings.session_cookie_name,
+        value=session_id,
+        max_age=settings.refresh_token_expire_days * 24 * 60 * 60,
+        expires=datetime.now(timezone.utc) + timedelta(days=settings.refresh_token_expire_days),
+        domain=settings.cookie_domain,
+        secure=settings.cookie_secure,
+        httponly=settings.cookie_httponly,
+        samesite=settings.cookie_samesite
+    )
+
+def clear_session_cookie(response: Response):
+    """Clear the server-side session cookie"""
+    response.delete_cookie(
+        key=settings.session_cookie_name,
+        domain=settings.cookie_domain
     )
\ No newline at end of file
@@ -0,0 +1,46 @@
+# app/utils/http_client.py
+import importlib.util
+import httpx
+import logging
+from typing import Optional
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# HTTP/2 needs the optional h2 package (pip install "httpx[http2]")
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+class HTTPClient:
+    """Application-lifetime async HTTP client for outbound calls (Cognito hosted UI, JWKS).
+
+    Reusing one client keeps TCP+TLS connections alive between requests
+    instead of handshaking with the Cognito domain on every call.
+    """
+    _client: Optional[httpx.AsyncClient] = None
+
+    @classmethod
+    def get_client(cls) -> httpx.AsyncClient:
+        """Get or create the shared client"""
+        if cls._client is None or cls._client.is_closed:
+            cls._client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                timeout=httpx.Timeout(
+                    settings.http_read_timeout_seconds,
+                    connect=settings.http_connect_timeout_seconds
+                ),
+                limits=httpx.Limits(
+                    max_connections=settings.http_max_connections,
+                    max_keepalive_connections=settings.http_max_keepalive_connections,
+                    keepalive_expiry=settings.http_keepalive_expiry_seconds
+                )
+            )
+            logger.info(f"Shared HTTP client created (http2={HTTP2_AVAILABLE})")
+        return cls._client
+
+    @classmethod
+    async def close_client(cls):
+        """Close the shared client and its pooled connections"""
+        if cls._client:
+            await cls._client.aclose()
+            cls._client = None
+            logger.info("Shared HTTP client closed")
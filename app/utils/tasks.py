@@ -0,0 +1,13 @@
+# app/utils/tasks.py
+import asyncio
+import contextvars
+from typing import Any, Coroutine
+
+def create_detached_task(coro: Coroutine[Any, Any, Any]) -> asyncio.Task:
+    """Run coro as a task that doesn't inherit the caller's context variables.
+
+    create_task copies the current context, so work started from a request
+    would otherwise share that request's DB connection scope, write-pinning
+    and timing spans, even after the response has gone out.
+    """
+    return asyncio.get_running_loop().create_task(coro, context=contextvars.Context())
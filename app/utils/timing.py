@@ -0,0 +1,113 @@
+# app/utils/timing.py
+import asyncio
+import functools
+import random
+import time
+from contextvars import ContextVar, Token
+from typing import Any, Dict, List, Optional, Tuple
+from app.config import settings
+
+class RequestTimings:
+    """Named spans recorded while handling one request"""
+
+    __slots__ = ("started", "spans")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans: List[Tuple[str, float]] = []
+
+    def add(self, name: str, duration_ms: float):
+        self.spans.append((name, duration_ms))
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def totals(self) -> Dict[str, Dict[str, Any]]:
+        """Spans grouped by name, in first-seen order"""
+        totals: Dict[str, Dict[str, Any]] = {}
+        for name, duration_ms in self.spans:
+            total = totals.setdefault(name, {"dur": 0.0, "count": 0})
+            total["dur"] += duration_ms
+            total["count"] += 1
+        return totals
+
+    def server_timing(self, total_ms: float) -> str:
+        """Server-Timing header value, e.g. 'auth;dur=1.2, db.user_profile;dur=3.4, total;dur=9.8'"""
+        entries = []
+        for name, total in self.totals().items():
+            entry = f"{name};dur={total['dur']:.1f}"
+            count = total["count"]
+            if count > 1:
+                entry += f';desc="x{count}"'
+            entries.append(entry)
+        entries.append(f"total;dur={total_ms:.1f}")
+        return ", ".join(entries)
+
+# The current request's timings; None when timing is off or the request wasn't sampled
+_current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+def start_request_timings() -> Tuple[Optional[RequestTimings], Optional[Token]]:
+    """Start timing the current request if it is sampled.
+
+    Returns the timings and the token to pass to stop_request_timings, or
+    (None, None) when the request isn't sampled.
+    """
+    if random.random() >= settings.request_timing_sample_rate:
+        return None, None
+    timings = RequestTimings()
+    return timings, _current_timings.set(timings)
+
+def stop_request_timings(token: Token):
+    _current_timings.reset(token)
+
+class _Span:
+    __slots__ = ("timings", "name", "started")
+
+    def __init__(self, timings: RequestTimings, name: str):
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.timings.add(self.name, (time.perf_counter() - self.started) * 1000)
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return None
+
+_NOOP_SPAN = _NoopSpan()
+
+def span(name: str):
+    """Context manager recording a named span (works around awaits too).
+
+    Costs one ContextVar lookup when the request isn't being timed.
+    """
+    timings = _current_timings.get()
+    if timings is None:
+        return _NOOP_SPAN
+    return _Span(timings, name)
+
+def timed(name: str):
+    """Decorator recording every call of a sync or async function as a span"""
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,287 @@
+# benchmarks/auth_hot_path.py - Latency and throughput of the auth endpoints, in-process
+#
+#   DATABASE_URL=postgresql://localhost/betterbliss_bench \
+#   python -m benchmarks.auth_hot_path --latency-ms 50 --concurrency 1,10,50 --requests 500
+#
+# The FastAPI app runs in this process (httpx ASGITransport, lifespan included)
+# against a local fake Cognito served over TLS, which mints RS256 JWTs, serves
+# the JWKS and the hosted-UI token endpoint. Point DATABASE_URL at a local
+# Postgres with the schema from create_schema.py; without it the app's
+# development fallbacks skip the database and /auth/me cannot succeed.
+#
+# Results are written as JSON (--output); pass an earlier file to --compare to
+# print the change per endpoint and concurrency level. --set KEY=VALUE
+# overrides app settings for the run, e.g. --set session_mode=true.
+#
+# Baseline: auth_hot_path_baseline.json, recorded 2026-10-16 with the defaults
+# against PostgreSQL 18.6 over loopback on 1 vCPU. Compare new runs with
+# --compare benchmarks/auth_hot_path_baseline.json. Summary:
+#
+#   endpoint  conc       rps    p50 ms    p95 ms    p99 ms errors  cognito calls/request
+#   login        1      17.1     58.30     61.33     65.22      0  InitiateAuth=1.0
+#   login       10     111.5     90.06    113.02    120.03      0  InitiateAuth=1.0
+#   login       50     149.9    291.21    518.18    640.89      0  InitiateAuth=1.0
+#   me           1    1217.4      0.83      1.04      1.57      0  -
+#   me          10    1385.3      7.46      8.29      8.78      0  -
+#   me          50    1280.0     37.67     44.33     45.46      0  -
+#   refresh      1      17.7     56.07     59.57     68.47      0  InitiateAuth=1.0
+#   refresh     10     138.4     70.63     93.32    105.58      0  InitiateAuth=1.0
+#   refresh     50     234.4    205.79    277.02    343.20      0  InitiateAuth=1.0
+#   callback     1      16.5     59.35     68.56     77.21      0  oauth_token=1.0
+#   callback    10      96.5    103.86    123.23    129.70      0  oauth_token=1.0
+#   callback    50     146.2    272.95    595.74   1293.40      0  oauth_token=1.0
+#
+# /auth/me makes no Cognito call because login cached the identity from the
+# ID token. The app, the fake Cognito and Postgres share one core, so the
+# 50-way levels are CPU-bound and mostly measure queueing.
+import argparse
+import asyncio
+import datetime
+import http.cookiejar
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from http.cookies import SimpleCookie
+from typing import Any, Callable, Dict, List
+
+from benchmarks import configure_environment
+from benchmarks.fake_cognito import FakeCognito
+from benchmarks.oauth_token_exchange import write_self_signed_cert
+
+ENDPOINTS = ["login", "me", "refresh", "callback"]
+PASSWORD = "Password123!"
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+def summarize(endpoint: str, concurrency: int, timings: List[float], errors: int,
+              elapsed: float, cognito_calls: Dict[str, int]) -> Dict[str, Any]:
+    timings = sorted(timings)
+    completed = len(timings)
+    return {
+        "endpoint": endpoint,
+        "concurrency": concurrency,
+        "requests": completed + errors,
+        "errors": errors,
+        "rps": round(completed / elapsed, 1) if elapsed else None,
+        "mean_ms": round(statistics.fmean(timings), 2) if timings else None,
+        "p50_ms": round(percentile(timings, 0.50), 2) if timings else None,
+        "p95_ms": round(percentile(timings, 0.95), 2) if timings else None,
+        "p99_ms": round(percentile(timings, 0.99), 2) if timings else None,
+        "max_ms": round(timings[-1], 2) if timings else None,
+        # External calls the app made per request, by Cognito operation
+        "cognito_calls_per_request": {
+            operation: round(count / (completed + errors), 2)
+            for operation, count in sorted(cognito_calls.items()) if count
+        }
+    }
+
+def session_cookies(response) -> Dict[str, str]:
+    """Cookies set by a response, ignoring deletions"""
+    cookies = {}
+    for header in response.headers.get_list("set-cookie"):
+        for name, morsel in SimpleCookie(header).items():
+            if morsel.value and morsel.value != '""':
+                cookies[name] = morsel.value
+    return cookies
+
+def cookie_header(cookies: Dict[str, str]) -> Dict[str, str]:
+    return {"Cookie": "; ".join(f"{name}={value}" for name, value in cookies.items())}
+
+async def run_level(request: Callable[[int], Any], total: int, concurrency: int):
+    """Closed loop: concurrency workers issue requests back to back until total are done"""
+    timings: List[float] = []
+    errors = 0
+    next_index = 0
+
+    async def worker():
+        nonlocal errors, next_index
+        while next_index < total:
+            index = next_index
+            next_index += 1
+            started = time.perf_counter()
+            try:
+                ok = await request(index)
+            except Exception:
+                ok = False
+            if ok:
+                timings.append((time.perf_counter() - started) * 1000)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return timings, errors, time.perf_counter() - started
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+def print_results(results: List[Dict[str, Any]], baseline: Dict[Any, Dict[str, Any]]):
+    print(f"  {'endpoint':<9} {'conc':>4} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'errors':>6}  cognito calls/request")
+    for row in results:
+        calls = ", ".join(f"{op}={n}" for op, n in row["cognito_calls_per_request"].items()) or "-"
+        line = (f"  {row['endpoint']:<9} {row['concurrency']:>4} {row['rps'] or 0:>9.1f} "
+                f"{row['p50_ms'] or 0:>9.2f} {row['p95_ms'] or 0:>9.2f} {row['p99_ms'] or 0:>9.2f} "
+                f"{row['errors']:>6}  {calls}")
+        before = baseline.get((row["endpoint"], row["concurrency"]))
+        if before and before.get("rps") and row["rps"]:
+            line += (f"   [rps x{row['rps'] / before['rps']:.2f}, "
+                     f"p95 {before['p95_ms']:.2f} -> {row['p95_ms']:.2f} ms]")
+        print(line)
+
+async def main(args):
+    overrides = dict(item.split("=", 1) for item in args.set)
+    configure_environment()
+    issuer = (f"https://cognito-idp.{os.environ['AWS_REGION']}.amazonaws.com/"
+              f"{os.environ['COGNITO_USER_POOL_ID']}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        cert_path, key_path = write_self_signed_cert(directory)
+        fake = FakeCognito(
+            latency_ms=args.latency_ms,
+            jwt_issuer=issuer,
+            client_id=os.environ["COGNITO_CLIENT_ID"],
+            tls=(cert_path, key_path)
+        ).start()
+        host, port = fake.url.split("://")[1].split(":")
+
+        # botocore and httpx both have to trust the stub's certificate
+        os.environ["AWS_CA_BUNDLE"] = cert_path
+        os.environ["SSL_CERT_FILE"] = cert_path
+        configure_environment(
+            cognito_endpoint_url=fake.url,
+            cognito_domain=f"{host}:{port}",
+            cognito_jwks_url=fake.jwks_url,
+            cognito_max_workers=max(args.concurrency_levels),
+            **overrides
+        )
+        has_database = bool(os.getenv("DATABASE_URL"))
+        if not has_database:
+            print("WARNING: DATABASE_URL is not set - database steps fall back and /auth/me will fail\n")
+
+        import httpx
+        from app.main import app
+        from app.config import settings
+
+        logging.disable(logging.INFO)
+
+        users = [f"bench{i:05d}@example.com" for i in range(args.users)]
+        for email in users:
+            fake.add_user(email, PASSWORD, name=f"Bench User {email[5:10]}")
+
+        async with app.router.lifespan_context(app):
+            # Cookies are sent explicitly per virtual user, never shared through the jar
+            no_cookie_jar = http.cookiejar.CookieJar(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+            async with httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app),
+                base_url="http://benchmark",
+                cookies=no_cookie_jar
+            ) as client:
+
+                async def login(index):
+                    response = await client.post("/auth/login", json={
+                        "email": users[index % len(users)], "password": PASSWORD
+                    })
+                    return response.status_code == 200
+
+                # One signed-in session per user for /auth/me and /auth/refresh
+                sessions = []
+                for email in users:
+                    response = await client.post("/auth/login", json={"email": email, "password": PASSWORD})
+                    response.raise_for_status()
+                    sessions.append(session_cookies(response))
+
+                async def me(index):
+                    response = await client.get("/auth/me", headers=cookie_header(sessions[index % len(sessions)]))
+                    return response.status_code == 200
+
+                async def refresh(index):
+                    response = await client.post("/auth/refresh", headers=cookie_header(sessions[index % len(sessions)]))
+                    return response.status_code == 200
+
+                async def callback(index):
+                    code = fake.issue_code(users[index % len(users)])
+                    response = await client.get(f"/auth/callback?code={code}")
+                    return response.status_code == 302 and "/browse" in response.headers.get("location", "")
+
+                requests = {"login": login, "me": me, "refresh": refresh, "callback": callback}
+
+                results = []
+                for endpoint in args.endpoints:
+                    for concurrency in args.concurrency_levels:
+                        # Warm-up requests fill caches and connection pools, as in steady state
+                        await run_level(requests[endpoint], args.warmup, concurrency)
+                        calls_before = dict(fake.calls)
+                        timings, errors, elapsed = await run_level(requests[endpoint], args.requests, concurrency)
+                        calls = {op: n - calls_before.get(op, 0) for op, n in fake.calls.items()}
+                        results.append(summarize(endpoint, concurrency, timings, errors, elapsed, calls))
+
+        fake.stop()
+
+    report = {
+        "benchmark": "auth_hot_path",
+        "recorded_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "parameters": {
+            "latency_ms": args.latency_ms,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "users": args.users,
+            "database": has_database,
+            "settings": overrides,
+            "session_mode": settings.session_mode,
+            "jwt_local_verification": settings.jwt_local_verification
+        },
+        "results": results
+    }
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = {(row["endpoint"], row["concurrency"]): row for row in json.load(f)["results"]}
+
+    print(f"Fake Cognito latency {args.latency_ms:.0f} ms, {args.requests} requests per level, "
+          f"{args.users} users, database={has_database}")
+    print_results(results, baseline)
+
+    output = args.output or os.path.join(
+        "benchmarks", "results", f"auth_hot_path-{datetime.datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Auth endpoint latency/throughput benchmark")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Fake Cognito latency per call")
+    parser.add_argument("--concurrency", default="1,10,50", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=500, help="Measured requests per level")
+    parser.add_argument("--warmup", type=int, default=50, help="Unmeasured requests before each level")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS))
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE",
+                        help="Override an app setting for this run (repeatable)")
+    parser.add_argument("--output", help="JSON results path (default benchmarks/results/...)")
+    parser.add_argument("--compare", help="Earlier results JSON to compare against")
+    args = parser.parse_args()
+    args.concurrency_levels = [int(level) for level in args.concurrency.split(",")]
+    args.endpoints = [endpoint for endpoint in args.endpoints.split(",") if endpoint]
+    unknown = set(args.endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+    asyncio.run(main(args))
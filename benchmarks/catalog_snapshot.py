@@ -0,0 +1,141 @@
+# benchmarks/catalog_snapshot.py - Catalog reads: SQL per request vs the in-memory snapshot
+#
+#   DATABASE_URL=postgresql://localhost/betterbliss_bench python -m benchmarks.catalog_snapshot --content 5000
+#
+# Applies every migration in a scratch schema, seeds --content rows (the
+# content_search generator), builds a CatalogSnapshot from the
+# content.catalog_snapshot statement, then times each hot catalog read both
+# ways: the registered statement over one connection, and the snapshot
+# lookup. Prints the build time and the snapshot's memory report. The
+# scratch schema is dropped afterwards unless --keep is given.
+#
+# Results, 2026-10-16: PostgreSQL 18.6 over loopback on 1 vCPU, 500 iterations.
+#
+#   --content 5000: 5000 entries, query 76 ms, build 93 ms, 5,966,163 bytes
+#   (1,193 per entry: records 1.56 MB, values 3.61 MB, indexes 0.79 MB)
+#
+#   read                     sql mean    sql p95   snap mean    snap p95
+#   browse                   0.737 ms   1.015 ms   0.0444 ms   0.0869 ms
+#   browse free              0.823 ms   1.170 ms   0.0440 ms   0.0587 ms
+#   browse category free     1.033 ms   1.310 ms   0.0479 ms   0.0930 ms
+#   detail                   0.151 ms   0.250 ms   0.0106 ms   0.0149 ms
+#   streaming by slug        0.130 ms   0.213 ms   0.0009 ms   0.0013 ms
+#   id by slug               0.072 ms   0.118 ms   0.0008 ms   0.0012 ms
+#
+#   --content 50000 (the catalog_snapshot_max_rows default): query 798 ms,
+#   build 1138 ms, 61,413,915 bytes (1,228 per entry); snapshot reads stay
+#   under 0.07 ms mean against 0.07-1.14 ms for SQL.
+#
+# Lookups are 14-150x faster than the SQL round trip. The snapshot costs
+# ~1.2 KB per published row in each worker. The build runs on the event
+# loop, so near the row cap every rebuild stalls the worker for about a
+# second.
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+
+from benchmarks import configure_environment
+
+configure_environment()
+
+import asyncpg
+
+from app.database.migration_runner import MigrationRunner
+from app.database.statements import statement_registry
+from app.services.catalog_snapshot import CatalogSnapshot, DETAIL_FIELDS
+import app.services.content_service  # noqa: F401 - registers the content.* statements
+import app.services.streaming_service  # noqa: F401 - content.streaming_by_slug, content.id_by_slug
+from benchmarks.content_search import SEED_SQL, WORDS
+
+SCHEMA = "catalog_snapshot_bench"
+
+def summarize(timings):
+    timings.sort()
+    return statistics.fmean(timings), timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+
+async def time_sql(connection, name: str, args_for, iterations: int):
+    timings = []
+    for i in range(iterations):
+        args = args_for(i)
+        started = time.perf_counter()
+        await statement_registry.fetch(connection, name, *args)
+        timings.append((time.perf_counter() - started) * 1000)
+    return summarize(timings)
+
+def time_snapshot(lookup, args_for, iterations: int):
+    timings = []
+    for i in range(iterations):
+        args = args_for(i)
+        started = time.perf_counter()
+        lookup(*args)
+        timings.append((time.perf_counter() - started) * 1000)
+    return summarize(timings)
+
+async def main(args):
+    if not args.dsn:
+        raise SystemExit("Set DATABASE_URL (or --dsn) to a scratch database")
+
+    connection = await asyncpg.connect(args.dsn)
+    try:
+        await connection.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await connection.execute(f"CREATE SCHEMA {SCHEMA}")
+        await connection.execute(f"SET search_path = {SCHEMA}, public")
+        await MigrationRunner(connection).run()
+
+        print(f"Seeding {args.content} content rows...")
+        await connection.execute(SEED_SQL[0])
+        await connection.execute(SEED_SQL[1])
+        await connection.execute(SEED_SQL[2], args.content, WORDS)
+        await connection.execute("VACUUM ANALYZE content, experts, categories")
+
+        started = time.perf_counter()
+        rows = await statement_registry.fetch(connection, 'content.catalog_snapshot')
+        fetched = time.perf_counter()
+        snapshot = CatalogSnapshot(rows, version=1)
+        built = time.perf_counter()
+        print(f"Snapshot: {len(snapshot)} entries, query {(fetched - started) * 1000:.0f} ms, "
+              f"build {(built - fetched) * 1000:.0f} ms")
+        for key, value in snapshot.memory_report().items():
+            print(f"  {key:<16} {value:>12,}")
+        print()
+
+        slugs = random.sample(list(snapshot.by_slug), min(len(snapshot), args.iterations))
+        slug = lambda i: slugs[i % len(slugs)]
+        category = lambda i: sorted(snapshot.by_category)[i % len(snapshot.by_category)]
+        cases = [
+            ("browse", 'content.browse', lambda i: [args.limit],
+             snapshot.browse, lambda i: [None, False, args.limit]),
+            ("browse free", 'content.browse.free', lambda i: [args.limit],
+             snapshot.browse, lambda i: [None, True, args.limit]),
+            ("browse category free", 'content.browse.category.free', lambda i: [args.limit, category(i)],
+             snapshot.browse, lambda i: [category(i), True, args.limit]),
+            ("detail", 'content.detail', lambda i: [slug(i)],
+             lambda s: snapshot.get_by_slug(s).as_dict(DETAIL_FIELDS), lambda i: [slug(i)]),
+            ("streaming by slug", 'content.streaming_by_slug', lambda i: [slug(i)],
+             snapshot.get_by_slug, lambda i: [slug(i)]),
+            ("id by slug", 'content.id_by_slug', lambda i: [slug(i)],
+             snapshot.get_by_slug, lambda i: [slug(i)]),
+        ]
+
+        print(f"  {'read':<22} {'sql mean':>10} {'sql p95':>10} {'snap mean':>11} {'snap p95':>11}")
+        for label, name, sql_args, lookup, lookup_args in cases:
+            sql_mean, sql_p95 = await time_sql(connection, name, sql_args, args.iterations)
+            snap_mean, snap_p95 = time_snapshot(lookup, lookup_args, args.iterations)
+            print(f"  {label:<22} {sql_mean:>7.3f} ms {sql_p95:>7.3f} ms "
+                  f"{snap_mean:>8.4f} ms {snap_p95:>8.4f} ms")
+    finally:
+        if not args.keep:
+            await connection.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await connection.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Catalog snapshot vs SQL benchmark")
+    parser.add_argument("--dsn", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--content", type=int, default=5000)
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--keep", action="store_true", help="keep the scratch schema for inspection")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,68 @@
+# benchmarks/cognito_client.py - Concurrent login throughput, blocking vs async Cognito client
+#
+#   python -m benchmarks.cognito_client --latency-ms 50 --logins 200 --concurrency 50
+import argparse
+import asyncio
+import time
+
+from benchmarks import configure_environment
+from benchmarks.fake_cognito import FakeCognito
+
+async def run_logins(login, total: int, concurrency: int) -> float:
+    """Run total logins with at most concurrency in flight; return logins per second"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            await login(i)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return total / (time.perf_counter() - started)
+
+async def main(args):
+    fake = FakeCognito(latency_ms=args.latency_ms).start()
+    configure_environment(
+        cognito_endpoint_url=fake.url,
+        cognito_max_workers=args.concurrency
+    )
+
+    from app.auth.cognito import cognito_client, async_cognito_client
+
+    users = [f"user{i}@example.com" for i in range(args.users)]
+    for email in users:
+        fake.add_user(email, "Password123!")
+
+    # Before: the old route code, blocking boto3 calls straight from the event loop
+    async def blocking_login(i):
+        email = users[i % len(users)]
+        tokens = cognito_client.authenticate_user(email, "Password123!")
+        cognito_client.get_user_info(tokens["access_token"])
+
+    # After: the same calls through the executor-backed async client
+    async def async_login(i):
+        email = users[i % len(users)]
+        tokens = await async_cognito_client.authenticate_user(email, "Password123!")
+        await async_cognito_client.get_user_info(tokens["access_token"])
+
+    # Warm botocore's connection pool so both runs start from the same state
+    await run_logins(async_login, args.concurrency, args.concurrency)
+
+    before = await run_logins(blocking_login, args.logins, args.concurrency)
+    after = await run_logins(async_login, args.logins, args.concurrency)
+
+    print(f"Fake Cognito latency: {args.latency_ms:.0f} ms per call, "
+          f"{args.logins} logins, concurrency {args.concurrency}")
+    print(f"  blocking client: {before:8.1f} logins/s")
+    print(f"  async client:    {after:8.1f} logins/s  ({after / before:.1f}x)")
+
+    async_cognito_client.shutdown()
+    fake.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--users", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,153 @@
+# benchmarks/content_suggest.py - /content/suggest latency on a 100k-row catalog
+#
+#   DATABASE_URL=postgresql://localhost/betterbliss_bench python -m benchmarks.content_suggest --content 100000
+#
+# Applies every migration in a scratch schema and seeds it like
+# benchmarks.content_search (the suggest_terms triggers fill the terms
+# table). Then it times the suggest statement for partial words ("anxi",
+# "mindfu") and misspellings ("anxeity"), and checks every swapped-letter
+# misspelling of WORDS:
+#   db       every keystroke goes to Postgres (cache off)
+#   cached   the same skewed stream of keystrokes through a TTLCache sized
+#            like suggestion_cache, as ContentService.suggest does
+# The target is p99 under 10 ms. The scratch schema is dropped afterwards
+# unless --keep is given.
+#
+# Results, 2026-10-16: PostgreSQL 18.6 on 1 vCPU, defaults (100000 rows,
+# 5000 keystrokes, limit 8):
+#
+#   'anxi'     -> anxiety, anxiety grief, anxiety habits
+#   'mindfu'   -> mindfulness, Mindfulness, mindfulness rest
+#   'anxeity'  -> anxiety, self anxiety, rest anxiety
+#   'sle'      -> sleep, Sleep, sleep deep
+#   215 of 220 swapped-letter misspellings suggest the intended word
+#
+#   mode          p50       p95       p99   hit ratio
+#   db        1.28 ms   2.85 ms   3.40 ms   -
+#   cached    0.00 ms   1.03 ms   2.12 ms   0.9414
+#
+# The p99 < 10 ms target is met without the cache. Matching titles
+# directly missed it (db p99 201.67 ms, cached 107.76 ms): a 3-4 letter
+# prefix of a popular word matched ~5000 titles, and word_similarity ran on
+# every one. The 100k titles reduce to 1600 suggest_terms rows (40 words
+# and their pairs), so a prefix scores tens of candidates. The threshold of
+# 0.3 is what lets "anxeity" (0.375 to "anxiety") through; the 5 misses
+# are 5-6 letter words with the swap in the middle ("fcous", "enregy"),
+# which keep too few trigrams (0.20-0.29). Counting the terms of 100k
+# existing titles takes about 4 s.
+import argparse
+import asyncio
+import os
+import random
+import time
+
+from benchmarks import configure_environment
+
+configure_environment()
+
+import asyncpg
+
+from app.config import settings
+from app.database.migration_runner import MigrationRunner
+from app.database.statements import statement_registry
+from app.services.content_service import normalize_prefix
+from app.utils.cache import TTLCache
+from benchmarks.content_search import SEED_SQL, WORDS
+
+SCHEMA = "content_suggest_bench"
+
+def typo(word: str) -> str:
+    """Swap two neighbouring letters"""
+    index = random.randrange(1, len(word) - 1)
+    return word[:index - 1] + word[index] + word[index - 1] + word[index + 1:]
+
+def transpositions(word: str):
+    """Every misspelling typo() can make of word"""
+    return {word[:index - 1] + word[index] + word[index - 1] + word[index + 1:]
+            for index in range(1, len(word) - 1)} - {word}
+
+def keystrokes(count: int):
+    """Prefixes as typed: mostly 3-6 letters of popular words, some misspelt.
+
+    Word popularity is skewed (a few words get most of the traffic), which
+    is what makes a small prefix cache worthwhile.
+    """
+    weights = [1 / (rank + 1) for rank in range(len(WORDS))]
+    for _ in range(count):
+        word = random.choices(WORDS, weights)[0]
+        if random.random() < 0.1 and len(word) > 4:
+            yield typo(word)
+        else:
+            yield word[:random.randint(3, min(6, len(word)))]
+
+def percentiles(timings):
+    timings = sorted(timings)
+    pick = lambda fraction: timings[min(len(timings) - 1, int(len(timings) * fraction))]
+    return pick(0.5), pick(0.95), pick(0.99)
+
+async def run(connection, prefixes, limit: int, cache=None):
+    timings = []
+    for prefix in prefixes:
+        started = time.perf_counter()
+        key = (normalize_prefix(prefix), True, limit)
+        if cache is None or cache.get(key) is None:
+            rows = await statement_registry.fetch(connection, 'content.suggest.free', key[0], limit)
+            if cache is not None:
+                cache.set(key, [dict(row) for row in rows])
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+async def main(args):
+    if not args.dsn:
+        raise SystemExit("Set DATABASE_URL (or --dsn) to a scratch database")
+
+    connection = await asyncpg.connect(args.dsn)
+    try:
+        await connection.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await connection.execute(f"CREATE SCHEMA {SCHEMA}")
+        await connection.execute(f"SET search_path = {SCHEMA}, public")
+        await MigrationRunner(connection).run()
+
+        print(f"Seeding {args.content} content rows...")
+        await connection.execute(SEED_SQL[0])
+        await connection.execute(SEED_SQL[1])
+        await connection.execute(SEED_SQL[2], args.content, WORDS)
+        await connection.execute("VACUUM ANALYZE content, experts, categories, suggest_terms")
+
+        for prefix in ("anxi", "mindfu", "anxeity", "sle"):
+            rows = await statement_registry.fetch(connection, 'content.suggest.free', prefix, args.limit)
+            print(f"  {prefix!r:<10} -> {', '.join(row['label'] for row in rows[:3])}")
+
+        misspelt = [(word, typo) for word in WORDS if len(word) > 4 for typo in sorted(transpositions(word))]
+        found = 0
+        for word, misspelling in misspelt:
+            rows = await statement_registry.fetch(connection, 'content.suggest.free', misspelling, args.limit)
+            found += any(word in row['label'].lower().split() for row in rows)
+        print(f"  {found} of {len(misspelt)} swapped-letter misspellings suggest the intended word")
+
+        random.seed(args.seed)
+        prefixes = list(keystrokes(args.requests))
+        await run(connection, prefixes[:args.warmup], args.limit)
+
+        cache = TTLCache(settings.content_suggest_cache_max_entries, settings.content_suggest_cache_ttl_seconds)
+        print(f"\n{args.requests} keystrokes, limit {args.limit}")
+        print(f"  {'mode':<7} {'p50':>9} {'p95':>9} {'p99':>9}   hit ratio")
+        for mode, mode_cache in (("db", None), ("cached", cache)):
+            p50, p95, p99 = percentiles(await run(connection, prefixes, args.limit, mode_cache))
+            hit_ratio = mode_cache.stats()["hit_ratio"] if mode_cache else None
+            print(f"  {mode:<7} {p50:>6.2f} ms {p95:>6.2f} ms {p99:>6.2f} ms   {hit_ratio if hit_ratio is not None else '-'}")
+    finally:
+        if not args.keep:
+            await connection.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await connection.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Content suggest latency benchmark")
+    parser.add_argument("--dsn", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--content", type=int, default=100000)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--keep", action="store_true", help="keep the scratch schema for inspection")
+    asyncio.run(main(parser.parse_args()))
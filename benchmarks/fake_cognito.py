@@ -0,0 +1,334 @@
+# benchmarks/fake_cognito.py - Local stand-in for the Cognito user pool API
+import hashlib
+import json
+import ssl
+import threading
+import time
+import urllib.parse
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional, Tuple
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+from jose.utils import base64url_encode
+
+class CognitoError(Exception):
+    def __init__(self, code: str, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+class FakeCognito:
+    """In-memory Cognito user pool served over HTTP with injected latency.
+
+    Speaks the AWS JSON protocol boto3 uses (X-Amz-Target header), so the real
+    CognitoClient can talk to it through COGNITO_ENDPOINT_URL.
+
+    Tokens are opaque strings unless jwt_issuer and client_id are given; then
+    they are RS256 JWTs shaped like Cognito's, the signing key is served at
+    /.well-known/jwks.json and the hosted-UI token endpoint at /oauth2/token.
+    With tls=(cert_path, key_path) everything is served over HTTPS.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 50.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        jwt_issuer: Optional[str] = None,
+        client_id: Optional[str] = None,
+        tls: Optional[Tuple[str, str]] = None
+    ):
+        self.latency = latency_ms / 1000.0
+        self.jwt_issuer = jwt_issuer
+        self.client_id = client_id
+        self.users: Dict[str, Dict[str, Any]] = {}
+        self.access_tokens: Dict[str, str] = {}
+        self.refresh_tokens: Dict[str, Tuple[str, str]] = {}
+        self.auth_codes: Dict[str, str] = {}
+        self.calls: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._signing_key = self._generate_signing_key() if jwt_issuer else None
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        if tls:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(*tls)
+            self._server.socket = context.wrap_socket(self._server.socket, server_side=True)
+        self._scheme = "https" if tls else "http"
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"{self._scheme}://{host}:{port}"
+
+    @property
+    def jwks_url(self) -> str:
+        return f"{self.url}/.well-known/jwks.json"
+
+    def start(self) -> "FakeCognito":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def add_user(self, email: str, password: str, name: str = "Benchmark User", **attributes) -> str:
+        """Create a confirmed user directly and return its sub"""
+        sub = str(uuid.uuid4())
+        with self._lock:
+            self.users[email] = {
+                "password": password,
+                "confirmed": True,
+                "attributes": {
+                    "sub": sub,
+                    "email": email,
+                    "name": name,
+                    "custom:role": "free_user",
+                    "custom:subscription_tier": "free",
+                    "custom:permissions": "[]",
+                    **attributes
+                }
+            }
+        return sub
+
+    def issue_code(self, email: str) -> str:
+        """Create a single-use authorization code, as the hosted UI would after sign-in"""
+        code = str(uuid.uuid4())
+        with self._lock:
+            self.auth_codes[code] = email
+        return code
+
+    # Cognito operations
+
+    def SignUp(self, body):
+        email = body["Username"]
+        with self._lock:
+            if email in self.users:
+                raise CognitoError("UsernameExistsException", "User already exists")
+            sub = str(uuid.uuid4())
+            attributes = {attr["Name"]: attr["Value"] for attr in body.get("UserAttributes", [])}
+            attributes["sub"] = sub
+            self.users[email] = {"password": body["Password"], "confirmed": False, "attributes": attributes}
+        return {"UserSub": sub, "UserConfirmed": False}
+
+    def AdminConfirmSignUp(self, body):
+        with self._lock:
+            user = self.users.get(body["Username"])
+            if not user:
+                raise CognitoError("UserNotFoundException", "User does not exist")
+            user["confirmed"] = True
+        return {}
+
+    def InitiateAuth(self, body):
+        params = body["AuthParameters"]
+        if body["AuthFlow"] == "REFRESH_TOKEN_AUTH":
+            session = self.refresh_tokens.get(params["REFRESH_TOKEN"])
+            if not session:
+                raise CognitoError("NotAuthorizedException", "Invalid Refresh Token")
+            email, origin_jti = session
+            return {"AuthenticationResult": self._issue_tokens(email, origin_jti=origin_jti)}
+
+        user = self.users.get(params["USERNAME"])
+        if not user or user["password"] != params["PASSWORD"]:
+            raise CognitoError("NotAuthorizedException", "Incorrect username or password")
+        if not user["confirmed"]:
+            raise CognitoError("UserNotConfirmedException", "User is not confirmed")
+        return {"AuthenticationResult": self._issue_tokens(params["USERNAME"])}
+
+    def GetUser(self, body):
+        email = self.access_tokens.get(body["AccessToken"])
+        if not email:
+            raise CognitoError("NotAuthorizedException", "Invalid Access Token")
+        attributes = self.users[email]["attributes"]
+        return {
+            "Username": email,
+            "UserAttributes": [{"Name": k, "Value": v} for k, v in attributes.items()]
+        }
+
+    def GlobalSignOut(self, body):
+        email = self.access_tokens.get(body["AccessToken"])
+        if not email:
+            raise CognitoError("NotAuthorizedException", "Invalid Access Token")
+        with self._lock:
+            for token in [t for t, owner in self.access_tokens.items() if owner == email]:
+                del self.access_tokens[token]
+            for token in [t for t, (owner, _) in self.refresh_tokens.items() if owner == email]:
+                del self.refresh_tokens[token]
+        return {}
+
+    def ListUsers(self, body):
+        # Pagination tokens are offsets into the users sorted by email
+        limit = min(int(body.get("Limit", 60)), 60)
+        start = int(body.get("PaginationToken") or 0)
+        with self._lock:
+            emails = sorted(self.users)[start:start + limit]
+            users = [
+                {
+                    "Username": email,
+                    "Attributes": [{"Name": k, "Value": v} for k, v in self.users[email]["attributes"].items()],
+                    "Enabled": True,
+                    "UserStatus": "CONFIRMED" if self.users[email]["confirmed"] else "UNCONFIRMED"
+                }
+                for email in emails
+            ]
+            more = start + limit < len(self.users)
+        result = {"Users": users}
+        if more:
+            result["PaginationToken"] = str(start + limit)
+        return result
+
+    def _issue_tokens(self, email: str, origin_jti: Optional[str] = None) -> Dict[str, Any]:
+        """Tokens for a sign-in; refreshes pass the sign-in's origin_jti and get no refresh token"""
+        include_refresh = origin_jti is None
+        origin_jti = origin_jti or str(uuid.uuid4())
+        if self._signing_key:
+            access_token, id_token = self._mint_jwts(email, origin_jti)
+        else:
+            access_token, id_token = f"access-{uuid.uuid4()}", f"id-{uuid.uuid4()}"
+
+        result = {
+            "AccessToken": access_token,
+            "IdToken": id_token,
+            "ExpiresIn": 3600,
+            "TokenType": "Bearer"
+        }
+        with self._lock:
+            self.access_tokens[access_token] = email
+            if include_refresh:
+                refresh_token = f"refresh-{uuid.uuid4()}"
+                self.refresh_tokens[refresh_token] = (email, origin_jti)
+                result["RefreshToken"] = refresh_token
+        return result
+
+    @staticmethod
+    def _generate_signing_key():
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        private_pem = private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption()
+        ).decode()
+        public_pem = private_key.public_key().public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo
+        ).decode()
+        public_jwk = jwk.construct(public_pem, algorithm="RS256").to_dict()
+        public_jwk.update({"kid": "fake-cognito-key", "use": "sig"})
+        # A constructed key signs in ~1 ms; passing the PEM re-parses it on every token
+        return jwk.construct(private_pem, algorithm="RS256"), public_jwk
+
+    def _mint_jwts(self, email: str, origin_jti: str) -> Tuple[str, str]:
+        """Access and ID tokens with the claims Cognito puts in each"""
+        signing_key, public_jwk = self._signing_key
+        headers = {"kid": public_jwk["kid"]}
+        attributes = self.users[email]["attributes"]
+        now = int(time.time())
+        common = {"sub": attributes["sub"], "iss": self.jwt_issuer, "origin_jti": origin_jti,
+                  "event_id": str(uuid.uuid4()), "auth_time": now, "iat": now, "exp": now + 3600}
+
+        access_token = jwt.encode({
+            **common,
+            "token_use": "access",
+            "client_id": self.client_id,
+            "scope": "aws.cognito.signin.user.admin",
+            "jti": str(uuid.uuid4()),
+            "username": email
+        }, signing_key, algorithm="RS256", headers=headers)
+
+        at_hash = base64url_encode(hashlib.sha256(access_token.encode()).digest()[:16]).decode()
+        id_token = jwt.encode({
+            **common,
+            **{k: v for k, v in attributes.items() if k != "sub"},
+            "token_use": "id",
+            "aud": self.client_id,
+            "at_hash": at_hash,
+            "email_verified": True,
+            "cognito:username": email
+        }, signing_key, algorithm="RS256", headers=headers)
+
+        return access_token, id_token
+
+    # Hosted UI endpoints
+
+    def oauth_token(self, form: Dict[str, str]) -> Dict[str, Any]:
+        if form.get("grant_type") != "authorization_code":
+            raise CognitoError("unsupported_grant_type", "Only authorization_code is supported")
+        with self._lock:
+            email = self.auth_codes.pop(form.get("code", ""), None)
+        if not email:
+            raise CognitoError("invalid_grant", "Invalid authorization code")
+        tokens = self._issue_tokens(email)
+        return {
+            "access_token": tokens["AccessToken"],
+            "id_token": tokens["IdToken"],
+            "refresh_token": tokens["RefreshToken"],
+            "expires_in": tokens["ExpiresIn"],
+            "token_type": "Bearer"
+        }
+
+    def jwks(self) -> Dict[str, Any]:
+        return {"keys": [self._signing_key[1]] if self._signing_key else []}
+
+    def _count(self, operation: str):
+        with self._lock:
+            self.calls[operation] = self.calls.get(operation, 0) + 1
+
+    def _dispatch(self, operation: str, body: Dict[str, Any]):
+        self._count(operation)
+        time.sleep(self.latency)
+        handler = getattr(self, operation, None)
+        if handler is None or not (operation[0].isupper() or operation == "oauth_token"):
+            raise CognitoError("InvalidAction", f"Unsupported operation: {operation}")
+        return handler(body)
+
+    def _handler_class(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                if self.path == "/.well-known/jwks.json":
+                    fake._count("jwks")
+                    self._reply(200, fake.jwks(), "application/json")
+                else:
+                    self._reply(404, {"message": "Not found"}, "application/json")
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                raw = self.rfile.read(length)
+                if self.path == "/oauth2/token":
+                    form = dict(urllib.parse.parse_qsl(raw.decode()))
+                    try:
+                        self._reply(200, fake._dispatch("oauth_token", form), "application/json")
+                    except CognitoError as e:
+                        self._reply(400, {"error": e.code}, "application/json")
+                    return
+
+                body = json.loads(raw or b"{}")
+                operation = self.headers.get("X-Amz-Target", "").split(".")[-1]
+                try:
+                    self._reply(200, fake._dispatch(operation, body))
+                except CognitoError as e:
+                    self._reply(400, {"__type": e.code, "message": e.message})
+
+            def _reply(self, status: int, payload: Dict[str, Any],
+                       content_type: str = "application/x-amz-json-1.1"):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
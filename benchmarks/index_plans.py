@@ -0,0 +1,219 @@
+# benchmarks/index_plans.py - Hot query plans before and after the index migrations
+#
+#   DATABASE_URL=postgresql://localhost/betterbliss_bench python -m benchmarks.index_plans --content 50000
+#
+# Builds the baseline schema (migration 0001) in a scratch schema, seeds it,
+# and runs every hot query under EXPLAIN (ANALYZE, BUFFERS). Then applies the
+# remaining migrations and does the same again. The scratch schema is dropped
+# afterwards unless --keep is given; nothing outside it is touched.
+#
+# Results, 2026-10-16: PostgreSQL 18.6 on 1 vCPU, defaults (50000 content,
+# 500000 events, 100000 subscribers); best of 5 EXPLAIN ANALYZE runs.
+#
+#   query                     before     after    buffers
+#   browse                   2.88 ms   0.09 ms    951 -> 69
+#       before: Index Scan idx_content_featured; Index Scan experts_pkey; Index Scan categories_pkey
+#       after:  Index Scan idx_content_browse; Index Scan experts_pkey; Index Scan categories_pkey
+#   browse free              2.06 ms   0.09 ms    951 -> 76
+#       before: Index Scan idx_content_featured; ...
+#       after:  Index Scan idx_content_browse_free; ...
+#   browse category          1.52 ms   0.24 ms    924 -> 172
+#       before: Index Scan idx_content_featured; Seq Scan categories; Index Scan experts_pkey
+#       after:  Index Scan idx_content_browse; Seq Scan categories; Index Scan experts_pkey
+#   browse category free     1.27 ms   0.22 ms    912 -> 201
+#       before: Index Scan idx_content_featured; Seq Scan categories; Index Scan experts_pkey
+#       after:  Index Scan idx_content_browse_free; Seq Scan categories; Index Scan experts_pkey
+#   user progress            0.79 ms   0.47 ms    388 -> 385
+#       before: Bitmap Heap Scan video_analytics; Bitmap Index Scan idx_video_analytics_user; ...
+#       after:  Index Only Scan idx_video_analytics_user_progress; Index Scan content_pkey
+#   progress for content     0.06 ms   0.01 ms     11 -> 4
+#       before: Bitmap Heap Scan video_analytics; Bitmap Index Scan idx_video_analytics_user;
+#               Bitmap Index Scan idx_video_analytics_content
+#       after:  Index Only Scan idx_video_analytics_user_progress
+#   newsletter stats       140.54 ms 140.42 ms   2326 -> 2326
+#       before/after: Seq Scan newsletter_subscribers
+#   newsletter top sources  33.66 ms  15.94 ms   2326 -> 63
+#       before: Seq Scan newsletter_subscribers
+#       after:  Index Only Scan idx_newsletter_status_source
+#   newsletter active count 11.63 ms  12.64 ms     57 -> 63
+#       before: Index Only Scan idx_newsletter_status
+#       after:  Index Only Scan idx_newsletter_status_source
+#   newsletter recent        0.03 ms   0.06 ms     52 -> 52
+#       before/after: Index Scan idx_newsletter_created
+#
+# Category browses walk idx_content_browse[_free] and skip other
+# categories' rows; with 8 categories that is a few hundred rows. An earlier
+# run with category_id-leading indexes showed the planner ignoring them for
+# this plan, so 0002 no longer builds them. newsletter.stats is not an index
+# target: it counts every row, and COUNT(DISTINCT source) sorts them all
+# (with enable_seqscan off a covering created_at index only brought it to
+# ~110 ms). newsletter.recent reads wide rows, so it keeps the baseline
+# created_at index.
+import argparse
+import asyncio
+import json
+import os
+
+from benchmarks import configure_environment
+
+configure_environment()
+
+import asyncpg
+
+from app.database.migration_runner import MigrationRunner
+from app.database.statements import statement_registry
+import app.services.content_service  # noqa: F401 - registers the content.* statements
+import app.services.streaming_service  # noqa: F401 - video_analytics.*
+import app.routes.newsletter  # noqa: F401 - newsletter.*
+
+SCHEMA = "index_plans_bench"
+
+SEED_SQL = [
+    """
+    INSERT INTO categories (name, slug, sort_order)
+    SELECT 'Category ' || g, 'category-' || g, g FROM generate_series(1, 8) g
+    """,
+    """
+    INSERT INTO experts (name, slug, featured)
+    SELECT 'Expert ' || g, 'expert-' || g, g % 10 = 0 FROM generate_series(1, 50) g
+    """,
+    # 90% published, 60% free, 2% featured, created over two years
+    """
+    INSERT INTO content (title, slug, description, category_id, expert_id,
+                         access_tier, featured, status, duration_seconds, created_at)
+    SELECT 'Content ' || g, 'content-' || g, repeat('A calm, practical session. ', 12),
+           cat.ids[1 + (random() * (array_length(cat.ids, 1) - 1))::int],
+           ex.ids[1 + (random() * (array_length(ex.ids, 1) - 1))::int],
+           CASE WHEN random() < 0.6 THEN 'free' ELSE 'premium' END,
+           random() < 0.02,
+           CASE WHEN random() < 0.9 THEN 'published' ELSE 'draft' END,
+           300 + (random() * 3000)::int,
+           now() - random() * interval '730 days'
+    FROM generate_series(1, $1) g,
+         (SELECT array_agg(id) AS ids FROM categories) cat,
+         (SELECT array_agg(id) AS ids FROM experts) ex
+    """,
+    """
+    INSERT INTO users (cognito_sub, email)
+    SELECT 'sub-' || g, 'user' || g || '@example.com' FROM generate_series(1, $1) g
+    """,
+    # Events concentrate on the 2000 most popular videos
+    """
+    INSERT INTO video_analytics (content_id, user_id, session_id, event_type,
+                                 timestamp_seconds, watch_duration_seconds, created_at)
+    SELECT co.ids[1 + (random() * (array_length(co.ids, 1) - 1))::int],
+           us.ids[1 + (random() * (array_length(us.ids, 1) - 1))::int],
+           'session-' || g, 'progress', random() * 3000, (random() * 60)::int,
+           now() - random() * interval '180 days'
+    FROM generate_series(1, $1) g,
+         (SELECT array_agg(id) AS ids FROM (SELECT id FROM content LIMIT 2000) popular) co,
+         (SELECT array_agg(id) AS ids FROM users) us
+    """,
+    """
+    INSERT INTO newsletter_subscribers (email, source, status, metadata, created_at)
+    SELECT 'reader' || g || '@example.com', 'source-' || (g % 12),
+           CASE WHEN random() < 0.7 THEN 'active' WHEN random() < 0.8 THEN 'pending' ELSE 'unsubscribed' END,
+           '{"utm_campaign": "spring", "referrer": "https://example.com/articles"}'::jsonb,
+           now() - random() * interval '365 days'
+    FROM generate_series(1, $1) g
+    """,
+]
+
+async def hot_queries(connection):
+    """(label, statement name, args) for each query the migrations target"""
+    user_id, content_id = await connection.fetchrow("""
+        SELECT user_id, content_id FROM video_analytics
+        GROUP BY user_id, content_id ORDER BY count(*) DESC LIMIT 1
+    """)
+    return [
+        ("browse", 'content.browse', [20]),
+        ("browse free", 'content.browse.free', [20]),
+        ("browse category", 'content.browse.category', [20, 'category-3']),
+        ("browse category free", 'content.browse.category.free', [20, 'category-3']),
+        ("user progress", 'video_analytics.progress', [user_id]),
+        ("progress for content", 'video_analytics.progress_for_content', [user_id, content_id]),
+        ("newsletter stats", 'newsletter.stats', []),
+        ("newsletter top sources", 'newsletter.top_sources', []),
+        ("newsletter active count", 'newsletter.count_active', []),
+        ("newsletter recent", 'newsletter.recent', []),
+    ]
+
+def scan_nodes(plan) -> list:
+    """Scan nodes of a plan tree, e.g. 'Index Only Scan idx_newsletter_status_source'"""
+    nodes = []
+    if "Scan" in plan["Node Type"]:
+        nodes.append(f"{plan['Node Type']} {plan.get('Index Name') or plan.get('Relation Name')}")
+    for child in plan.get("Plans", []):
+        nodes.extend(scan_nodes(child))
+    return nodes
+
+async def explain(connection, name: str, args, runs: int):
+    """Fastest of several EXPLAIN ANALYZE runs: execution ms, buffers, scan nodes"""
+    best = None
+    for _ in range(runs):
+        result = await connection.fetchval(
+            "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + statement_registry.query(name), *args
+        )
+        plan = (json.loads(result) if isinstance(result, str) else result)[0]
+        if best is None or plan["Execution Time"] < best["Execution Time"]:
+            best = plan
+    root = best["Plan"]
+    return {
+        "ms": best["Execution Time"],
+        "buffers": root.get("Shared Hit Blocks", 0) + root.get("Shared Read Blocks", 0),
+        "scans": scan_nodes(root)
+    }
+
+async def measure(connection, queries, runs: int):
+    # Fresh statistics, and a visibility map so index-only scans are possible
+    await connection.execute("VACUUM ANALYZE categories, experts, content, users, "
+                             "video_analytics, newsletter_subscribers")
+    return {label: await explain(connection, name, args, runs) for label, name, args in queries}
+
+async def main(args):
+    if not args.dsn:
+        raise SystemExit("Set DATABASE_URL (or --dsn) to a scratch database")
+
+    connection = await asyncpg.connect(args.dsn)
+    try:
+        await connection.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await connection.execute(f"CREATE SCHEMA {SCHEMA}")
+        # uuid-ossp lives in public; everything the migrations create lands in the scratch schema
+        await connection.execute(f"SET search_path = {SCHEMA}, public")
+
+        runner = MigrationRunner(connection)
+        await runner.run(target="0001")
+        print(f"Seeding {args.content} content rows, {args.events} video events, "
+              f"{args.subscribers} newsletter subscribers...")
+        sizes = [None, None, args.content, args.users, args.events, args.subscribers]
+        for sql, size in zip(SEED_SQL, sizes):
+            await (connection.execute(sql, size) if size else connection.execute(sql))
+
+        queries = await hot_queries(connection)
+        before = await measure(connection, queries, args.runs)
+        applied = await runner.run()
+        after = await measure(connection, queries, args.runs)
+        print(f"Applied {', '.join(m.version + '_' + m.name for m in applied)}\n")
+
+        print(f"  {'query':<24} {'before':>10} {'after':>10}   {'buffers':>15}")
+        for label, _, _ in queries:
+            old, new = before[label], after[label]
+            print(f"  {label:<24} {old['ms']:>7.2f} ms {new['ms']:>7.2f} ms   "
+                  f"{old['buffers']:>6} -> {new['buffers']:<6}")
+            print(f"      before: {'; '.join(old['scans'])}")
+            print(f"      after:  {'; '.join(new['scans'])}")
+    finally:
+        if not args.keep:
+            await connection.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await connection.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hot query plans before/after the index migrations")
+    parser.add_argument("--dsn", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--content", type=int, default=50000)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--events", type=int, default=500000)
+    parser.add_argument("--subscribers", type=int, default=100000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--keep", action="store_true", help="keep the scratch schema for inspection")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,142 @@
+# benchmarks/oauth_token_exchange.py - OAuth callback token exchange latency against a local TLS stub
+#
+#   python -m benchmarks.oauth_token_exchange --exchanges 200 --connect-latency-ms 20
+#
+# --connect-latency-ms is charged once per new TCP connection, standing in for
+# the extra round trips a fresh TCP+TLS handshake costs against the real domain.
+import argparse
+import asyncio
+import datetime
+import ipaddress
+import json
+import os
+import ssl
+import statistics
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+
+from benchmarks import configure_environment
+
+def write_self_signed_cert(directory: str):
+    """Create a certificate for 127.0.0.1 and return (cert_path, key_path)"""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]), critical=False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path = os.path.join(directory, "stub.crt")
+    key_path = os.path.join(directory, "stub.key")
+    with open(cert_path, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.TraditionalOpenSSL,
+            serialization.NoEncryption()
+        ))
+    return cert_path, key_path
+
+class TokenEndpointHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    connect_latency = 0.0
+
+    def setup(self):
+        # Runs once per accepted connection
+        time.sleep(self.connect_latency)
+        super().setup()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = json.dumps({
+            "access_token": "stub-access-token",
+            "id_token": "stub-id-token",
+            "refresh_token": "stub-refresh-token",
+            "expires_in": 3600,
+            "token_type": "Bearer"
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_tls_stub(cert_path: str, key_path: str, connect_latency_ms: float) -> ThreadingHTTPServer:
+    TokenEndpointHandler.connect_latency = connect_latency_ms / 1000.0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), TokenEndpointHandler)
+    server.daemon_threads = True
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert_path, key_path)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+async def time_calls(call, count: int):
+    timings = []
+    for _ in range(count):
+        started = time.perf_counter()
+        await call()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return timings
+
+def report(label, timings):
+    print(f"  {label:<34} mean {statistics.fmean(timings):7.2f} ms   "
+          f"p50 {timings[len(timings) // 2]:7.2f} ms   p95 {timings[int(len(timings) * 0.95)]:7.2f} ms")
+
+async def main(args):
+    with tempfile.TemporaryDirectory() as directory:
+        cert_path, key_path = write_self_signed_cert(directory)
+        server = start_tls_stub(cert_path, key_path, args.connect_latency_ms)
+        host, port = server.server_address[:2]
+
+        # httpx trusts SSL_CERT_FILE, so the app's own client code is measured unchanged
+        os.environ["SSL_CERT_FILE"] = cert_path
+        configure_environment(cognito_domain=f"{host}:{port}")
+
+        from app.auth.cognito import cognito_client, async_cognito_client
+        from app.utils.http_client import HTTPClient, HTTP2_AVAILABLE
+
+        async def one_off_sync():
+            # The previous implementation: a new connection per call, blocking the loop
+            token_url, data, headers = cognito_client._token_request("code")
+            httpx.post(token_url, data=data, headers=headers).raise_for_status()
+
+        async def pooled_async():
+            await async_cognito_client.exchange_code_for_tokens("code")
+
+        print(f"{args.exchanges} sequential token exchanges, "
+              f"{args.connect_latency_ms:.0f} ms per new connection, http2={HTTP2_AVAILABLE}")
+        report("one-off httpx.post (before)", await time_calls(one_off_sync, args.exchanges))
+        report("shared AsyncClient (after)", await time_calls(pooled_async, args.exchanges))
+
+        await HTTPClient.close_client()
+        async_cognito_client.shutdown()
+        server.shutdown()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OAuth token exchange latency benchmark")
+    parser.add_argument("--exchanges", type=int, default=200)
+    parser.add_argument("--connect-latency-ms", type=float, default=20.0)
+    asyncio.run(main(parser.parse_args()))
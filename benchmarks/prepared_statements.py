@@ -0,0 +1,161 @@
+# benchmarks/prepared_statements.py - Login and browse query latency with and without the statement registry
+#
+#   DATABASE_URL=postgresql://localhost/betterbliss_bench python -m benchmarks.prepared_statements --iterations 2000
+#
+# Needs a database with the schema from create_schema.py (ideally some content
+# rows). Login writes run inside a transaction that is rolled back.
+#
+# Three ways of running the same registered SQL, each on its own connection:
+#   unprepared  statement cache off (pgbouncer transaction mode): Parse on every call
+#   cached      asyncpg's statement cache, as before the registry: Parse on first use per connection
+#   registry    pool connection init: every registered statement parsed before the first request
+#
+# "first" is the first login/browse on a freshly opened connection, averaged over
+# --connections connections; "steady" is the per-path latency after that.
+#
+# Results, 2026-10-16: PostgreSQL 18.6 over loopback on 1 vCPU, all migrations
+# applied, 5000 content rows (benchmarks.content_search seed), defaults:
+#
+#   mode          connect   path        first      mean       p50       p95
+#   unprepared    4.29 ms   login    2.680 ms  0.854 ms  0.807 ms  1.165 ms
+#   unprepared    4.29 ms   browse   6.477 ms  2.956 ms  2.848 ms  3.587 ms
+#   cached        3.92 ms   login    2.522 ms  0.227 ms  0.217 ms  0.274 ms
+#   cached        3.92 ms   browse   6.422 ms  1.659 ms  1.577 ms  2.231 ms
+#   registry     15.38 ms   login    1.272 ms  0.351 ms  0.329 ms  0.456 ms
+#   registry     15.38 ms   browse   4.979 ms  2.015 ms  2.140 ms  2.578 ms
+#
+# Two more runs put registry login at 0.26-0.36 ms mean against 0.25-0.28 ms
+# for cached, and browse at 1.88-1.91 ms against 1.74-1.78 ms. The registry's
+# gain is the first request on a new connection: login is 1.1-1.5 ms instead
+# of 2.5-3.0 ms, and browse is ~25% faster. It pays ~10 ms more per connection
+# to prepare all 25 statements up front. In steady state it matches asyncpg's
+# own statement cache, or is slightly slower because of the per-call stats.
+# Both are 2-3x faster than unprepared (pgbouncer transaction mode).
+import argparse
+import asyncio
+import os
+import statistics
+import time
+import uuid
+
+from benchmarks import configure_environment
+
+configure_environment()
+
+import asyncpg
+
+from app.database.connection import AppConnection, init_connection
+from app.database.statements import statement_registry
+from app.database.user_repository import UserRepository
+import app.services.content_service  # noqa: F401 - registers the content.* statements
+
+MODES = ["unprepared", "cached", "registry"]
+
+async def open_connection(dsn: str, mode: str):
+    if mode == "unprepared":
+        return await asyncpg.connect(dsn, statement_cache_size=0)
+    if mode == "cached":
+        return await asyncpg.connect(dsn)
+    connection = await asyncpg.connect(dsn, connection_class=AppConnection)
+    await init_connection(connection)
+    return connection
+
+async def login_path(connection, index: int):
+    """authenticate_user's upsert, then the /auth/me profile lookup"""
+    repo = UserRepository(connection)
+    sub = str(uuid.uuid4())
+    await repo.upsert_on_login(cognito_sub=sub, email=f"{sub}@example.com", display_name="Bench")
+    await repo.get_user_by_cognito_sub(sub)
+
+async def browse_path(connection, index: int):
+    """An anonymous /content/browse, /content/categories and /content/experts"""
+    await statement_registry.fetch(connection, 'content.browse.free', 20)
+    categories = await statement_registry.fetch(connection, 'content.categories')
+    if categories:
+        slug = categories[index % len(categories)]['slug']
+        await statement_registry.fetch(connection, 'content.browse.category.free', 20, slug)
+    await statement_registry.fetch(connection, 'content.featured_experts', 6)
+
+PATHS = {"login": login_path, "browse": browse_path}
+
+def summarize(timings):
+    timings = sorted(timings)
+    return {
+        "mean": statistics.fmean(timings),
+        "p50": timings[len(timings) // 2],
+        "p95": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+    }
+
+async def run_path(connection, path, iterations: int):
+    timings = []
+    transaction = connection.transaction()
+    await transaction.start()
+    try:
+        for index in range(iterations):
+            started = time.perf_counter()
+            await path(connection, index)
+            timings.append((time.perf_counter() - started) * 1000)
+    finally:
+        await transaction.rollback()
+    return timings
+
+async def measure_mode(dsn: str, mode: str, args):
+    results = {}
+    connect_ms = []
+    first = {name: [] for name in PATHS}
+
+    # First request on a new connection: what each worker's pool pays per connection
+    for _ in range(args.connections):
+        started = time.perf_counter()
+        connection = await open_connection(dsn, mode)
+        connect_ms.append((time.perf_counter() - started) * 1000)
+        try:
+            for name, path in PATHS.items():
+                first[name].extend(await run_path(connection, path, 1))
+        finally:
+            await connection.close()
+
+    connection = await open_connection(dsn, mode)
+    try:
+        for name, path in PATHS.items():
+            await run_path(connection, path, args.warmup)
+            results[name] = summarize(await run_path(connection, path, args.iterations))
+            results[name]["first"] = statistics.fmean(first[name])
+    finally:
+        await connection.close()
+    results["connect_ms"] = statistics.fmean(connect_ms)
+    return results
+
+async def main(args):
+    if not args.dsn:
+        raise SystemExit("Set DATABASE_URL (or --dsn) to a database with the schema from create_schema.py")
+
+    print(f"{len(statement_registry)} registered statements, {args.iterations} iterations per path, "
+          f"first request averaged over {args.connections} connections\n")
+    print(f"  {'mode':<11} {'connect':>9}   {'path':<7} {'first':>9} {'mean':>9} {'p50':>9} {'p95':>9}")
+    for mode in args.modes:
+        statement_registry.reset_stats()
+        results = await measure_mode(args.dsn, mode, args)
+        for name in PATHS:
+            row = results[name]
+            print(f"  {mode:<11} {results['connect_ms']:>6.2f} ms   {name:<7} {row['first']:>6.3f} ms "
+                  f"{row['mean']:>6.3f} ms {row['p50']:>6.3f} ms {row['p95']:>6.3f} ms")
+
+    print("\nPer-statement totals for the last mode:")
+    for name, stats in statement_registry.stats().items():
+        if stats["calls"]:
+            print(f"  {name:<32} calls {stats['calls']:>7}  mean {stats['mean_ms']:.3f} ms  rows {stats['rows']}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Statement registry latency benchmark")
+    parser.add_argument("--dsn", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--connections", type=int, default=20)
+    parser.add_argument("--modes", default=",".join(MODES))
+    args = parser.parse_args()
+    args.modes = [mode for mode in args.modes.split(",") if mode]
+    unknown = set(args.modes) - set(MODES)
+    if unknown:
+        parser.error(f"unknown modes: {', '.join(sorted(unknown))}")
+    asyncio.run(main(args))
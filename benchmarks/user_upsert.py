@@ -0,0 +1,104 @@
+# benchmarks/user_upsert.py - Login DB sync: select-then-write vs single-statement upsert
+#
+#   DATABASE_URL=postgresql://localhost/betterbliss python -m benchmarks.user_upsert --logins 2000
+#
+# Runs against a TEMP users table on one connection, so real data is untouched.
+#
+# Results, 2026-10-16: PostgreSQL 18.6 over loopback on 1 vCPU, 2000 logins,
+# three runs (mean ms):
+#
+#                              run 1   run 2   run 3
+#   legacy, first login        0.222   0.168   0.259
+#   upsert, first login        0.156   0.131   0.136
+#   legacy, returning login    0.195   0.159   0.150
+#   upsert, returning login    0.141   0.166   0.114
+#
+# The upsert saves 0.04-0.12 ms per first login. It usually saves a similar
+# amount on a returning login, but one run was 0.007 ms slower. Over
+# loopback a round trip costs only a few hundredths of a millisecond, so
+# this mostly measures server work. Against a database across the network,
+# each login also saves one network round trip.
+import argparse
+import asyncio
+import os
+import statistics
+import time
+import uuid
+
+from benchmarks import configure_environment
+
+configure_environment()
+
+import asyncpg
+
+from app.database.user_repository import UserRepository
+
+TEMP_USERS_TABLE = """
+    CREATE TEMP TABLE users (
+        id UUID PRIMARY KEY,
+        cognito_sub VARCHAR(255) UNIQUE NOT NULL,
+        email VARCHAR(255) UNIQUE NOT NULL,
+        display_name VARCHAR(100),
+        avatar_url TEXT,
+        subscription_tier VARCHAR(20) DEFAULT 'free',
+        role VARCHAR(20) DEFAULT 'user',
+        status VARCHAR(20) DEFAULT 'active',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+async def legacy_login(repo: UserRepository, sub: str, email: str):
+    """What authenticate_user did before: SELECT, then INSERT or UPDATE"""
+    db_user = await repo.get_user_by_cognito_sub(sub)
+    if not db_user:
+        db_user = await repo.create_user(cognito_sub=sub, email=email, display_name="Bench")
+    else:
+        await repo.update_user_last_login(sub)
+    return db_user
+
+async def upsert_login(repo: UserRepository, sub: str, email: str):
+    return await repo.upsert_on_login(cognito_sub=sub, email=email, display_name="Bench")
+
+async def measure(login, repo, users):
+    timings = []
+    for sub, email in users:
+        started = time.perf_counter()
+        await login(repo, sub, email)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "mean": statistics.fmean(timings),
+        "p50": timings[len(timings) // 2],
+        "p95": timings[int(len(timings) * 0.95)],
+    }
+
+def report(label, stats):
+    print(f"  {label:<28} mean {stats['mean']:6.3f} ms   p50 {stats['p50']:6.3f} ms   p95 {stats['p95']:6.3f} ms")
+
+async def main(args):
+    connection = await asyncpg.connect(args.dsn)
+    try:
+        await connection.execute(TEMP_USERS_TABLE)
+        repo = UserRepository(connection)
+
+        def fresh_users():
+            return [(str(uuid.uuid4()), f"{uuid.uuid4()}@example.com") for _ in range(args.logins)]
+
+        legacy_users = fresh_users()
+        upsert_users = fresh_users()
+
+        print(f"{args.logins} logins per scenario against {connection.get_server_version()}")
+        # First login creates the row, the second finds it
+        report("legacy, first login", await measure(legacy_login, repo, legacy_users))
+        report("upsert, first login", await measure(upsert_login, repo, upsert_users))
+        report("legacy, returning login", await measure(legacy_login, repo, legacy_users))
+        report("upsert, returning login", await measure(upsert_login, repo, upsert_users))
+    finally:
+        await connection.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Login DB sync benchmark")
+    parser.add_argument("--dsn", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--logins", type=int, default=2000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,210 @@
+# conftest.py - Shared setup and fakes for the root-level test_*.py files
+#
+#   python -m pytest -q test_*.py
+import asyncio
+import time
+from typing import Any, Dict, List, NamedTuple
+
+import pytest
+
+from benchmarks import configure_environment
+
+# Settings are loaded at import time, so provide placeholders before any test imports the app
+configure_environment()
+
+import httpx
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+
+from app.auth.jwt_verifier import CognitoJWTVerifier
+from app.config import settings
+
+ISSUER = f"https://cognito-idp.{settings.aws_region}.amazonaws.com/{settings.cognito_user_pool_id}"
+JWKS_URL = f"{ISSUER}/.well-known/jwks.json"
+CLIENT_ID = settings.cognito_client_id
+
+# JWT signing keys and a stand-in JWKS endpoint
+
+class SigningKey(NamedTuple):
+    kid: str
+    private_pem: str
+    public_jwk: Dict[str, Any]
+
+def generate_signing_key(kid: str) -> SigningKey:
+    """An RSA key pair and its public JWK"""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()
+    ).decode()
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode()
+    public_jwk = jwk.construct(public_pem, algorithm="RS256").to_dict()
+    public_jwk.update({"kid": kid, "use": "sig"})
+    return SigningKey(kid, private_pem, public_jwk)
+
+class FakeJWKSEndpoint:
+    """Serves a mutable key set and counts fetches"""
+
+    def __init__(self, *jwks):
+        self.keys = list(jwks)
+        self.fetches = 0
+
+    def handler(self, request):
+        assert str(request.url) == JWKS_URL
+        self.fetches += 1
+        return httpx.Response(200, json={"keys": self.keys})
+
+@pytest.fixture(scope="session")
+def signing_key() -> SigningKey:
+    return generate_signing_key("key-1")
+
+@pytest.fixture
+def jwks_endpoint(signing_key) -> FakeJWKSEndpoint:
+    return FakeJWKSEndpoint(signing_key.public_jwk)
+
+@pytest.fixture
+def make_verifier(jwks_endpoint):
+    """Verifier for the test pool whose JWKS requests go to jwks_endpoint"""
+    def make(min_refresh_interval: float = 60) -> CognitoJWTVerifier:
+        client = httpx.AsyncClient(transport=httpx.MockTransport(jwks_endpoint.handler))
+        return CognitoJWTVerifier(
+            jwks_url=JWKS_URL,
+            issuer=ISSUER,
+            client_id=CLIENT_ID,
+            http_client=client,
+            min_refresh_interval=min_refresh_interval
+        )
+    return make
+
+@pytest.fixture
+def make_token(signing_key):
+    """Signed token for the test pool; profile=True adds the attributes ID tokens carry"""
+    def make(key: SigningKey = None, profile: bool = True, **overrides) -> str:
+        key = key or signing_key
+        now = int(time.time())
+        claims = {
+            "sub": "user-sub-123",
+            "iss": ISSUER,
+            "client_id": CLIENT_ID,
+            "token_use": "access",
+            "iat": now,
+            "exp": now + 900,
+        }
+        if profile:
+            claims.update({
+                "email": "user@example.com",
+                "name": "Test User",
+                "custom:role": "premium_user",
+                "custom:subscription_tier": "premium",
+                "custom:permissions": '["stream"]',
+            })
+        claims.update(overrides)
+        return jwt.encode(claims, key.private_pem, algorithm="RS256", headers={"kid": key.kid})
+    return make
+
+# Time
+
+class FakeClock:
+    """Replaces the time module in the modules a test installs it in; moves only when advanced"""
+
+    def __init__(self, monkeypatch):
+        self._monkeypatch = monkeypatch
+        self.now = time.time()
+
+    def install(self, *modules):
+        for module in modules:
+            self._monkeypatch.setattr(module, "time", self)
+        return self
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+    def time(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def perf_counter(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    return FakeClock(monkeypatch)
+
+# Async helpers
+
+class Loader:
+    """Async callable that counts calls; optionally waits on an event so a test can interleave"""
+
+    def __init__(self, value: Any = "v", gate: asyncio.Event = None, error: Exception = None):
+        self.value = value
+        self.gate = gate
+        self.error = error
+        self.calls = 0
+
+    async def __call__(self, *args):
+        self.calls += 1
+        if self.gate:
+            await self.gate.wait()
+        if self.error:
+            raise self.error
+        return f"{self.value}{self.calls}"
+
+class FakeTransaction:
+    """connection.transaction() stand-in; records begin/commit/rollback on its connection"""
+
+    def __init__(self, connection: "FakeConnection"):
+        self.connection = connection
+
+    async def start(self):
+        self.connection.transactions.append("begin")
+
+    async def commit(self):
+        self.connection.transactions.append("commit")
+
+    async def rollback(self):
+        self.connection.transactions.append("rollback")
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await (self.rollback() if exc_type else self.commit())
+
+class FakeConnection:
+    """Records the SQL it is given; fetch* results come from the queued responses"""
+
+    def __init__(self, *responses):
+        self.responses: List[Any] = list(responses)
+        self.executed: List[tuple] = []
+        self.transactions: List[str] = []
+
+    def transaction(self, **kwargs) -> FakeTransaction:
+        return FakeTransaction(self)
+
+    async def _next(self, query: str, args: tuple):
+        self.executed.append((query, args))
+        return self.responses.pop(0) if self.responses else None
+
+    async def execute(self, query: str, *args, **kwargs):
+        await self._next(query, args)
+        return "OK"
+
+    async def executemany(self, query: str, args, **kwargs):
+        self.executed.append((query, list(args)))
+
+    async def fetch(self, query: str, *args, **kwargs):
+        return await self._next(query, args) or []
+
+    async def fetchrow(self, query: str, *args, **kwargs):
+        return await self._next(query, args)
+
+    async def fetchval(self, query: str, *args, **kwargs):
+        return await self._next(query, args)
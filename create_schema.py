@@ -5,147 +5,14 @@ from dotenv import load_dotenv
 
 load_dotenv('.env.production')
 
+from app.database.migration_runner import MigrationRunner
+
 async def create_schema():
     conn = await asyncpg.connect(os.getenv('DATABASE_URL'))
     
-    # Create extension for UUID
-    await conn.execute('CREATE EXTENSION IF NOT EXISTS "uuid-ossp"')
-    
-    # Create all tables
-    tables_sql = '''
-        -- Users table
-        CREATE TABLE IF NOT EXISTS users (
-            id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
-            cognito_sub VARCHAR(255) UNIQUE NOT NULL,
-            email VARCHAR(255) UNIQUE NOT NULL,
-            display_name VARCHAR(100),
-            avatar_url TEXT,
-            subscription_tier VARCHAR(20) DEFAULT 'free',
-            role VARCHAR(20) DEFAULT 'user',
-            status VARCHAR(20) DEFAULT 'active',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-        
-        -- User preferences
-        CREATE TABLE IF NOT EXISTS user_preferences (
-            id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
-            user_id UUID REFERENCES users(id) ON DELETE CASCADE,
-            preferred_categories TEXT[],
-            preferred_content_types TEXT[],
-            wellness_goals TEXT[],
-            dark_mode BOOLEAN DEFAULT false,
-            autoplay_videos BOOLEAN DEFAULT true,
-            email_notifications BOOLEAN DEFAULT true,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE(user_id)
-        );
-        
-        -- Experts
-        CREATE TABLE IF NOT EXISTS experts (
-            id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
-            name VARCHAR(100) NOT NULL,
-            slug VARCHAR(100) UNIQUE NOT NULL,
-            title VARCHAR(200),
-            bio TEXT,
-            avatar_url TEXT,
-            specialties TEXT[],
-            verified BOOLEAN DEFAULT false,
-            featured BOOLEAN DEFAULT false,
-            status VARCHAR(20) DEFAULT 'active',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-        
-        -- Categories
-        CREATE TABLE IF NOT EXISTS categories (
-            id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
-            name VARCHAR(100) NOT NULL,
-            slug VARCHAR(100) UNIQUE NOT NULL,
-            description TEXT,
-            icon VARCHAR(50),
-            color VARCHAR(7),
-            sort_order INTEGER DEFAULT 0,
-            is_active BOOLEAN DEFAULT true,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-        
-        -- Content series
-        CREATE TABLE IF NOT EXISTS content_series (
-            id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
-            title VARCHAR(200) NOT NULL,
-            slug VARCHAR(200) UNIQUE NOT NULL,
-            description TEXT,
-            expert_id UUID REFERENCES experts(id),
-            category_id UUID REFERENCES categories(id),
-            thumbnail_url TEXT,
-            total_episodes INTEGER DEFAULT 0,
-            access_tier VARCHAR(20) DEFAULT 'free',
-            first_episode_free BOOLEAN DEFAULT true,
-            featured BOOLEAN DEFAULT false,
-            status VARCHAR(20) DEFAULT 'published',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-        
-        -- Content
-        CREATE TABLE IF NOT EXISTS content (
-            id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
-            title VARCHAR(200) NOT NULL,
-            slug VARCHAR(200) UNIQUE NOT NULL,
-            description TEXT,
-            content_type VARCHAR(20) DEFAULT 'video',
-            expert_id UUID REFERENCES experts(id),
-            category_id UUID REFERENCES categories(id),
-            series_id UUID REFERENCES content_series(id),
-            episode_number INTEGER,
-            video_url TEXT,
-            thumbnail_url TEXT,
-            duration_seconds INTEGER,
-            access_tier VARCHAR(20) DEFAULT 'free',
-            is_first_episode BOOLEAN DEFAULT false,
-            featured BOOLEAN DEFAULT false,
-            trending BOOLEAN DEFAULT false,
-            is_new BOOLEAN DEFAULT false,
-            status VARCHAR(20) DEFAULT 'published',
-            view_count INTEGER DEFAULT 0,
-            like_count INTEGER DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-        
-        -- Hero content
-        CREATE TABLE IF NOT EXISTS hero_content (
-            id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
-            title VARCHAR(200) NOT NULL,
-            subtitle TEXT,
-            description TEXT,
-            background_image_url TEXT,
-            cta_text VARCHAR(100) DEFAULT 'Get Started',
-            is_active BOOLEAN DEFAULT true,
-            sort_order INTEGER DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-        
-        -- Content likes
-        CREATE TABLE IF NOT EXISTS content_likes (
-            id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
-            user_id UUID REFERENCES users(id) ON DELETE CASCADE,
-            content_id UUID REFERENCES content(id) ON DELETE CASCADE,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE(user_id, content_id)
-        );
-        
-        -- Essential indexes
-        CREATE INDEX IF NOT EXISTS idx_users_cognito_sub ON users(cognito_sub);
-        CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
-        CREATE INDEX IF NOT EXISTS idx_content_slug ON content(slug);
-        CREATE INDEX IF NOT EXISTS idx_content_featured ON content(featured);
-    '''
-    
-    await conn.execute(tables_sql)
-    print("Created all database tables")
+    # Tables and indexes come from the versioned migrations in migrations/
+    applied = await MigrationRunner(conn).run()
+    print(f"Applied {len(applied)} migration(s)")
     
     # Insert sample data
     await conn.execute('''
@@ -172,49 +39,6 @@ async def create_schema():
          'Discover evidence-based techniques from leading mental health professionals',
          'Start Your Journey', true, 1)
     ''')
-
-
-    # Add newsletter tables
-    await conn.execute('''
-        CREATE TABLE IF NOT EXISTS newsletter_subscribers (
-            id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
-            email VARCHAR(255) UNIQUE NOT NULL,
-            name VARCHAR(100),
-            source VARCHAR(50) NOT NULL DEFAULT 'website',
-            status VARCHAR(20) NOT NULL DEFAULT 'pending',
-            metadata JSONB,
-            client_ip INET,
-            request_id VARCHAR(100),
-            confirmed_at TIMESTAMP,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    await conn.execute('''
-        CREATE TABLE IF NOT EXISTS rate_limits (
-            id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
-            identifier VARCHAR(255) NOT NULL,
-            endpoint VARCHAR(100) NOT NULL,
-            requests_count INTEGER DEFAULT 1,
-            window_start TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    # Add indexes
-    newsletter_indexes = [
-        "CREATE INDEX IF NOT EXISTS idx_newsletter_email ON newsletter_subscribers(email)",
-        "CREATE INDEX IF NOT EXISTS idx_newsletter_status ON newsletter_subscribers(status)",
-        "CREATE INDEX IF NOT EXISTS idx_newsletter_created ON newsletter_subscribers(created_at)",
-        "CREATE INDEX IF NOT EXISTS idx_rate_limits_lookup ON rate_limits(identifier, endpoint, window_start)",
-        "CREATE INDEX IF NOT EXISTS idx_rate_limits_cleanup ON rate_limits(window_start)"
-    ]
-    
-    for index_sql in newsletter_indexes:
-        await conn.execute(index_sql)
-    
-    print("Newsletter tables added to schema")
     
     await conn.close()
     return True
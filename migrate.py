@@ -0,0 +1,48 @@
+# migrate.py - Apply pending migrations from migrations/
+#
+#   python migrate.py            apply everything pending
+#   python migrate.py --status   list migrations and when each was applied
+#   python migrate.py --target 0002
+import argparse
+import asyncio
+import asyncpg
+import logging
+import os
+from dotenv import load_dotenv
+
+load_dotenv('.env.production')
+
+# After load_dotenv: importing app.database loads the app settings
+from app.database.migration_runner import MigrationRunner, load_migrations
+
+async def migrate(args):
+    conn = await asyncpg.connect(os.getenv('DATABASE_URL'))
+    
+    try:
+        runner = MigrationRunner(conn, load_migrations())
+        
+        if args.status:
+            for row in await runner.status():
+                applied = f"applied {row['applied_at']:%Y-%m-%d %H:%M} ({row['duration_ms']} ms)" if row['applied_at'] else "pending"
+                print(f"  {row['version']}_{row['name']:<40} {applied}")
+            return True
+        
+        applied = await runner.run(target=args.target)
+        for migration in applied:
+            print(f"  ✓ {migration.version}_{migration.name}")
+        print(f"✅ {len(applied)} migration(s) applied" if applied else "✅ Database is up to date")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        return False
+    finally:
+        await conn.close()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Apply database migrations")
+    parser.add_argument("--status", action="store_true", help="show applied and pending migrations")
+    parser.add_argument("--target", help="stop after this version")
+    success = asyncio.run(migrate(parser.parse_args()))
+    raise SystemExit(0 if success else 1)
@@ -0,0 +1,202 @@
+-- Baseline: the schema previously spread over create_schema.py,
+-- add_video_columns.py, add_newsletter_tables.py and secure_data_population.py.
+-- Every statement is idempotent, so databases built by those scripts are
+-- recorded as being at this version without changes.
+CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
+
+CREATE TABLE IF NOT EXISTS users (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    cognito_sub VARCHAR(255) UNIQUE NOT NULL,
+    email VARCHAR(255) UNIQUE NOT NULL,
+    display_name VARCHAR(100),
+    avatar_url TEXT,
+    subscription_tier VARCHAR(20) DEFAULT 'free',
+    role VARCHAR(20) DEFAULT 'user',
+    status VARCHAR(20) DEFAULT 'active',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS user_preferences (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    user_id UUID REFERENCES users(id) ON DELETE CASCADE,
+    preferred_categories TEXT[],
+    preferred_content_types TEXT[],
+    wellness_goals TEXT[],
+    dark_mode BOOLEAN DEFAULT false,
+    autoplay_videos BOOLEAN DEFAULT true,
+    email_notifications BOOLEAN DEFAULT true,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(user_id)
+);
+
+CREATE TABLE IF NOT EXISTS experts (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    name VARCHAR(100) NOT NULL,
+    slug VARCHAR(100) UNIQUE NOT NULL,
+    title VARCHAR(200),
+    bio TEXT,
+    avatar_url TEXT,
+    specialties TEXT[],
+    verified BOOLEAN DEFAULT false,
+    featured BOOLEAN DEFAULT false,
+    status VARCHAR(20) DEFAULT 'active',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS categories (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    name VARCHAR(100) NOT NULL,
+    slug VARCHAR(100) UNIQUE NOT NULL,
+    description TEXT,
+    icon VARCHAR(50),
+    color VARCHAR(7),
+    sort_order INTEGER DEFAULT 0,
+    is_active BOOLEAN DEFAULT true,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS content_series (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    title VARCHAR(200) NOT NULL,
+    slug VARCHAR(200) UNIQUE NOT NULL,
+    description TEXT,
+    expert_id UUID REFERENCES experts(id),
+    category_id UUID REFERENCES categories(id),
+    thumbnail_url TEXT,
+    total_episodes INTEGER DEFAULT 0,
+    access_tier VARCHAR(20) DEFAULT 'free',
+    first_episode_free BOOLEAN DEFAULT true,
+    featured BOOLEAN DEFAULT false,
+    status VARCHAR(20) DEFAULT 'published',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS content (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    title VARCHAR(200) NOT NULL,
+    slug VARCHAR(200) UNIQUE NOT NULL,
+    description TEXT,
+    content_type VARCHAR(20) DEFAULT 'video',
+    expert_id UUID REFERENCES experts(id),
+    category_id UUID REFERENCES categories(id),
+    series_id UUID REFERENCES content_series(id),
+    episode_number INTEGER,
+    video_url TEXT,
+    thumbnail_url TEXT,
+    duration_seconds INTEGER,
+    access_tier VARCHAR(20) DEFAULT 'free',
+    is_first_episode BOOLEAN DEFAULT false,
+    featured BOOLEAN DEFAULT false,
+    trending BOOLEAN DEFAULT false,
+    is_new BOOLEAN DEFAULT false,
+    status VARCHAR(20) DEFAULT 'published',
+    view_count INTEGER DEFAULT 0,
+    like_count INTEGER DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Video streaming columns (add_video_columns.py)
+ALTER TABLE content ADD COLUMN IF NOT EXISTS s3_key_video_720p TEXT;
+ALTER TABLE content ADD COLUMN IF NOT EXISTS s3_key_video_1080p TEXT;
+ALTER TABLE content ADD COLUMN IF NOT EXISTS s3_key_thumbnail TEXT;
+ALTER TABLE content ADD COLUMN IF NOT EXISTS s3_key_poster TEXT;
+ALTER TABLE content ADD COLUMN IF NOT EXISTS video_duration_seconds INTEGER;
+ALTER TABLE content ADD COLUMN IF NOT EXISTS video_format VARCHAR(10) DEFAULT 'mp4';
+ALTER TABLE content ADD COLUMN IF NOT EXISTS has_video BOOLEAN DEFAULT false;
+
+CREATE TABLE IF NOT EXISTS hero_content (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    title VARCHAR(200) NOT NULL,
+    subtitle TEXT,
+    description TEXT,
+    background_image_url TEXT,
+    cta_text VARCHAR(100) DEFAULT 'Get Started',
+    is_active BOOLEAN DEFAULT true,
+    sort_order INTEGER DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS content_likes (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    user_id UUID REFERENCES users(id) ON DELETE CASCADE,
+    content_id UUID REFERENCES content(id) ON DELETE CASCADE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(user_id, content_id)
+);
+
+CREATE TABLE IF NOT EXISTS video_analytics (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    content_id UUID REFERENCES content(id) ON DELETE CASCADE,
+    user_id UUID REFERENCES users(id) ON DELETE SET NULL,
+    session_id VARCHAR(100) NOT NULL,
+    event_type VARCHAR(20) NOT NULL,
+    timestamp_seconds DECIMAL(10,2),
+    watch_duration_seconds INTEGER,
+    quality_level VARCHAR(10),
+    device_type VARCHAR(20),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS newsletter_subscribers (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    email VARCHAR(255) UNIQUE NOT NULL,
+    name VARCHAR(100),
+    source VARCHAR(50) NOT NULL DEFAULT 'website',
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    metadata JSONB,
+    client_ip INET,
+    request_id VARCHAR(100),
+    confirmed_at TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS rate_limits (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    identifier VARCHAR(255) NOT NULL,
+    endpoint VARCHAR(100) NOT NULL,
+    requests_count INTEGER DEFAULT 1,
+    window_start TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Server-side sessions (SESSION_BACKEND=postgres); data is Fernet-encrypted
+CREATE TABLE IF NOT EXISTS auth_sessions (
+    session_key VARCHAR(64) PRIMARY KEY,
+    data TEXT NOT NULL,
+    expires_at TIMESTAMPTZ NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Logged-out token ids (jti/origin_jti), kept until the token's own exp
+CREATE TABLE IF NOT EXISTS revoked_tokens (
+    token_id VARCHAR(128) PRIMARY KEY,
+    expires_at TIMESTAMPTZ NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_users_cognito_sub ON users(cognito_sub);
+CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
+CREATE INDEX IF NOT EXISTS idx_users_status ON users(status);
+CREATE INDEX IF NOT EXISTS idx_experts_status ON experts(status);
+CREATE INDEX IF NOT EXISTS idx_content_slug ON content(slug);
+CREATE INDEX IF NOT EXISTS idx_content_featured ON content(featured);
+CREATE INDEX IF NOT EXISTS idx_content_access_tier ON content(access_tier);
+CREATE INDEX IF NOT EXISTS idx_content_status ON content(status);
+CREATE INDEX IF NOT EXISTS idx_content_expert_id ON content(expert_id);
+CREATE INDEX IF NOT EXISTS idx_content_category_id ON content(category_id);
+CREATE INDEX IF NOT EXISTS idx_content_has_video ON content(has_video) WHERE has_video = true;
+CREATE INDEX IF NOT EXISTS idx_content_access_tier_video ON content(access_tier, has_video);
+CREATE INDEX IF NOT EXISTS idx_video_analytics_content ON video_analytics(content_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_video_analytics_user ON video_analytics(user_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_newsletter_email ON newsletter_subscribers(email);
+CREATE INDEX IF NOT EXISTS idx_newsletter_status ON newsletter_subscribers(status);
+CREATE INDEX IF NOT EXISTS idx_newsletter_created ON newsletter_subscribers(created_at);
+CREATE INDEX IF NOT EXISTS idx_rate_limits_lookup ON rate_limits(identifier, endpoint, window_start);
+CREATE INDEX IF NOT EXISTS idx_rate_limits_cleanup ON rate_limits(window_start);
+CREATE INDEX IF NOT EXISTS idx_auth_sessions_expires ON auth_sessions(expires_at);
+CREATE INDEX IF NOT EXISTS idx_revoked_tokens_expires ON revoked_tokens(expires_at);
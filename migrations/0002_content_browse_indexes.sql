@@ -0,0 +1,23 @@
+-- migrate: no-transaction
+-- content.browse*: WHERE status = 'published' [AND access_tier = 'free']
+-- [AND category slug], ORDER BY featured DESC, created_at DESC LIMIT n.
+-- With an index in that order the scan stops after n rows instead of
+-- sorting every published row. Category browses walk the same indexes and
+-- skip other categories' rows: with a handful of categories the limit is
+-- reached after a few hundred rows, and the planner preferred that over
+-- category_id-leading indexes when they existed (benchmarks/index_plans.py).
+
+-- All published content
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_content_browse
+    ON content (featured DESC, created_at DESC)
+    WHERE status = 'published';
+
+-- Anonymous and free-tier users: the free subset only, so premium rows
+-- aren't read and discarded on the way to the limit
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_content_browse_free
+    ON content (featured DESC, created_at DESC)
+    WHERE status = 'published' AND access_tier = 'free';
+
+-- Single-column indexes the composite ones make redundant
+DROP INDEX CONCURRENTLY IF EXISTS idx_content_featured;
+DROP INDEX CONCURRENTLY IF EXISTS idx_content_status;
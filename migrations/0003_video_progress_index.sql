@@ -0,0 +1,11 @@
+-- migrate: no-transaction
+-- video_analytics.progress and .progress_for_content filter on user_id
+-- (and content_id) and aggregate timestamp_seconds, watch_duration_seconds
+-- and created_at. Covering those columns lets both run as index-only scans
+-- over one user's range instead of visiting a heap page per event.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_video_analytics_user_progress
+    ON video_analytics (user_id, content_id)
+    INCLUDE (timestamp_seconds, watch_duration_seconds, created_at);
+
+-- Same leading column, and nothing else filters video_analytics by user
+DROP INDEX CONCURRENTLY IF EXISTS idx_video_analytics_user;
@@ -0,0 +1,13 @@
+-- migrate: no-transaction
+-- newsletter.count_active and .top_sources: WHERE status = 'active',
+-- grouped by source - answered from the index alone
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_newsletter_status_source
+    ON newsletter_subscribers (status, source);
+
+-- newsletter.recent keeps idx_newsletter_created (ORDER BY created_at DESC
+-- LIMIT 50). newsletter.stats has no index: it counts every row and
+-- COUNT(DISTINCT source) sorts them all, so it stays a seq scan.
+
+-- Superseded by the one above; idx_newsletter_email duplicates the UNIQUE constraint
+DROP INDEX CONCURRENTLY IF EXISTS idx_newsletter_status;
+DROP INDEX CONCURRENTLY IF EXISTS idx_newsletter_email;
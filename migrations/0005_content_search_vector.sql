@@ -0,0 +1,52 @@
+-- Full-text search over content: title (A), expert and category names (B)
+-- and description (C). A generated column can't read experts/categories,
+-- so triggers keep search_vector current instead: on content writes, and on
+-- renames of an expert or category for the content that references it.
+-- Existing rows are backfilled in batches by 0006, outside this transaction.
+ALTER TABLE content ADD COLUMN IF NOT EXISTS search_vector tsvector;
+
+CREATE OR REPLACE FUNCTION content_search_vector(
+    p_title TEXT, p_description TEXT, p_expert_id UUID, p_category_id UUID
+) RETURNS tsvector LANGUAGE sql STABLE AS $$
+    SELECT setweight(to_tsvector('english', coalesce(p_title, '')), 'A')
+        || setweight(to_tsvector('english', coalesce((SELECT name FROM experts WHERE id = p_expert_id), '')), 'B')
+        || setweight(to_tsvector('english', coalesce((SELECT name FROM categories WHERE id = p_category_id), '')), 'B')
+        || setweight(to_tsvector('english', coalesce(p_description, '')), 'C')
+$$;
+
+CREATE OR REPLACE FUNCTION content_search_vector_refresh() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.search_vector := content_search_vector(NEW.title, NEW.description, NEW.expert_id, NEW.category_id);
+    RETURN NEW;
+END
+$$;
+
+DROP TRIGGER IF EXISTS content_search_vector_refresh ON content;
+CREATE TRIGGER content_search_vector_refresh
+    BEFORE INSERT OR UPDATE OF title, description, expert_id, category_id ON content
+    FOR EACH ROW EXECUTE FUNCTION content_search_vector_refresh();
+
+CREATE OR REPLACE FUNCTION content_search_vector_rename() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF NEW.name IS DISTINCT FROM OLD.name THEN
+        IF TG_TABLE_NAME = 'experts' THEN
+            UPDATE content SET search_vector = content_search_vector(title, description, expert_id, category_id)
+            WHERE expert_id = NEW.id;
+        ELSE
+            UPDATE content SET search_vector = content_search_vector(title, description, expert_id, category_id)
+            WHERE category_id = NEW.id;
+        END IF;
+    END IF;
+    RETURN NULL;
+END
+$$;
+
+DROP TRIGGER IF EXISTS content_search_vector_expert_rename ON experts;
+CREATE TRIGGER content_search_vector_expert_rename
+    AFTER UPDATE OF name ON experts
+    FOR EACH ROW EXECUTE FUNCTION content_search_vector_rename();
+
+DROP TRIGGER IF EXISTS content_search_vector_category_rename ON categories;
+CREATE TRIGGER content_search_vector_category_rename
+    AFTER UPDATE OF name ON categories
+    FOR EACH ROW EXECUTE FUNCTION content_search_vector_rename();
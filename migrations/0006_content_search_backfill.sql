@@ -0,0 +1,26 @@
+-- migrate: no-transaction
+-- Rows written since 0005 already have search_vector from the trigger. The
+-- rest are filled 5000 at a time in id order, committing after each batch,
+-- so row locks are held briefly and an interrupted run picks up where it
+-- stopped. The GIN index is built once the column is filled.
+DO $$
+DECLARE
+    last_id UUID := '00000000-0000-0000-0000-000000000000';
+    batch_end UUID;
+BEGIN
+    LOOP
+        SELECT id INTO batch_end
+        FROM (SELECT id FROM content WHERE id > last_id ORDER BY id LIMIT 5000) batch
+        ORDER BY id DESC LIMIT 1;
+        EXIT WHEN batch_end IS NULL;
+        UPDATE content SET search_vector = content_search_vector(title, description, expert_id, category_id)
+        WHERE id > last_id AND id <= batch_end AND search_vector IS NULL;
+        COMMIT;
+        last_id := batch_end;
+    END LOOP;
+END
+$$;
+
+-- ContentService.search: search_vector @@ websearch_to_tsquery(...)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_content_search_vector
+    ON content USING GIN (search_vector);
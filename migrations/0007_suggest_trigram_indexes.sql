@@ -0,0 +1,11 @@
+-- migrate: no-transaction
+-- /content/suggest: word_similarity (<%) over expert and category names,
+-- each served by a gin_trgm_ops index. Content is matched through the
+-- suggest_terms table (0010), which has its own.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_experts_name_trgm
+    ON experts USING GIN (name gin_trgm_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_categories_name_trgm
+    ON categories USING GIN (name gin_trgm_ops);
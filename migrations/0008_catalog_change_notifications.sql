@@ -0,0 +1,24 @@
+-- Each worker caches listings built from these tables (app/services/catalog_cache.py).
+-- Any write NOTIFYs catalog_changed with the table name; one notification per
+-- statement, and Postgres folds duplicates within a transaction.
+CREATE OR REPLACE FUNCTION notify_catalog_changed() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM pg_notify('catalog_changed', TG_TABLE_NAME);
+    RETURN NULL;
+END
+$$;
+
+DROP TRIGGER IF EXISTS categories_notify_catalog_changed ON categories;
+CREATE TRIGGER categories_notify_catalog_changed
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON categories
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_catalog_changed();
+
+DROP TRIGGER IF EXISTS experts_notify_catalog_changed ON experts;
+CREATE TRIGGER experts_notify_catalog_changed
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON experts
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_catalog_changed();
+
+DROP TRIGGER IF EXISTS hero_content_notify_catalog_changed ON hero_content;
+CREATE TRIGGER hero_content_notify_catalog_changed
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON hero_content
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_catalog_changed();
@@ -0,0 +1,6 @@
+-- The in-process catalog snapshot (app/services/catalog_snapshot.py) is
+-- rebuilt on catalog_changed; content writes now send it too
+DROP TRIGGER IF EXISTS content_notify_catalog_changed ON content;
+CREATE TRIGGER content_notify_catalog_changed
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON content
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_catalog_changed();
@@ -0,0 +1,106 @@
+-- /content/suggest matches the words and two-word phrases of published
+-- titles, not the titles themselves: a popular word starts thousands of
+-- titles but is one row here, so the trigram lookup stays small as the
+-- catalog grows. Each term counts the published titles that contain it
+-- (free_count: free ones, what anonymous and free users are offered), kept
+-- current by statement triggers on content and removed at zero.
+CREATE TABLE IF NOT EXISTS suggest_terms (
+    term TEXT PRIMARY KEY,
+    content_count INTEGER NOT NULL DEFAULT 0,
+    free_count INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS idx_suggest_terms_trgm
+    ON suggest_terms USING GIN (term gin_trgm_ops);
+
+-- Lowercased words of a title, stop words and single letters left out, and
+-- each pair of different neighbouring words
+CREATE OR REPLACE FUNCTION suggest_terms_of(p_title TEXT) RETURNS SETOF TEXT LANGUAGE sql STABLE AS $$
+    SELECT DISTINCT term
+    FROM (
+        SELECT word, lead(word) OVER (ORDER BY position) AS next_word
+        FROM regexp_split_to_table(lower(p_title), '[^[:alnum:]]+') WITH ORDINALITY AS words(word, position)
+        WHERE word <> ''
+    ) words,
+    LATERAL (VALUES
+        (word, true),
+        (word || ' ' || next_word,
+         next_word <> word AND length(next_word) > 1 AND ts_lexize('english_stem', next_word) <> '{}')
+    ) AS terms(term, kept)
+    WHERE kept AND length(word) > 1 AND ts_lexize('english_stem', word) <> '{}'
+$$;
+
+-- Adds delta for every term of every title; free rows count towards free_count too
+CREATE OR REPLACE FUNCTION suggest_terms_apply(p_titles TEXT[], p_free BOOLEAN[], p_deltas INTEGER[])
+RETURNS void LANGUAGE sql AS $$
+    INSERT INTO suggest_terms AS t (term, content_count, free_count)
+    SELECT term, sum(delta), coalesce(sum(delta) FILTER (WHERE free), 0)
+    FROM unnest(p_titles, p_free, p_deltas) AS changes(title, free, delta),
+         suggest_terms_of(title) AS term
+    GROUP BY term
+    HAVING sum(delta) <> 0 OR sum(delta) FILTER (WHERE free) <> 0
+    ON CONFLICT (term) DO UPDATE
+        SET content_count = t.content_count + EXCLUDED.content_count,
+            free_count = t.free_count + EXCLUDED.free_count;
+
+    DELETE FROM suggest_terms WHERE content_count <= 0;
+$$;
+
+-- One pass per statement, so a bulk import updates each term once
+CREATE OR REPLACE FUNCTION suggest_terms_refresh() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM suggest_terms_apply(array_agg(title), array_agg(access_tier = 'free'), array_agg(1))
+        FROM new_rows WHERE status = 'published';
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM suggest_terms_apply(array_agg(title), array_agg(access_tier = 'free'), array_agg(-1))
+        FROM old_rows WHERE status = 'published';
+    ELSE
+        -- Only rows whose title, status or tier changed (not view counts)
+        PERFORM suggest_terms_apply(array_agg(change.title), array_agg(change.free), array_agg(change.delta))
+        FROM old_rows o
+        JOIN new_rows n ON n.id = o.id
+        CROSS JOIN LATERAL (VALUES
+            (o.title, o.access_tier = 'free', CASE WHEN o.status = 'published' THEN -1 ELSE 0 END),
+            (n.title, n.access_tier = 'free', CASE WHEN n.status = 'published' THEN 1 ELSE 0 END)
+        ) AS change(title, free, delta)
+        WHERE (o.title, o.status, o.access_tier) IS DISTINCT FROM (n.title, n.status, n.access_tier)
+          AND change.delta <> 0;
+    END IF;
+    RETURN NULL;
+END
+$$;
+
+CREATE OR REPLACE FUNCTION suggest_terms_clear() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    DELETE FROM suggest_terms;
+    RETURN NULL;
+END
+$$;
+
+DROP TRIGGER IF EXISTS suggest_terms_insert ON content;
+CREATE TRIGGER suggest_terms_insert
+    AFTER INSERT ON content REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION suggest_terms_refresh();
+
+DROP TRIGGER IF EXISTS suggest_terms_update ON content;
+CREATE TRIGGER suggest_terms_update
+    AFTER UPDATE ON content REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION suggest_terms_refresh();
+
+DROP TRIGGER IF EXISTS suggest_terms_delete ON content;
+CREATE TRIGGER suggest_terms_delete
+    AFTER DELETE ON content REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION suggest_terms_refresh();
+
+DROP TRIGGER IF EXISTS suggest_terms_truncate ON content;
+CREATE TRIGGER suggest_terms_truncate
+    AFTER TRUNCATE ON content
+    FOR EACH STATEMENT EXECUTE FUNCTION suggest_terms_clear();
+
+-- Count what is already published. CREATE TRIGGER holds off content writes
+-- (reads carry on) until this commits, so no row is counted twice or
+-- missed; content itself is only read, about 4 s per 100k rows.
+DELETE FROM suggest_terms;
+SELECT suggest_terms_apply(array_agg(title), array_agg(access_tier = 'free'), array_agg(1))
+FROM content WHERE status = 'published';
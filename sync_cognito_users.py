@@ -0,0 +1,25 @@
+# sync_cognito_users.py - Reconcile the users table with the Cognito user pool
+#
+#   python sync_cognito_users.py [--dry-run] [--batch-size 5000]
+import argparse
+import asyncio
+import json
+from dotenv import load_dotenv
+
+load_dotenv('.env.production')
+
+async def main(args):
+    from app.database.connection import DatabaseConnection
+    from app.services.cognito_sync_service import CognitoSyncService
+    
+    try:
+        report = await CognitoSyncService(batch_size=args.batch_size).sync_users(dry_run=args.dry_run)
+        print(json.dumps(report, indent=2))
+    finally:
+        await DatabaseConnection.close_pool()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create missing users and refresh changed ones from Cognito")
+    parser.add_argument("--dry-run", action="store_true", help="Report the diff without writing")
+    parser.add_argument("--batch-size", type=int, default=None)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,83 @@
+# test_catalog_cache.py - Version-stamped catalog cache (no database needed)
+import asyncio
+
+import pytest
+
+from app.services.catalog_cache import CatalogCache
+from conftest import Loader
+
+def test_hits_until_the_table_changes():
+    async def run():
+        cache = CatalogCache(max_entries=10, ttl_seconds=60)
+        loader = Loader()
+        assert await cache.get_or_load(("categories",), "categories", loader) == "v1"
+        assert await cache.get_or_load(("categories",), "categories", loader) == "v1"
+
+        # Other tables' notifications leave the entry alone
+        cache.invalidate_table("experts")
+        assert await cache.get_or_load(("categories",), "categories", loader) == "v1"
+
+        cache.invalidate_table("categories")
+        assert await cache.get_or_load(("categories",), "categories", loader) == "v2"
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["stale"]) == (2, 2, 1)
+        assert stats["hit_ratio"] == 0.5
+
+    asyncio.run(run())
+
+def test_load_racing_a_write_is_not_served_as_current():
+    async def run():
+        cache = CatalogCache(max_entries=10, ttl_seconds=60)
+        gate = asyncio.Event()
+        slow = Loader(gate=gate)
+        load = asyncio.ensure_future(cache.get_or_load(("hero_content",), "hero_content", slow))
+        await asyncio.sleep(0)
+
+        # The write lands while the old rows are still being read
+        cache.invalidate_table("hero_content")
+        gate.set()
+        assert await load == "v1"
+
+        fresh = Loader("w")
+        assert await cache.get_or_load(("hero_content",), "hero_content", fresh) == "w1"
+
+    asyncio.run(run())
+
+def test_concurrent_misses_share_one_load():
+    async def run():
+        cache = CatalogCache(max_entries=10, ttl_seconds=60)
+        gate = asyncio.Event()
+        loader = Loader(gate=gate)
+        loads = [
+            asyncio.ensure_future(cache.get_or_load(("featured_experts", 6), "experts", loader))
+            for _ in range(5)
+        ]
+        await asyncio.sleep(0)
+        gate.set()
+        assert await asyncio.gather(*loads) == ["v1"] * 5
+        assert loader.calls == 1
+
+    asyncio.run(run())
+
+def test_failed_loads_are_not_cached():
+    async def run():
+        cache = CatalogCache(max_entries=10, ttl_seconds=60)
+
+        async def failing():
+            raise ConnectionError("database down")
+
+        with pytest.raises(ConnectionError):
+            await cache.get_or_load(("categories",), "categories", failing)
+        assert await cache.get_or_load(("categories",), "categories", Loader()) == "v1"
+
+    asyncio.run(run())
+
+def test_reconnect_invalidates_everything():
+    async def run():
+        cache = CatalogCache(max_entries=10, ttl_seconds=60)
+        await cache.get_or_load(("categories",), "categories", Loader())
+        cache.invalidate_all()
+        assert cache.stats()["size"] == 0
+        assert await cache.get_or_load(("categories",), "categories", Loader("w")) == "w1"
+
+    asyncio.run(run())
@@ -0,0 +1,138 @@
+# test_catalog_snapshot.py - In-memory catalog snapshot (no database needed)
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+from app.config import settings
+from app.services.catalog_snapshot import (
+    BROWSE_FIELDS, CatalogEntry, CatalogSnapshot, CatalogSnapshotStore, DETAIL_FIELDS
+)
+
+NOW = datetime(2026, 1, 1)
+
+def make_row(n, category="sleep", tier="free", featured=False):
+    """A content.catalog_snapshot row; newer rows have higher n"""
+    row = {field: None for field in CatalogEntry.__slots__}
+    row.update({
+        "id": uuid.UUID(int=n),
+        "title": f"Session {n}",
+        "slug": f"session-{n}",
+        "description": "A calm session",
+        "content_type": "video",
+        "access_tier": tier,
+        "featured": featured,
+        "status": "published",
+        "created_at": NOW + timedelta(days=n),
+        "expert_name": "Dr. Calm",
+        "category_name": category.title(),
+        "category_slug": category,
+    })
+    return row
+
+ROWS = [
+    make_row(1, "sleep", "free"),
+    make_row(2, "sleep", "premium"),
+    make_row(3, "stress", "free", featured=True),
+    make_row(4, "stress", "premium"),
+    make_row(5, "sleep", "free"),
+]
+
+def slugs(content_list):
+    return [content["slug"] for content in content_list]
+
+def test_browse_orders_featured_then_newest():
+    snapshot = CatalogSnapshot(ROWS, version=1)
+    assert slugs(snapshot.browse(None, False, 20)) == [
+        "session-3", "session-5", "session-4", "session-2", "session-1"
+    ]
+    assert slugs(snapshot.browse(None, False, 2)) == ["session-3", "session-5"]
+    assert set(snapshot.browse(None, False, 1)[0]) == set(BROWSE_FIELDS)
+
+def test_browse_puts_nulls_first_like_postgres():
+    undated, unflagged = make_row(6), make_row(7)
+    undated["created_at"] = None
+    unflagged["featured"] = None
+    snapshot = CatalogSnapshot(ROWS + [undated, unflagged], version=1)
+    # ORDER BY featured DESC, created_at DESC: NULL sorts above true, and above any date
+    assert slugs(snapshot.browse(None, False, 20)) == [
+        "session-7", "session-3", "session-6", "session-5", "session-4", "session-2", "session-1"
+    ]
+
+def test_browse_filters():
+    snapshot = CatalogSnapshot(ROWS, version=1)
+    assert slugs(snapshot.browse(None, True, 20)) == ["session-3", "session-5", "session-1"]
+    assert slugs(snapshot.browse("sleep", False, 20)) == ["session-5", "session-2", "session-1"]
+    assert slugs(snapshot.browse("sleep", True, 20)) == ["session-5", "session-1"]
+    assert snapshot.browse("unknown", False, 20) == []
+
+def test_lookups_by_slug_and_id():
+    snapshot = CatalogSnapshot(ROWS, version=1)
+    entry = snapshot.get_by_slug("session-2")
+    assert entry.access_tier == "premium"
+    assert snapshot.get_by_id(uuid.UUID(int=2)) is entry
+    assert snapshot.get_by_id(str(uuid.UUID(int=2))) is entry
+    assert snapshot.get_by_slug("missing") is None
+    assert set(entry.as_dict(DETAIL_FIELDS)) == set(DETAIL_FIELDS)
+
+def test_repeated_strings_are_shared():
+    snapshot = CatalogSnapshot([dict(row) for row in ROWS], version=1)
+    first, second = snapshot.get_by_slug("session-1"), snapshot.get_by_slug("session-5")
+    assert first.category_name is second.category_name
+    assert first.expert_name is second.expert_name
+
+def test_memory_report():
+    report = CatalogSnapshot(ROWS, version=1).memory_report()
+    assert report["entries"] == len(ROWS)
+    assert report["total_bytes"] == report["entry_bytes"] + report["value_bytes"] + report["index_bytes"]
+    assert report["bytes_per_entry"] > 0
+    assert CatalogSnapshot([], version=1).memory_report()["bytes_per_entry"] == 0
+
+class StaticStore(CatalogSnapshotStore):
+    """Store whose rebuilds read rows from memory and are counted"""
+
+    def __init__(self, rows):
+        super().__init__()
+        self.rows = rows
+        self.fetches = 0
+
+    async def _fetch_rows(self):
+        self.fetches += 1
+        await asyncio.sleep(0)
+        return self.rows
+
+def test_store_falls_back_to_sql_above_max_rows():
+    async def run():
+        store = StaticStore(ROWS)
+        original = settings.catalog_snapshot_max_rows
+        try:
+            assert await store.load() is not None
+            assert store.get() is not None and store.stats()["entries"] == len(ROWS)
+
+            settings.catalog_snapshot_max_rows = len(ROWS) - 1
+            assert await store.load() is None
+            assert store.get() is None
+        finally:
+            settings.catalog_snapshot_max_rows = original
+
+    asyncio.run(run())
+
+def test_notifications_coalesce_into_one_rebuild():
+    async def run():
+        store = StaticStore(ROWS)
+        store.on_catalog_changed("content")
+        store.on_catalog_changed("experts")
+        store.on_catalog_changed("hero_content")  # not in the snapshot
+        await store._rebuild_task
+        assert store.fetches == 1
+        assert store.get().version == 1
+
+        # A change during a rebuild causes exactly one more
+        store.on_catalog_changed("categories")
+        task = store._rebuild_task
+        await asyncio.sleep(0)
+        store.on_catalog_changed("content")
+        await task
+        assert store.fetches == 3
+        assert store.stats()["rebuilds"] == 3
+
+    asyncio.run(run())
@@ -0,0 +1,101 @@
+# test_cognito_sync.py - Cognito user streaming against the local paginated fake
+import asyncio
+
+import pytest
+
+from app.auth.cognito import CognitoClient, AsyncCognitoClient, CognitoThrottledError
+from app.config import settings
+from app.services import cognito_sync_service
+from app.services.cognito_sync_service import CognitoSyncService, cognito_user_record
+from benchmarks.fake_cognito import FakeCognito
+
+def make_service(monkeypatch, fake, batch_size):
+    monkeypatch.setattr(settings, "cognito_endpoint_url", fake.url)
+    return CognitoSyncService(AsyncCognitoClient(CognitoClient(), max_workers=2), batch_size=batch_size)
+
+async def collect_batches(service, stats):
+    return [batch async for batch in service.iter_user_batches(stats)]
+
+def test_streams_every_page_in_bounded_batches(monkeypatch):
+    fake = FakeCognito(latency_ms=0).start()
+    try:
+        subs = {fake.add_user(f"user{i:03d}@example.com", "Password1!") for i in range(250)}
+        service = make_service(monkeypatch, fake, batch_size=100)
+        stats = {}
+
+        batches = asyncio.run(collect_batches(service, stats))
+
+        assert [len(batch) for batch in batches] == [100, 100, 50]
+        assert {record[0] for batch in batches for record in batch} == subs
+        assert stats["pages"] == 5
+        assert fake.calls["ListUsers"] == 5
+    finally:
+        fake.stop()
+
+def test_empty_pool_yields_nothing(monkeypatch):
+    fake = FakeCognito(latency_ms=0).start()
+    try:
+        service = make_service(monkeypatch, fake, batch_size=100)
+        assert asyncio.run(collect_batches(service, {})) == []
+    finally:
+        fake.stop()
+
+def test_user_record_mapping():
+    user = {"Attributes": [
+        {"Name": "sub", "Value": "sub-1"},
+        {"Name": "email", "Value": "jane@example.com"},
+        {"Name": "custom:subscription_tier", "Value": "premium"},
+    ]}
+    assert cognito_user_record(user) == ("sub-1", "jane@example.com", "jane", "free_user", "premium")
+    assert cognito_user_record({"Attributes": [{"Name": "sub", "Value": "sub-2"}]}) is None
+
+class ThrottlingCognito:
+    """list_users stand-in: two pages of one user, throttled `throttles` times first"""
+
+    def __init__(self, throttles):
+        self.throttles = throttles
+        self.calls = 0
+
+    async def list_users(self, pagination_token):
+        self.calls += 1
+        if self.throttles:
+            self.throttles -= 1
+            raise CognitoThrottledError("Failed to list users: Rate exceeded")
+        sub = "sub-2" if pagination_token else "sub-1"
+        page = {"Users": [{"Attributes": [{"Name": "sub", "Value": sub},
+                                          {"Name": "email", "Value": f"{sub}@example.com"}]}]}
+        if not pagination_token:
+            page["PaginationToken"] = "next"
+        return page
+
+@pytest.fixture
+def recorded_delays(monkeypatch):
+    """Backoff waits the service asked for (returned immediately)"""
+    delays = []
+    real_sleep = asyncio.sleep
+
+    async def sleep(delay):
+        delays.append(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr(cognito_sync_service.asyncio, "sleep", sleep)
+    monkeypatch.setattr(settings, "cognito_sync_retry_base_delay_seconds", 1.0)
+    monkeypatch.setattr(settings, "cognito_sync_max_retries", 3)
+    return delays
+
+def test_throttled_pages_are_retried_with_jittered_backoff(recorded_delays):
+    cognito = ThrottlingCognito(throttles=3)
+    stats = {}
+    batches = asyncio.run(collect_batches(CognitoSyncService(cognito, batch_size=10), stats))
+
+    assert [record[0] for record in batches[0]] == ["sub-1", "sub-2"]
+    assert stats == {"pages": 2, "throttled": 3}
+    assert cognito.calls == 5
+    # Each wait is drawn from [0, base * 2^retry)
+    assert [0 <= delay <= 2 ** retry for retry, delay in enumerate(recorded_delays)] == [True] * 3
+
+def test_throttling_gives_up_after_max_retries(recorded_delays):
+    cognito = ThrottlingCognito(throttles=10)
+    with pytest.raises(CognitoThrottledError):
+        asyncio.run(collect_batches(CognitoSyncService(cognito, batch_size=10), {}))
+    assert cognito.calls == 4 and len(recorded_delays) == 3
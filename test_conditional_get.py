@@ -0,0 +1,173 @@
+# test_conditional_get.py - ETag / If-None-Match / 304 handling (no database needed)
+from email.utils import formatdate
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.content import routes as content_routes
+from app.services.catalog_snapshot import CatalogSnapshot
+from app.utils import conditional
+from app.utils.conditional import ConditionalResponder, etag_matches, has_auth_cookies
+from test_catalog_snapshot import ROWS
+
+def make_client():
+    """A one-route app whose payload the test can change"""
+    app = FastAPI()
+    responder = ConditionalResponder()
+    state = {"payload": {"content": [{"slug": "calm-mornings", "access_tier": "free"}]}}
+
+    @app.get("/content/browse")
+    async def browse(request: Request):
+        return responder.respond(request, state["payload"], public=not has_auth_cookies(request))
+
+    @app.get("/content/categories")
+    async def categories(request: Request):
+        return responder.respond(request, {"categories": []}, public=True, vary_cookie=False)
+
+    return TestClient(app), responder, state
+
+def test_etag_round_trip():
+    client, responder, state = make_client()
+    first = client.get("/content/browse")
+    assert first.status_code == 200
+    assert first.json() == state["payload"]
+    etag = first.headers["etag"]
+
+    repeat = client.get("/content/browse", headers={"If-None-Match": etag})
+    assert repeat.status_code == 304
+    assert repeat.content == b""
+    assert repeat.headers["etag"] == etag
+    assert repeat.headers["cache-control"].startswith("public")
+
+    state["payload"] = {"content": []}
+    changed = client.get("/content/browse", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+    stats = responder.stats()
+    assert stats["responses"] == 3 and stats["not_modified"] == 1 and stats["bytes_saved"] > 0
+
+def test_etag_comparison_is_weak():
+    assert etag_matches('W/"abc"', '"abc"')
+    assert etag_matches('"x", "abc"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"abcd"', '"abc"')
+
+def test_only_the_etag_validates():
+    client, _, state = make_client()
+    first = client.get("/content/browse")
+    assert "last-modified" not in first.headers
+
+    # A date is no proof the body is unchanged: If-Modified-Since alone never gets a 304
+    future = formatdate(2 ** 31, usegmt=True)
+    assert client.get("/content/browse", headers={"If-Modified-Since": future}).status_code == 200
+
+    etag = first.headers["etag"]
+    state["payload"] = {"content": []}
+    assert client.get("/content/browse", headers={
+        "If-None-Match": etag, "If-Modified-Since": future
+    }).status_code == 200
+
+def test_signed_in_responses_are_private_and_vary_on_cookie():
+    client, _, _ = make_client()
+    anonymous = client.get("/content/browse")
+    assert anonymous.headers["vary"] == "Cookie"
+    assert "public" in anonymous.headers["cache-control"]
+
+    client.cookies.set("refresh_token", "token")
+    signed_in = client.get("/content/browse")
+    assert signed_in.headers["cache-control"] == "private, no-cache"
+    assert signed_in.headers["vary"] == "Cookie"
+
+    # Categories don't depend on the user
+    categories = client.get("/content/categories")
+    assert "public" in categories.headers["cache-control"]
+    assert "vary" not in categories.headers
+
+@pytest.mark.parametrize("path, method", [
+    ("/content/categories", "get_categories"),
+    ("/content/experts", "get_featured_experts"),
+    ("/content/hero", "get_hero_content"),
+])
+def test_catalog_endpoints_revalidate(monkeypatch, path, method):
+    async def listing(*args, **kwargs):
+        return [{"name": "Sleep"}]
+
+    monkeypatch.setattr(content_routes.content_service, method, listing)
+    app = FastAPI()
+    app.include_router(content_routes.router)
+    client = TestClient(app)
+
+    first = client.get(path)
+    assert first.status_code == 200 and first.json()["total"] == 1
+    assert "public" in first.headers["cache-control"] and "vary" not in first.headers
+    assert client.get(path, headers={"If-None-Match": first.headers["etag"]}).status_code == 304
+
+@pytest.fixture
+def content_client(monkeypatch):
+    """The /content router with its own responder, counting serializations"""
+    responder = ConditionalResponder()
+    encoded = []
+
+    def serialize(payload):
+        encoded.append(payload)
+        return original_serialize(payload)
+
+    original_serialize = conditional.serialize
+    monkeypatch.setattr(conditional, "serialize", serialize)
+    monkeypatch.setattr(content_routes, "conditional_responses", responder)
+    app = FastAPI()
+    app.include_router(content_routes.router)
+    return TestClient(app), responder, encoded
+
+def test_listing_is_encoded_once_per_cached_value(monkeypatch, content_client):
+    client, responder, encoded = content_client
+    state = {"categories": [{"name": "Sleep"}]}
+
+    async def get_categories():
+        return state["categories"]
+
+    monkeypatch.setattr(content_routes.content_service, "get_categories", get_categories)
+    first = client.get("/content/categories")
+    again = client.get("/content/categories")
+    assert again.content == first.content and again.headers["etag"] == first.headers["etag"]
+    assert client.get("/content/categories", headers={"If-None-Match": first.headers["etag"]}).status_code == 304
+    assert len(encoded) == 1 and responder.stats()["memo_hits"] == 2
+
+    # A reload is a new object, even when nothing changed
+    state["categories"] = [{"name": "Sleep"}, {"name": "Focus"}]
+    changed = client.get("/content/categories")
+    assert changed.json()["total"] == 2 and changed.headers["etag"] != first.headers["etag"]
+    assert len(encoded) == 2
+
+def test_snapshot_responses_are_encoded_once_per_version(monkeypatch, content_client):
+    client, responder, encoded = content_client
+    monkeypatch.setattr(settings, "catalog_snapshot_enabled", True)
+    monkeypatch.setattr(content_routes.catalog_snapshot, "current", CatalogSnapshot(ROWS, version=1))
+
+    first = client.get("/content/browse?category=sleep")
+    assert client.get("/content/browse?category=sleep").content == first.content
+    assert client.get("/content/detail/session-2").json()["access_denied"] is True
+    client.get("/content/detail/session-2")
+    # Different filters are different bodies
+    client.get("/content/browse?category=stress")
+    assert len(encoded) == 3 and responder.stats()["memo_hits"] == 2
+
+    # A rebuilt snapshot is encoded afresh
+    monkeypatch.setattr(content_routes.catalog_snapshot, "current", CatalogSnapshot(ROWS[:1], version=2))
+    rebuilt = client.get("/content/browse?category=sleep")
+    assert rebuilt.json()["total"] == 1 and len(encoded) == 4
+
+def test_sql_responses_are_not_memoized(monkeypatch, content_client):
+    client, responder, encoded = content_client
+    monkeypatch.setattr(settings, "catalog_snapshot_enabled", False)
+
+    async def get_browse_content(user=None, category_slug=None, limit=20):
+        return {"content": [], "total": 0, "user_access_level": "anonymous"}
+
+    monkeypatch.setattr(content_routes.content_service, "get_browse_content", get_browse_content)
+    client.get("/content/browse")
+    client.get("/content/browse")
+    assert len(encoded) == 2 and responder.stats()["memo_size"] == 0
@@ -0,0 +1,63 @@
+# test_content_search.py - Search cursors, suggestions and statement variants (no database needed)
+import asyncio
+import uuid
+
+import pytest
+
+from app.config import settings
+from app.database.statements import statement_registry
+from app.services.content_service import (
+    content_service, decode_search_cursor, encode_search_cursor, normalize_prefix,
+    suggestion_cache, _search_statement_name
+)
+from conftest import FakeConnection
+
+def test_cursor_round_trips_rank_and_id():
+    content_id = uuid.uuid4()
+    rank = 0.1234567  # float4 ranks come back as the nearest double
+    cursor = encode_search_cursor(rank, content_id)
+    assert "=" not in cursor
+    assert decode_search_cursor(cursor) == (rank, str(content_id))
+
+@pytest.mark.parametrize("cursor", ["not-base64!", "bm90IGpzb24", "WzFd"])
+def test_malformed_cursor_is_a_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_search_cursor(cursor)
+
+def test_search_rejects_a_bad_cursor_before_touching_the_database():
+    with pytest.raises(ValueError):
+        asyncio.run(content_service.search("sleep", cursor="garbage"))
+
+def test_tier_and_category_filters_are_in_sql():
+    free = statement_registry.query(_search_statement_name(False, True))
+    by_category = statement_registry.query(_search_statement_name(True, False))
+    assert "c.access_tier = 'free'" in free and "$5" not in free
+    assert "slug = $5" in by_category and "c.access_tier = 'free'" not in by_category
+    for query in (free, by_category):
+        assert "websearch_to_tsquery('english', $1)" in query
+        assert "ORDER BY rank DESC, id DESC" in query
+        assert f"LIMIT {settings.content_search_max_candidates}" in query
+
+def test_suggestions_come_from_terms_with_a_typo_tolerant_threshold():
+    free = statement_registry.query('content.suggest.free')
+    assert "FROM suggest_terms t" in free and "t.free_count > 0" in free
+    assert "free_count" not in statement_registry.query('content.suggest')
+
+    connection = FakeConnection(None, [])
+    asyncio.run(statement_registry.fetch(connection, 'content.suggest.free', "anxeity", 8))
+    assert connection.executed[0] == ("SET LOCAL pg_trgm.word_similarity_threshold = '0.3'", ())
+    assert connection.transactions == ["begin", "commit"]
+
+def test_suggest_prefixes_are_normalized():
+    assert normalize_prefix("  Mindfu ") == "mindfu"
+    assert normalize_prefix("Deep   BREATH") == "deep breath"
+    assert len(normalize_prefix("x" * 80)) == 50
+
+def test_hot_prefixes_are_served_from_the_cache():
+    cached = [{"kind": "term", "label": "anxiety", "slug": None}]
+    suggestion_cache.set(("anxi", True, 8), cached)
+    try:
+        # Anonymous users get free-tier suggestions; no connection is needed on a hit
+        assert asyncio.run(content_service.suggest(" ANXI", limit=8)) is cached
+    finally:
+        suggestion_cache.clear()
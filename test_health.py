@@ -0,0 +1,21 @@
+# test_health.py - Public liveness vs admin-only operational stats (no database needed)
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routes.admin import require_admin
+
+def test_health_reports_only_liveness():
+    # Not entered as a context manager, so the lifespan (pool, listener) doesn't start
+    body = TestClient(app).get("/health").json()
+    assert set(body) == {"status", "environment", "cognito_configured", "database_healthy", "auth_system"}
+
+def test_stats_require_admin():
+    client = TestClient(app)
+    assert client.get("/admin/stats").status_code == 401
+
+    app.dependency_overrides[require_admin] = lambda: {"user": None}
+    try:
+        stats = client.get("/admin/stats").json()
+    finally:
+        app.dependency_overrides.clear()
+    assert {"database_pool", "identity_cache", "sessions", "revoked_tokens"} <= set(stats)
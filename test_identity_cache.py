@@ -0,0 +1,96 @@
+# test_identity_cache.py - TTL/LRU cache and the token-bound identity cache (no network or database)
+
+from app.auth.enhanced_dependencies import _combine_user_data
+from app.auth import identity_cache as identity_module
+from app.auth.identity_cache import cache_identity, forget_identity, get_cached_identity
+from app.auth.models import UserResponse
+from app.config import settings
+from app.utils import cache as cache_module
+from app.utils.cache import TTLCache
+
+USER = UserResponse(id="sub-1", email="reader@example.com", name="Reader",
+                    role="free_user", subscription_tier="free", permissions=[])
+
+def test_entries_expire_after_the_ttl(clock):
+    clock.install(cache_module)
+    cache = TTLCache(max_entries=10, ttl_seconds=60)
+    cache.set("a", 1)
+
+    clock.advance(59)
+    assert cache.get("a") == 1
+    clock.advance(1)
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1 and len(cache) == 0
+
+def test_per_entry_ttl_only_shortens(clock):
+    clock.install(cache_module)
+    cache = TTLCache(max_entries=10, ttl_seconds=60)
+    cache.set("short", 1, ttl=5)
+    cache.set("long", 2, ttl=3600)
+    cache.set("dead", 3, ttl=0)
+
+    assert "dead" not in cache._entries
+    clock.advance(5)
+    assert cache.get("short") is None
+    clock.advance(55)
+    assert cache.get("long") is None
+
+def test_least_recently_used_is_evicted_first():
+    cache = TTLCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # a is now the most recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["evictions"] == 1
+
+def test_invalidate_and_clear():
+    cache = TTLCache(max_entries=10, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.invalidate("a") and not cache.invalidate("a")
+    cache.clear()
+    assert len(cache) == 0 and cache.stats()["invalidations"] == 2
+
+def test_identity_never_outlives_the_token(clock, monkeypatch, make_token):
+    clock.install(cache_module, identity_module)
+    monkeypatch.setattr(identity_module, "identity_cache", TTLCache(max_entries=10, ttl_seconds=300))
+
+    token = make_token(exp=int(clock.now) + 30)
+    cache_identity(token, USER)
+    assert get_cached_identity(token) == USER
+
+    # The cache would keep it 300 s; the token is only good for 30
+    clock.advance(30)
+    assert get_cached_identity(token) is None
+
+def test_expired_and_opaque_tokens(clock, monkeypatch, make_token):
+    clock.install(cache_module, identity_module)
+    monkeypatch.setattr(identity_module, "identity_cache", TTLCache(max_entries=10, ttl_seconds=300))
+
+    expired = make_token(exp=int(clock.now) - 1)
+    cache_identity(expired, USER)
+    assert get_cached_identity(expired) is None
+
+    # Not a JWT: no exp to go by, so the cache TTL applies
+    cache_identity("opaque-token", USER)
+    clock.advance(299)
+    assert get_cached_identity("opaque-token") == USER
+    forget_identity("opaque-token")
+    assert get_cached_identity("opaque-token") is None
+
+def test_disabled_cache_stores_nothing(monkeypatch, make_token):
+    monkeypatch.setattr(settings, "identity_cache_enabled", False)
+    monkeypatch.setattr(identity_module, "identity_cache", TTLCache(max_entries=10, ttl_seconds=300))
+    token = make_token()
+    cache_identity(token, USER)
+    assert len(identity_module.identity_cache) == 0
+    assert get_cached_identity(token) is None
+
+def test_displayed_name_comes_from_the_profile_row():
+    db_user = {"role": "free_user", "subscription_tier": "free", "display_name": "Renamed"}
+    assert _combine_user_data(USER, db_user)["user"].name == "Renamed"
+    # Rows created before a display name was set fall back to Cognito's
+    assert _combine_user_data(USER, {**db_user, "display_name": None})["user"].name == "Reader"
@@ -0,0 +1,121 @@
+# test_jwt_verifier.py - Local JWT verification against a stand-in JWKS endpoint
+import asyncio
+import time
+
+import pytest
+
+from app.auth import enhanced_dependencies
+from app.auth.identity_cache import forget_identity
+from app.auth.jwt_verifier import TokenVerificationError, user_from_claims
+from app.auth.models import UserResponse
+from conftest import CLIENT_ID, generate_signing_key
+
+def assert_rejected(verifier, token):
+    with pytest.raises(TokenVerificationError):
+        asyncio.run(verifier.verify_access_token(token))
+
+def test_valid_token_builds_user_and_caches_jwks(make_verifier, make_token, jwks_endpoint):
+    verifier = make_verifier()
+    token = make_token()
+
+    claims = asyncio.run(verifier.verify_access_token(token))
+    asyncio.run(verifier.verify_access_token(token))
+
+    user = user_from_claims(claims)
+    assert user.id == "user-sub-123"
+    assert user.subscription_tier == "premium"
+    assert user.permissions == ["stream"]
+    assert jwks_endpoint.fetches == 1
+
+def test_rejects_invalid_claims(make_verifier, make_token):
+    verifier = make_verifier()
+
+    assert_rejected(verifier, make_token(exp=int(time.time()) - 10))
+    assert_rejected(verifier, make_token(iss="https://evil.example.com"))
+    assert_rejected(verifier, make_token(client_id="other-client"))
+    assert_rejected(verifier, make_token(token_use="id"))
+
+def test_rejects_token_signed_with_unknown_key(make_verifier, make_token):
+    assert_rejected(make_verifier(), make_token(key=generate_signing_key("key-1")))
+
+def test_refetches_jwks_on_key_rotation(make_verifier, make_token, jwks_endpoint):
+    verifier = make_verifier(min_refresh_interval=0)
+    asyncio.run(verifier.verify_access_token(make_token()))
+
+    rotated = generate_signing_key("key-2")
+    jwks_endpoint.keys.append(rotated.public_jwk)
+    asyncio.run(verifier.verify_access_token(make_token(key=rotated)))
+
+    assert jwks_endpoint.fetches == 2
+
+def test_unknown_kid_refetch_is_throttled(make_verifier, make_token, signing_key, jwks_endpoint):
+    verifier = make_verifier(min_refresh_interval=60)
+    asyncio.run(verifier.verify_access_token(make_token()))
+
+    assert_rejected(verifier, make_token(key=signing_key._replace(kid="bogus-kid")))
+    assert jwks_endpoint.fetches == 1
+
+def test_id_token_requires_matching_audience(make_verifier, make_token):
+    verifier = make_verifier()
+    id_token = make_token(token_use="id", aud=CLIENT_ID)
+
+    claims = asyncio.run(verifier.verify_id_token(id_token))
+    assert user_from_claims(claims).email == "user@example.com"
+
+    with pytest.raises(TokenVerificationError):
+        asyncio.run(verifier.verify_id_token(make_token(token_use="id", aud="other-client")))
+
+def test_missing_attributes_fall_back():
+    claims = {"sub": "user-sub-123", "token_use": "access", "client_id": CLIENT_ID}
+    assert user_from_claims(claims) is None
+
+def test_resolve_cognito_user_makes_no_getuser_call(monkeypatch, make_verifier, make_token):
+    monkeypatch.setattr(enhanced_dependencies, "jwt_verifier", make_verifier())
+
+    async def get_user_info(access_token):
+        raise AssertionError("GetUser should not be called when the token carries every attribute")
+
+    monkeypatch.setattr(enhanced_dependencies.async_cognito_client, "get_user_info", get_user_info)
+
+    token = make_token()
+    try:
+        user = asyncio.run(enhanced_dependencies.resolve_cognito_user(token))
+    finally:
+        forget_identity(token)
+
+    assert (user.id, user.email, user.permissions) == ("user-sub-123", "user@example.com", ["stream"])
+
+def test_access_token_without_attributes_calls_getuser_once(monkeypatch, make_verifier, make_token):
+    monkeypatch.setattr(enhanced_dependencies, "jwt_verifier", make_verifier())
+    fallback = UserResponse(id="user-sub-789", email="new@example.com", name="New Reader",
+                            role="free_user", subscription_tier="free", permissions=["stream"])
+    get_user_calls = []
+
+    async def get_user_info(access_token):
+        get_user_calls.append(access_token)
+        return fallback
+
+    monkeypatch.setattr(enhanced_dependencies.async_cognito_client, "get_user_info", get_user_info)
+
+    # Shaped like a real Cognito access token: no email, name or custom:permissions
+    token = make_token(profile=False, sub="user-sub-789", username="user-sub-789")
+    try:
+        assert asyncio.run(enhanced_dependencies.resolve_cognito_user(token)) is fallback
+        assert asyncio.run(enhanced_dependencies.resolve_cognito_user(token)).permissions == ["stream"]
+    finally:
+        forget_identity(token)
+
+    assert get_user_calls == [token]
+
+def test_forged_token_is_rejected_without_getuser(monkeypatch, make_verifier, make_token):
+    monkeypatch.setattr(enhanced_dependencies, "jwt_verifier", make_verifier())
+
+    async def get_user_info(access_token):
+        raise AssertionError("GetUser should not be called for a token that fails verification")
+
+    monkeypatch.setattr(enhanced_dependencies.async_cognito_client, "get_user_info", get_user_info)
+
+    with pytest.raises(TokenVerificationError):
+        asyncio.run(enhanced_dependencies.resolve_cognito_user(
+            make_token(profile=False, key=generate_signing_key("key-1"))
+        ))
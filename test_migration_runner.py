@@ -0,0 +1,141 @@
+# test_migration_runner.py - Migration files, statement splitting and the runner's apply order (no database needed)
+import asyncio
+
+import pytest
+
+from app.database.migration_runner import MIGRATION_LOCK_ID, Migration, MigrationRunner, load_migrations
+from conftest import FakeConnection
+
+CONCURRENT_INDEX_SQL = """-- migrate: no-transaction
+-- things.by_name looks rows up by name
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_things_name
+    ON things (name);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_things_created
+    ON things (created_at DESC);
+"""
+
+class MigrationConnection(FakeConnection):
+    """FakeConnection that knows which versions are applied and which indexes are INVALID"""
+
+    def __init__(self, applied=(), invalid_indexes=()):
+        super().__init__()
+        self.applied_rows = [{"version": version, "checksum": "old"} for version in applied]
+        self.invalid_indexes = set(invalid_indexes)
+
+    async def fetch(self, query: str, *args, **kwargs):
+        await self._next(query, args)
+        return self.applied_rows
+
+    async def fetchval(self, query: str, *args, **kwargs):
+        await self._next(query, args)
+        return args[0] in self.invalid_indexes
+
+    def statements(self):
+        return [" ".join(query.split()) for query, args in self.executed]
+
+def write_migrations(directory, **files):
+    for name, sql in files.items():
+        (directory / f"{name}.sql").write_text(sql)
+    return load_migrations(directory)
+
+def test_migration_parses_its_file_name(tmp_path):
+    [migration] = write_migrations(tmp_path, **{"0003_add_things": "CREATE TABLE things (id INT);"})
+    assert (migration.version, migration.name, migration.transactional) == ("0003", "add_things", True)
+    assert len(migration.checksum) == 64
+
+    (tmp_path / "things.sql").write_text("SELECT 1;")
+    with pytest.raises(ValueError, match="NNNN_name.sql"):
+        Migration(tmp_path / "things.sql")
+
+def test_no_transaction_header_and_statement_splitting(tmp_path):
+    [migration] = write_migrations(tmp_path, **{"0006_things_indexes": CONCURRENT_INDEX_SQL})
+    assert not migration.transactional
+    assert migration.statements() == [
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_things_name\n    ON things (name)",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_things_created\n    ON things (created_at DESC)",
+    ]
+
+def test_dollar_quoted_bodies_are_not_split(tmp_path):
+    sql = """-- migrate: no-transaction
+DO $$
+BEGIN
+    UPDATE things SET name = lower(name);
+    COMMIT;
+END
+$$;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_things_name ON things (name);
+"""
+    [migration] = write_migrations(tmp_path, **{"0007_things_backfill": sql})
+    assert migration.statements() == [
+        "DO $$\nBEGIN\n    UPDATE things SET name = lower(name);\n    COMMIT;\nEND\n$$",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_things_name ON things (name)",
+    ]
+
+def test_header_only_counts_at_the_top(tmp_path):
+    sql = "CREATE TABLE things (id INT);\n-- migrate: no-transaction\n"
+    [migration] = write_migrations(tmp_path, **{"0002_things": sql})
+    assert migration.transactional
+
+def test_duplicate_versions_are_rejected(tmp_path):
+    with pytest.raises(ValueError, match="Duplicate migration versions: 0002"):
+        write_migrations(tmp_path, **{"0002_things": "SELECT 1;", "0002_other_things": "SELECT 2;"})
+
+def test_runs_pending_migrations_up_to_target(tmp_path):
+    migrations = write_migrations(tmp_path, **{
+        "0001_baseline": "CREATE TABLE things (id INT);",
+        "0002_more": "ALTER TABLE things ADD COLUMN name TEXT;",
+        "0003_even_more": "ALTER TABLE things ADD COLUMN created_at TIMESTAMPTZ;",
+        "0004_later": "SELECT 1;",
+    })
+    connection = MigrationConnection(applied=["0001"])
+    applied = asyncio.run(MigrationRunner(connection, migrations).run(target="0003"))
+
+    assert [migration.version for migration in applied] == ["0002", "0003"]
+    # Each transactional migration commits together with its schema_migrations row
+    assert connection.transactions == ["begin", "commit", "begin", "commit"]
+    recorded = [args[0] for query, args in connection.executed if "INSERT INTO schema_migrations" in query]
+    assert recorded == ["0002", "0003"]
+    # Always unlocked, first and last statements around the run
+    assert connection.executed[0] == ("SELECT pg_advisory_lock($1)", (MIGRATION_LOCK_ID,))
+    assert connection.executed[-1] == ("SELECT pg_advisory_unlock($1)", (MIGRATION_LOCK_ID,))
+
+def test_lock_is_released_when_a_migration_fails(tmp_path):
+    migrations = write_migrations(tmp_path, **{"0001_baseline": "CREATE TABLE things (id INT);"})
+
+    class FailingConnection(MigrationConnection):
+        async def execute(self, query: str, *args, **kwargs):
+            if query.startswith("CREATE TABLE things"):
+                raise RuntimeError("syntax error")
+            return await super().execute(query, *args, **kwargs)
+
+    connection = FailingConnection()
+    with pytest.raises(RuntimeError):
+        asyncio.run(MigrationRunner(connection, migrations).run())
+    assert connection.transactions == ["begin", "rollback"]
+    assert connection.executed[-1] == ("SELECT pg_advisory_unlock($1)", (MIGRATION_LOCK_ID,))
+
+def test_invalid_concurrent_index_is_dropped_before_rebuilding(tmp_path):
+    migrations = write_migrations(tmp_path, **{"0006_things_indexes": CONCURRENT_INDEX_SQL})
+    # An interrupted build left idx_things_name behind, INVALID; IF NOT EXISTS alone would skip it
+    connection = MigrationConnection(invalid_indexes=["idx_things_name"])
+    asyncio.run(MigrationRunner(connection, migrations).run())
+
+    statements = connection.statements()
+    drop = statements.index("DROP INDEX CONCURRENTLY IF EXISTS idx_things_name")
+    assert statements[drop + 1] == "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_things_name ON things (name)"
+    assert "DROP INDEX CONCURRENTLY IF EXISTS idx_things_created" not in statements
+    # Outside any transaction block, each statement on its own
+    assert connection.transactions == []
+    assert sum("INSERT INTO schema_migrations" in statement for statement in statements) == 1
+
+def test_repository_no_transaction_migrations_split_cleanly():
+    migrations = load_migrations()
+    assert [migration.version for migration in migrations] == sorted(migration.version for migration in migrations)
+    for migration in migrations:
+        if not migration.transactional:
+            # One statement per execute, nothing left of the comments or the ';'
+            for statement in migration.statements():
+                assert not statement.endswith(";") and "--" not in statement
+                assert statement.split()[0] in ("CREATE", "DROP", "DO")
@@ -0,0 +1,117 @@
+# test_notifications.py - LISTEN/NOTIFY fan-out, reconnects and user_changed invalidation (no database needed)
+import asyncio
+
+from app.auth import profile_cache
+from app.auth.profile_cache import USER_CHANGED_CHANNEL, cache_profile, get_cached_profile, publish_user_changed
+from app.database import notifications
+from app.database.notifications import NotificationListener
+from conftest import FakeConnection
+
+class FakeListenConnection:
+    """asyncpg.connect stand-in that records LISTENs and can deliver or drop"""
+
+    def __init__(self):
+        self.listeners = {}
+        self.on_terminated = None
+        self.closed = False
+
+    async def add_listener(self, channel, callback):
+        self.listeners[channel] = callback
+
+    def add_termination_listener(self, callback):
+        self.on_terminated = callback
+
+    def is_closed(self):
+        return self.closed
+
+    async def close(self):
+        self.closed = True
+
+    def deliver(self, channel, payload):
+        self.listeners[channel](self, 1234, channel, payload)
+
+    def drop(self):
+        self.closed = True
+        self.on_terminated(self)
+
+class FakeServer:
+    """Patched in for asyncpg.connect; refuses the next `refuse` attempts"""
+
+    def __init__(self, monkeypatch):
+        self.opened = []
+        self.refuse = 0
+        monkeypatch.setattr(notifications.asyncpg, "connect", self.connect)
+        monkeypatch.setattr(notifications, "get_database_url", lambda: "postgresql://listener@localhost/test")
+
+    async def connect(self, *args, **kwargs):
+        if self.refuse:
+            self.refuse -= 1
+            raise OSError("connection refused")
+        connection = FakeListenConnection()
+        self.opened.append(connection)
+        return connection
+
+def test_dispatch_reaches_every_handler_and_survives_errors(monkeypatch):
+    server = FakeServer(monkeypatch)
+    received = []
+
+    def broken(payload):
+        raise RuntimeError("handler bug")
+
+    listener = NotificationListener()
+    listener.subscribe("things", broken)
+    listener.subscribe("things", received.append)
+
+    async def run():
+        await listener.start()
+        server.opened[0].deliver("things", "a")
+        assert listener.connected
+        await listener.stop()
+        assert server.opened[0].closed and not listener.connected
+
+    asyncio.run(run())
+    assert received == ["a"]
+
+def test_resubscribes_and_runs_hooks_after_reconnect(monkeypatch):
+    server = FakeServer(monkeypatch)
+    received, reconnects = [], []
+    listener = NotificationListener(reconnect_delay=0)
+    listener.subscribe("one", received.append, on_reconnect=lambda: reconnects.append("one"))
+    listener.subscribe("two", received.append)
+
+    async def run():
+        await listener.start()
+        server.refuse = 1
+        server.opened[0].drop()
+        assert not listener.connected
+        await listener._reconnect_task
+
+    asyncio.run(run())
+    # One refused attempt, then a fresh connection listening on every channel again
+    assert len(server.opened) == 2 and listener.connected
+    assert set(server.opened[1].listeners) == {"one", "two"}
+    assert reconnects == ["one"]
+    server.opened[1].deliver("two", "after")
+    assert received == ["after"]
+
+def test_user_changed_invalidates_the_cached_profile():
+    profile_cache.user_profile_cache.clear()
+    cache_profile("sub-1", {"cognito_sub": "sub-1", "subscription_tier": "free"})
+    cache_profile("sub-2", {"cognito_sub": "sub-2", "subscription_tier": "free"})
+
+    # Another worker's publish_user_changed arrives as a notification
+    notifications.notification_listener._dispatch(None, 1234, USER_CHANGED_CHANNEL, "sub-1")
+    assert get_cached_profile("sub-1") is None
+    assert get_cached_profile("sub-2") is not None
+
+    # After a reconnect anything may have been missed, so nothing cached is trusted
+    assert profile_cache.user_profile_cache.clear in notifications.notification_listener._reconnect_hooks
+    profile_cache.user_profile_cache.clear()
+    assert get_cached_profile("sub-2") is None
+
+def test_publish_user_changed_invalidates_locally_and_notifies():
+    cache_profile("sub-1", {"cognito_sub": "sub-1"})
+    connection = FakeConnection()
+    asyncio.run(publish_user_changed(connection, "sub-1"))
+    assert get_cached_profile("sub-1") is None
+    assert connection.executed == [("SELECT pg_notify($1, $2)", (USER_CHANGED_CHANNEL, "sub-1"))]
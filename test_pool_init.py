@@ -0,0 +1,83 @@
+# test_pool_init.py - Single-flight pool creation and the per-connection init hook (no database needed)
+import asyncio
+import time
+
+from app.config import settings
+from app.database import connection as db_connection
+from app.database.connection import DatabaseConnection, init_connection
+from app.database.statements import statement_registry
+from app.newsletter import service as newsletter_module
+from conftest import FakeConnection
+
+class NewPoolConnection:
+    """What init_connection sees: records codecs, statements parsed into the cache and query loggers"""
+
+    def __init__(self):
+        self.codecs = {}
+        self.prepared = []
+        self.query_loggers = []
+
+    def add_query_logger(self, callback):
+        self.query_loggers.append(callback)
+
+    async def set_type_codec(self, type_name, encoder, decoder, schema):
+        self.codecs[(schema, type_name)] = (encoder, decoder)
+
+    async def prepare_cached(self, query):
+        self.prepared.append(query)
+
+def test_init_registers_json_codecs_and_prepares_statements(monkeypatch):
+    monkeypatch.setattr(settings, "db_statement_cache_size", 100)
+    connection = NewPoolConnection()
+    asyncio.run(init_connection(connection))
+
+    assert set(connection.codecs) == {("pg_catalog", "json"), ("pg_catalog", "jsonb")}
+    encoder, decoder = connection.codecs[("pg_catalog", "jsonb")]
+    assert decoder(encoder({"source": "footer"})) == {"source": "footer"}
+    assert statement_registry.query("newsletter.insert_pending") in connection.prepared
+    assert len(connection.prepared) == len(statement_registry)
+
+def test_no_statement_cache_no_preparing(monkeypatch):
+    monkeypatch.setattr(settings, "db_statement_cache_size", 0)
+    connection = NewPoolConnection()
+    asyncio.run(init_connection(connection))
+    assert connection.prepared == [] and len(connection.codecs) == 2
+
+def test_concurrent_first_callers_share_one_pool(monkeypatch):
+    created = []
+
+    async def create_app_pool(db_url, max_size, label, read_only=False):
+        await asyncio.sleep(0)
+        created.append(object())
+        return created[-1]
+
+    monkeypatch.setattr(db_connection, "create_app_pool", create_app_pool)
+    monkeypatch.setattr(db_connection, "get_database_url", lambda: "postgresql://localhost/test")
+    monkeypatch.setattr(DatabaseConnection, "_pool", None)
+    monkeypatch.setattr(DatabaseConnection, "_pool_lock", None)
+
+    async def run():
+        return await asyncio.gather(*(DatabaseConnection.get_pool() for _ in range(5)))
+
+    pools = asyncio.run(run())
+    assert len(created) == 1 and all(pool is created[0] for pool in pools)
+
+def test_newsletter_metadata_goes_to_the_jsonb_codec_as_a_dict(monkeypatch):
+    connection = FakeConnection()
+
+    async def get_db_connection():
+        return connection
+
+    async def release_db_connection(released):
+        pass
+
+    monkeypatch.setattr(newsletter_module, "get_db_connection", get_db_connection)
+    monkeypatch.setattr(newsletter_module, "release_db_connection", release_db_connection)
+    metadata = {"timestamp": time.time() * 1000 - 10000, "interactions": ["focus", "keydown"]}
+
+    result = asyncio.run(newsletter_module.newsletter_service.subscribe("reader@example.com", metadata=metadata))
+    assert result["status"] == "subscribed"
+    query, args = connection.executed[-1]
+    assert query == statement_registry.query("newsletter.insert_pending")
+    # The pool's codec does the json.dumps; a pre-encoded string would be stored as a JSON string
+    assert args[4] is metadata
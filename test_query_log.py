@@ -0,0 +1,53 @@
+# test_query_log.py - Statement fingerprints and the slow-query log
+
+from asyncpg.connection import LoggedQuery
+
+from app.config import settings
+from app.database.query_log import QueryLog, fingerprint, is_read_only
+
+def logged(query: str, elapsed_ms: float, args=(), exception=None) -> LoggedQuery:
+    return LoggedQuery(query, args, None, elapsed_ms / 1000, exception, None, None)
+
+def test_fingerprint_ignores_literals_and_layout():
+    first, normalized = fingerprint("SELECT * FROM users\n  WHERE id = 42 AND email = 'a@b.c'")
+    second, _ = fingerprint("select * from users where id = 7 and email = 'x''y@z'")
+    assert first == second
+    assert normalized == "select * from users where id = ? and email = ?"
+
+def test_fingerprint_keeps_parameters_and_collapses_value_lists():
+    _, normalized = fingerprint("SELECT id FROM content WHERE id IN (1, 2, 3) LIMIT $1")
+    assert normalized == "select id from content where id in (?...) limit $1"
+    assert fingerprint("SELECT $1")[0] != fingerprint("SELECT $2")[0]
+
+def test_read_only_detection():
+    assert is_read_only("select id from content where status = $1")
+    assert is_read_only("with recent as (select ?) select * from recent")
+    assert not is_read_only("with moved as (delete from t returning *) select * from moved")
+    assert not is_read_only("update users set role = $1")
+    # The same test replica routing uses: row locks need the primary
+    assert not is_read_only("select id from users where id = $1 for update")
+
+def test_slow_queries_are_logged_without_parameters():
+    log = QueryLog()
+    log.record(logged("SELECT 1", 1))
+    log.record(logged("SELECT pg_sleep($1)", settings.db_slow_query_ms + 50, args=("secret",)))
+    log.record(logged("SELECT 2", 2, exception=ValueError("boom")))
+
+    top = log.top(order_by="calls")
+    assert [entry["calls"] for entry in top] == [2, 1]
+    assert top[0]["errors"] == 1
+
+    [slow] = log.slow_queries()
+    assert slow["query"] == "select pg_sleep($1)"
+    assert slow["params"] == 1
+    assert "secret" not in str(slow)
+
+def test_explain_queries_and_overflow_are_not_tracked():
+    log = QueryLog()
+    log.record(logged("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) SELECT 1", 1))
+    assert log.summary()["fingerprints"] == 0
+
+    for index in range(settings.db_query_log_max_fingerprints + 3):
+        log.record(logged(f"SELECT * FROM table_{index}", 1))
+    assert log.summary()["fingerprints"] == settings.db_query_log_max_fingerprints
+    assert log.dropped == 3
@@ -0,0 +1,173 @@
+# test_replica_routing.py - Read routing between the primary and read replicas
+#
+# Most tests need two local Postgres servers. Replication isn't required: any
+# second server passes the health check, and its pool is read-only either way.
+#
+#   initdb -D /tmp/pg-primary && pg_ctl -D /tmp/pg-primary -o "-p 5433" -l /tmp/pg-primary.log start
+#   initdb -D /tmp/pg-replica && pg_ctl -D /tmp/pg-replica -o "-p 5434" -l /tmp/pg-replica.log start
+#   DATABASE_URL=postgresql://localhost:5433/postgres \
+#   DATABASE_REPLICA_URLS=postgresql://localhost:5434/postgres python -m pytest -q test_replica_routing.py
+import asyncio
+import os
+
+import asyncpg
+import pytest
+
+import app.database.replicas as replicas
+from app.config import settings
+from app.database.connection import (
+    AppConnection, DatabaseConnection, start_request_connection, finish_request_connection,
+    get_db_connection, note_primary_write, reads_stick_to_primary, release_db_connection
+)
+from app.database.replicas import ReplicaSet, get_read_connection, release_read_connection
+from app.database.statements import Statement
+
+REPLICA_URL = os.getenv("DATABASE_REPLICA_URLS", "").split(",")[0].strip()
+UNREACHABLE_URL = "postgresql://127.0.0.1:1/unreachable"
+
+needs_servers = pytest.mark.skipif(
+    not (os.getenv("DATABASE_URL") and REPLICA_URL),
+    reason="needs DATABASE_URL and DATABASE_REPLICA_URLS (two local Postgres servers)"
+)
+
+async def read_port() -> str:
+    """Port of the server a routed read lands on"""
+    connection = await get_read_connection()
+    try:
+        return await connection.fetchval("SELECT current_setting('port')")
+    finally:
+        await release_read_connection(connection)
+
+async def with_replicas(urls, body):
+    """Run body with the global replica set replaced by one over urls"""
+    original = replicas.replica_set
+    replicas.replica_set = ReplicaSet(urls)
+    try:
+        await replicas.replica_set.start()
+        return await body(replicas.replica_set)
+    finally:
+        await replicas.replica_set.stop()
+        replicas.replica_set = original
+        await DatabaseConnection.close_pool()
+
+async def primary_port() -> str:
+    pool = await DatabaseConnection.get_pool()
+    async with pool.acquire() as connection:
+        return await connection.fetchval("SELECT current_setting('port')")
+
+@needs_servers
+def test_reads_go_to_a_healthy_replica():
+    async def body(replica_set):
+        assert replica_set.replicas[0].healthy
+        assert await read_port() != await primary_port()
+        assert replica_set.routed == 1
+
+    asyncio.run(with_replicas([REPLICA_URL], body))
+
+@needs_servers
+def test_replica_connections_are_read_only():
+    async def body(replica_set):
+        connection = await get_read_connection()
+        try:
+            assert await connection.fetchval("SHOW default_transaction_read_only") == "on"
+        finally:
+            await release_read_connection(connection)
+
+    asyncio.run(with_replicas([REPLICA_URL], body))
+
+@needs_servers
+def test_reads_stick_to_primary_after_a_write_in_the_request():
+    async def body(replica_set):
+        scope, token = start_request_connection()
+        try:
+            before_write = await read_port()
+            note_primary_write()
+            after_write = await read_port()
+        finally:
+            await finish_request_connection(scope, token)
+
+        assert before_write != await primary_port()
+        assert after_write == await primary_port()
+        assert replica_set.sticky_reads == 1
+        # A new request starts unpinned
+        assert await read_port() == before_write
+
+    asyncio.run(with_replicas([REPLICA_URL], body))
+
+@needs_servers
+def test_raw_write_pins_the_following_reads_to_primary():
+    async def body(replica_set):
+        scope, token = start_request_connection()
+        try:
+            # Plain SQL on a pool connection, as the newsletter routes do; no registered statement
+            connection = await get_db_connection()
+            try:
+                await connection.execute("CREATE TEMP TABLE sticky_probe (id int)")
+                await connection.execute("INSERT INTO sticky_probe VALUES ($1)", 1)
+            finally:
+                await release_db_connection(connection)
+            after_write = await read_port()
+        finally:
+            await finish_request_connection(scope, token)
+
+        assert after_write == await primary_port()
+        assert replica_set.sticky_reads == 1
+
+    asyncio.run(with_replicas([REPLICA_URL], body))
+
+@needs_servers
+def test_unhealthy_replicas_are_skipped_and_reads_fail_over_to_primary():
+    async def skips_down_replica(replica_set):
+        down, up = replica_set.replicas
+        assert not down.healthy and up.healthy
+        ports = {await read_port() for _ in range(4)}
+        assert len(ports) == 1 and ports != {await primary_port()}
+        assert replica_set.fallbacks == 0
+
+    async def falls_back(replica_set):
+        assert await read_port() == await primary_port()
+        assert replica_set.fallbacks == 1
+
+    asyncio.run(with_replicas([UNREACHABLE_URL, REPLICA_URL], skips_down_replica))
+    asyncio.run(with_replicas([UNREACHABLE_URL], falls_back))
+
+def test_health_check_takes_unreachable_replica_out_of_rotation():
+    async def run():
+        replica_set = ReplicaSet([UNREACHABLE_URL])
+        replica = replica_set.replicas[0]
+        await replica_set.check(replica)
+        assert not replica.healthy
+        assert replica.last_error
+        assert await replica_set.acquire() is None
+
+    asyncio.run(run())
+
+def test_app_connection_notes_raw_writes(monkeypatch):
+    async def server(self, query, *args, **kwargs):
+        return "OK"
+
+    for method in ("execute", "fetch", "fetchrow", "fetchval"):
+        monkeypatch.setattr(asyncpg.Connection, method, server)
+    monkeypatch.setattr(settings, "db_request_scoped_connection", True)
+    # No server behind it; aborted, so garbage collection doesn't try to close it
+    connection = object.__new__(AppConnection)
+    connection._aborted = True
+
+    async def request(method, *queries):
+        scope, token = start_request_connection()
+        try:
+            for query in queries:
+                await getattr(connection, method)(query)
+            return reads_stick_to_primary()
+        finally:
+            await finish_request_connection(scope, token)
+
+    assert not asyncio.run(request("execute", "BEGIN", "SELECT id, updated_at FROM newsletter_subscribers", "COMMIT"))
+    assert asyncio.run(request("execute", "UPDATE newsletter_subscribers SET status = 'unsubscribed'"))
+    assert asyncio.run(request("fetchrow", "INSERT INTO newsletter_subscribers (email) VALUES ('a@b.c') RETURNING id"))
+
+def test_write_statements_are_detected():
+    assert Statement("w", "INSERT INTO users (id) VALUES ($1)").writes
+    assert Statement("w", "UPDATE users SET role = $1 WHERE id = $2").writes
+    assert not Statement("r", "SELECT id, updated_at FROM users WHERE id = $1").writes
+    assert Statement("l", "SELECT id FROM users WHERE id = $1 FOR UPDATE").writes
@@ -0,0 +1,184 @@
+# test_request_connection.py - One pooled connection per request: borrowing, deferred release, metrics (no database needed)
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.database.connection import (
+    DatabaseConnection, PoolMetrics, finish_request_connection, get_db_connection,
+    release_db_connection, start_request_connection
+)
+from conftest import FakeConnection
+
+class FakePool:
+    """asyncpg pool stand-in: every acquire hands out a new FakeConnection"""
+
+    def __init__(self):
+        self.acquired = []
+        self.released = []
+
+    async def acquire(self, timeout=None):
+        await asyncio.sleep(0)
+        self.acquired.append(FakeConnection())
+        return self.acquired[-1]
+
+    async def release(self, connection):
+        self.released.append(connection)
+
+    def get_size(self):
+        return len(self.acquired)
+
+    def get_idle_size(self):
+        return len(self.released)
+
+    def get_min_size(self):
+        return 1
+
+    def get_max_size(self):
+        return 10
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = FakePool()
+    monkeypatch.setattr(DatabaseConnection, "_pool", pool)
+    monkeypatch.setattr(DatabaseConnection, "metrics", PoolMetrics())
+    monkeypatch.setattr(settings, "db_request_scoped_connection", True)
+    return pool
+
+def in_request(body):
+    """Run body(scope) inside a request scope, closing it as the middleware would"""
+    async def run():
+        scope, token = start_request_connection()
+        try:
+            return await body(scope)
+        finally:
+            await finish_request_connection(scope, token)
+
+    return asyncio.run(run())
+
+def test_owner_reborrows_the_request_connection(pool):
+    async def body(scope):
+        outer = await get_db_connection()
+        # e.g. the auth dependency holds it while a repository call borrows it again
+        inner = await get_db_connection()
+        assert inner is outer and scope.borrowers == 2
+        await release_db_connection(inner)
+        await release_db_connection(outer)
+
+        # Released by every borrower, but kept for the rest of the request
+        again = await get_db_connection()
+        assert again is outer
+        await release_db_connection(again)
+        assert pool.released == []
+        return outer
+
+    connection = in_request(body)
+    assert pool.acquired == [connection] and pool.released == [connection]
+    assert DatabaseConnection.metrics.request_reuses == 2
+
+def test_concurrent_task_gets_its_own_pool_connection(pool):
+    async def body(scope):
+        held = await get_db_connection()
+
+        async def other_task():
+            connection = await get_db_connection()
+            await release_db_connection(connection)
+            return connection
+
+        # asyncpg connections can't run two queries at once
+        separate = await asyncio.create_task(other_task())
+        assert separate is not held
+        # Not the request's connection, so it goes straight back to the pool
+        assert pool.released == [separate]
+        await release_db_connection(held)
+        return held, separate
+
+    held, separate = in_request(body)
+    assert pool.released == [separate, held]
+
+def test_task_borrows_once_the_owner_has_released(pool):
+    async def body(scope):
+        connection = await get_db_connection()
+        await release_db_connection(connection)
+
+        async def other_task():
+            borrowed = await get_db_connection()
+            await release_db_connection(borrowed)
+            return borrowed
+
+        assert await asyncio.create_task(other_task()) is connection
+
+    in_request(body)
+    assert len(pool.acquired) == 1
+
+def test_release_waits_for_a_borrower_that_outlives_the_request(pool):
+    state = {}
+
+    async def run():
+        scope, token = start_request_connection()
+        finished = asyncio.Event()
+
+        async def background():
+            # e.g. a coalesced lookup other requests are still waiting on
+            state["connection"] = await get_db_connection()
+            await finished.wait()
+            await release_db_connection(state["connection"])
+
+        task = asyncio.create_task(background())
+        await asyncio.sleep(0.01)
+        await finish_request_connection(scope, token)
+        state["released_at_close"] = list(pool.released)
+
+        finished.set()
+        await task
+
+    asyncio.run(run())
+    assert state["released_at_close"] == []
+    assert pool.released == [state["connection"]]
+
+def test_connections_outside_a_request_go_straight_back(pool):
+    async def run():
+        connection = await get_db_connection()
+        await release_db_connection(connection)
+        return connection
+
+    connection = asyncio.run(run())
+    assert pool.released == [connection]
+    assert DatabaseConnection.metrics.request_acquires.count == 0
+
+def test_scope_without_sharing_still_counts_acquires(pool, monkeypatch):
+    # Replica routing opens a scope even when connections aren't shared
+    monkeypatch.setattr(settings, "db_request_scoped_connection", False)
+    monkeypatch.setattr(settings, "database_replica_urls", "postgresql://replica/db")
+
+    async def body(scope):
+        first = await get_db_connection()
+        await release_db_connection(first)
+        second = await get_db_connection()
+        await release_db_connection(second)
+        assert first is not second and pool.released == [first, second]
+
+    in_request(body)
+    acquires = DatabaseConnection.metrics.request_acquires
+    assert (acquires.count, acquires.total) == (1, 2)
+
+def test_per_request_pool_metrics(pool):
+    async def body(scope):
+        for _ in range(3):
+            connection = await get_db_connection()
+            await release_db_connection(connection)
+        return scope
+
+    scope = in_request(body)
+    metrics = DatabaseConnection.metrics
+    assert scope.acquires == 1
+    assert (metrics.acquired, metrics.request_reuses) == (1, 2)
+    assert metrics.request_acquires.count == 1 and metrics.request_acquires.total == 1
+    assert metrics.request_pool_wait_ms.count == 1
+    assert metrics.request_pool_wait_ms.total == pytest.approx(scope.pool_wait_ms)
+
+    # A request that never touched the database observes nothing
+    in_request(lambda scope: asyncio.sleep(0))
+    assert metrics.request_acquires.count == 1
+    stats = DatabaseConnection.stats()["request_scoped"]
+    assert stats["reuses"] == 2 and stats["acquires_per_request"]["count"] == 1
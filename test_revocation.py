@@ -0,0 +1,210 @@
+# test_revocation.py - Revocation list expiry, NOTIFY fan-in and reload after reconnect (no database needed)
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.auth import enhanced_routes, revocation
+from app.auth.revocation import TOKEN_REVOKED_CHANNEL, RevocationList, is_token_revoked, revocation_stats
+from app.config import settings
+from app.database.notifications import notification_listener
+from app.main import app
+from conftest import FakeConnection
+
+class FakeDatabase:
+    """get_db_connection stand-in: hands out FakeConnections, or fails the next `failures` times"""
+
+    def __init__(self):
+        self.connections = []
+        self.released = []
+        self.failures = 0
+        self.on_failure = None
+
+    async def get_db_connection(self):
+        if self.failures:
+            self.failures -= 1
+            if self.on_failure:
+                self.on_failure()
+            raise ConnectionError("database unavailable")
+        self.connections.append(FakeConnection())
+        return self.connections[-1]
+
+    async def release_db_connection(self, connection):
+        self.released.append(connection)
+
+@pytest.fixture
+def database(monkeypatch):
+    """A fresh revocation list and pending-share queue over a FakeDatabase, retrying without delay"""
+    database = FakeDatabase()
+    monkeypatch.setattr(revocation, "get_db_connection", database.get_db_connection)
+    monkeypatch.setattr(revocation, "release_db_connection", database.release_db_connection)
+    monkeypatch.setattr(revocation, "revocation_list", RevocationList(max_entries=10))
+    monkeypatch.setattr(revocation, "_unshared", {})
+    monkeypatch.setattr(revocation, "_share_task", None)
+    monkeypatch.setattr(settings, "token_revocation_retry_delay_seconds", 0)
+    monkeypatch.setattr(settings, "token_revocation_retry_max_delay_seconds", 0)
+    return database
+
+def test_expired_ids_are_pruned_from_the_heap(clock):
+    clock.install(revocation)
+    revoked = RevocationList(max_entries=10)
+    revoked.add("a", clock.now + 10)
+    revoked.add("b", clock.now + 20)
+    revoked.add("late", clock.now - 1)
+    assert len(revoked) == 2 and not revoked.is_revoked("late")
+
+    clock.advance(10)
+    assert not revoked.is_revoked("a") and revoked.is_revoked("b")
+    revoked.add("c", clock.now + 30)
+    assert set(revoked._entries) == {"b", "c"}
+    assert len(revoked._expiry_heap) == 2
+
+def test_later_expiry_supersedes_the_earlier_one(clock):
+    clock.install(revocation)
+    revoked = RevocationList(max_entries=10)
+    revoked.add("a", clock.now + 10)
+    revoked.add("a", clock.now + 30)
+    revoked.add("a", clock.now + 5)  # never shortens
+
+    clock.advance(15)
+    revoked.add("b", clock.now + 30)
+    assert revoked.is_revoked("a")
+    assert revoked._entries["a"] == clock.now + 15
+
+def test_overflow_forgets_the_soonest_to_expire(clock):
+    clock.install(revocation)
+    revoked = RevocationList(max_entries=2)
+    revoked.add("soon", clock.now + 10)
+    revoked.add("later", clock.now + 20)
+    revoked.add("latest", clock.now + 30)
+
+    assert set(revoked._entries) == {"later", "latest"}
+    assert revoked.stats() == {"size": 2, "max_entries": 2, "overflows": 1}
+
+def test_token_revoked_notification_revokes_the_token(monkeypatch, make_token):
+    monkeypatch.setattr(revocation, "revocation_list", RevocationList(max_entries=10))
+    token = make_token(jti="jti-1", origin_jti="origin-1")
+    assert not is_token_revoked(token)
+
+    # Another worker logged the sign-in out; it arrives as "<exp>:<token id>"
+    expires_at = revocation.token_revocation_ids(token)[1]
+    notification_listener._dispatch(None, 1234, TOKEN_REVOKED_CHANNEL, f"{expires_at}:origin-1")
+    assert is_token_revoked(token)
+    # A refreshed token from the same sign-in shares origin_jti
+    assert is_token_revoked(make_token(jti="jti-2", origin_jti="origin-1"))
+    assert not is_token_revoked(make_token(jti="jti-3", origin_jti="origin-2"))
+
+def test_reconnect_reloads_revocations_from_the_database(monkeypatch, clock):
+    clock.install(revocation)
+    monkeypatch.setattr(revocation, "revocation_list", RevocationList(max_entries=10))
+    monkeypatch.setattr(revocation, "_reload_task", None)
+    # DELETE of expired rows, then the rows still in the table
+    connection = FakeConnection(None, [{"token_id": "missed-1", "expires_at": clock.now + 60}])
+    released = []
+
+    async def get_db_connection():
+        return connection
+
+    async def release_db_connection(conn):
+        released.append(conn)
+
+    monkeypatch.setattr(revocation, "get_db_connection", get_db_connection)
+    monkeypatch.setattr(revocation, "release_db_connection", release_db_connection)
+    assert revocation._reload_after_reconnect in notification_listener._reconnect_hooks
+
+    async def run():
+        revocation._reload_after_reconnect()
+        # A second reconnect while the reload runs doesn't start another
+        first = revocation._reload_task
+        revocation._reload_after_reconnect()
+        assert revocation._reload_task is first
+        await first
+
+    asyncio.run(run())
+    assert revocation.revocation_list.is_revoked("missed-1")
+    assert "DELETE FROM revoked_tokens" in connection.executed[0][0]
+    assert released == [connection]
+
+def test_revoke_token_persists_and_notifies(database, make_token):
+    token = make_token(jti="jti-1", origin_jti="origin-1")
+    assert asyncio.run(revocation.revoke_token(token)) is True
+    assert is_token_revoked(token)
+
+    connection, = database.connections
+    (insert, rows), *notifications = connection.executed
+    assert "INSERT INTO revoked_tokens" in insert
+    assert [token_id for token_id, _ in rows] == ["jti-1", "origin-1"]
+    assert [args[1].split(":")[1] for _, args in notifications] == ["jti-1", "origin-1"]
+    assert connection.transactions == ["begin", "commit"] and database.released == [connection]
+
+def test_failed_share_is_retried_in_the_background(database, make_token):
+    token = make_token(jti="jti-1", origin_jti="origin-1")
+    database.failures = 2
+
+    async def run():
+        assert await revocation.revoke_token(token) is False
+        # Revoked here straight away, shared once the database is back
+        assert is_token_revoked(token)
+        assert revocation_stats()["unshared"] == 2
+        await revocation._share_task
+
+    asyncio.run(run())
+    assert revocation_stats()["unshared"] == 0
+    connection, = database.connections
+    assert [token_id for token_id, _ in connection.executed[0][1]] == ["jti-1", "origin-1"]
+
+def test_retry_stops_once_the_token_has_expired(database, clock, make_token):
+    clock.install(revocation)
+    token = make_token(jti="jti-1", exp=int(clock.now) + 60)
+    database.failures = 100
+    database.on_failure = lambda: clock.advance(30)
+
+    async def run():
+        assert await revocation.revoke_token(token) is False
+        await revocation._share_task
+
+    asyncio.run(run())
+    # Nothing left worth sharing: an expired token is rejected anyway
+    assert revocation_stats()["unshared"] == 0 and database.connections == []
+
+def logout(access_token):
+    return TestClient(app, cookies={"access_token": access_token}).post("/auth/logout")
+
+@pytest.fixture
+def logout_calls(monkeypatch, make_verifier):
+    """What logout revoked and signed out; verification is local against the test JWKS"""
+    calls = {"revoked": [], "signed_out": []}
+
+    async def revoke_token(access_token):
+        calls["revoked"].append(access_token)
+        return True
+
+    async def sign_out(access_token):
+        calls["signed_out"].append(access_token)
+
+    monkeypatch.setattr(enhanced_routes, "jwt_verifier", make_verifier())
+    monkeypatch.setattr(enhanced_routes, "revoke_token", revoke_token)
+    monkeypatch.setattr(enhanced_routes.async_cognito_client, "sign_out", sign_out)
+    return calls
+
+def test_logout_revokes_a_verified_token_without_user_lookups(monkeypatch, logout_calls, make_token):
+    async def unavailable(*args):
+        raise AssertionError("logout should not look the user up")
+
+    # Neither the users table nor Cognito GetUser is needed to revoke
+    monkeypatch.setattr(enhanced_routes.user_service, "get_user_profile", unavailable)
+    monkeypatch.setattr(enhanced_routes.async_cognito_client, "get_user_info", unavailable)
+    token = make_token(profile=False)
+
+    assert logout(token).json()["success"]
+    assert logout_calls == {"revoked": [token], "signed_out": [token]}
+
+def test_logout_does_not_revoke_unverifiable_tokens(logout_calls, make_token, caplog):
+    expired = make_token(exp=1)
+    with caplog.at_level("INFO", logger="app.auth.enhanced_routes"):
+        assert logout("not-a-jwt").status_code == 200
+        assert logout(expired).status_code == 200
+
+    assert logout_calls["revoked"] == []
+    assert logout_calls["signed_out"] == ["not-a-jwt", expired]
+    assert sum("nothing to revoke" in record.message for record in caplog.records) == 2
@@ -0,0 +1,243 @@
+# test_sessions.py - Opaque-cookie sessions, their Postgres backend and auth fallback (no database needed)
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app.auth import enhanced_dependencies, sessions
+from app.auth.models import UserResponse
+from app.auth.sessions import PostgresSessionBackend, SessionBackend, SessionStore, session_key
+from app.config import settings
+from app.database import connection as db_connection
+from app.utils import timing
+from conftest import FakeConnection
+
+USER = UserResponse(id="sub-1", email="reader@example.com", name="Reader",
+                    role="free_user", subscription_tier="free", permissions=[])
+
+def issued_tokens(expires_in=3600, access_token="access-1"):
+    return {"access_token": access_token, "refresh_token": "refresh-1",
+            "id_token": "id-1", "expires_in": expires_in}
+
+class MemoryBackend(SessionBackend):
+    """Shared backend stand-in: a dict, as another worker would see it"""
+
+    def __init__(self):
+        self.records = {}
+
+    async def load(self, key):
+        data, expires_at = self.records.get(key, (None, 0))
+        return data if expires_at > time.time() else None
+
+    async def save(self, key, data, expires_at):
+        self.records[key] = (data, expires_at)
+
+    async def delete(self, key):
+        self.records.pop(key, None)
+
+class FakeCognito:
+    """refresh_tokens stand-in: new tokens, or the error Cognito would raise"""
+
+    def __init__(self, error=None):
+        self.error = error
+        self.refreshes = 0
+
+    async def refresh_tokens(self, refresh_token):
+        self.refreshes += 1
+        await asyncio.sleep(0)
+        if self.error:
+            raise self.error
+        return {"access_token": f"access-{self.refreshes + 1}", "id_token": "id-2", "expires_in": 3600}
+
+def test_backend_must_implement_every_method():
+    class Partial(SessionBackend):
+        async def load(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        Partial()
+
+def test_memory_store_create_get_delete():
+    async def run():
+        store = SessionStore()
+        session_id = await store.create(issued_tokens(), USER, {"id": "row-1"})
+        record = await store.get(session_id)
+        assert record.user == USER and record.access_token == "access-1" and record.db_user_id == "row-1"
+
+        assert await store.get("unknown") is None
+        assert (await store.delete(session_id)).access_token == "access-1"
+        assert await store.get(session_id) is None
+
+    asyncio.run(run())
+
+def test_shared_backend_serves_other_workers_and_logout():
+    async def run():
+        backend = MemoryBackend()
+        worker_a, worker_b = SessionStore(backend), SessionStore(backend)
+        session_id = await worker_a.create(issued_tokens(), USER)
+
+        # Stored under a hash of the cookie value, never the value itself
+        assert list(backend.records) == [session_key(session_id)]
+        assert (await worker_b.get(session_id)).user == USER
+
+        await worker_a.delete(session_id)
+        assert backend.records == {}
+
+    asyncio.run(run())
+
+def test_refresh_runs_in_the_background_near_expiry(monkeypatch):
+    cognito = FakeCognito()
+    monkeypatch.setattr(sessions, "async_cognito_client", cognito)
+
+    async def run():
+        backend = MemoryBackend()
+        store = SessionStore(backend)
+        session_id = await store.create(issued_tokens(expires_in=settings.session_refresh_margin_seconds - 1), USER)
+
+        # Concurrent requests near expiry share one refresh and aren't held up by it
+        first, second = await asyncio.gather(store.get(session_id), store.get(session_id))
+        assert first.access_token == second.access_token == "access-1"
+        assert store.stats()["refreshing"] == 1
+
+        await asyncio.gather(*store._refreshing.values())
+        assert cognito.refreshes == 1
+        refreshed = await store.get(session_id)
+        assert refreshed.access_token == "access-2"
+        assert refreshed.access_expires_at > time.time() + settings.session_refresh_margin_seconds
+        assert "access-2" in backend.records[session_key(session_id)][0]
+
+    asyncio.run(run())
+
+def test_background_refresh_is_detached_from_the_request(monkeypatch):
+    seen = {}
+
+    class ContextProbe(FakeCognito):
+        async def refresh_tokens(self, refresh_token):
+            seen["connection_scope"] = db_connection._request_connection.get()
+            seen["timings"] = timing._current_timings.get()
+            return await super().refresh_tokens(refresh_token)
+
+    monkeypatch.setattr(sessions, "async_cognito_client", ContextProbe())
+    monkeypatch.setattr(settings, "db_request_scoped_connection", True)
+    monkeypatch.setattr(settings, "request_timing_sample_rate", 1.0)
+
+    async def run():
+        store = SessionStore()
+        session_id = await store.create(issued_tokens(expires_in=settings.session_refresh_margin_seconds - 1), USER)
+        scope, connection_token = db_connection.start_request_connection()
+        timings, timing_token = timing.start_request_timings()
+        try:
+            await store.get(session_id)
+        finally:
+            timing.stop_request_timings(timing_token)
+            await db_connection.finish_request_connection(scope, connection_token)
+        # The request is over; the refresh must not borrow its connection or add its spans
+        await asyncio.gather(*store._refreshing.values())
+        assert scope is not None and timings is not None
+
+    asyncio.run(run())
+    assert seen == {"connection_scope": None, "timings": None}
+
+def test_rejected_refresh_ends_the_session(monkeypatch):
+    monkeypatch.setattr(sessions, "async_cognito_client", FakeCognito(ValueError("Refresh token revoked")))
+
+    async def run():
+        backend = MemoryBackend()
+        store = SessionStore(backend)
+        session_id = await store.create(issued_tokens(expires_in=1), USER)
+        assert await store.refresh(session_id) is None
+        assert await store.get(session_id) is None
+        assert backend.records == {}
+
+    asyncio.run(run())
+
+def test_transient_refresh_failure_keeps_the_session(monkeypatch):
+    monkeypatch.setattr(sessions, "async_cognito_client", FakeCognito(ConnectionError("Cognito unreachable")))
+
+    async def run():
+        store = SessionStore()
+        session_id = await store.create(issued_tokens(expires_in=1), USER)
+        assert (await store.refresh(session_id)).access_token == "access-1"
+        assert await store.get(session_id) is not None
+
+    asyncio.run(run())
+
+def test_postgres_backend_encrypts_records(monkeypatch, clock):
+    clock.install(sessions)
+    connection = FakeConnection()
+
+    async def get_db_connection():
+        return connection
+
+    async def release_db_connection(released):
+        assert released is connection
+
+    monkeypatch.setattr(sessions, "get_db_connection", get_db_connection)
+    monkeypatch.setattr(sessions, "release_db_connection", release_db_connection)
+
+    async def run():
+        backend = PostgresSessionBackend()
+        await backend.save("key-1", '{"refresh_token": "secret"}', time.time() + 60)
+        insert, purge = connection.executed
+        assert "INSERT INTO auth_sessions" in insert[0] and "DELETE" in purge[0]
+        stored = insert[1][1]
+        assert "secret" not in stored
+
+        # Expired rows are purged on the first save, then at most once per interval
+        await backend.save("key-1", '{"refresh_token": "secret"}', time.time() + 60)
+        assert len(connection.executed) == 3
+        clock.advance(PostgresSessionBackend.PURGE_INTERVAL_SECONDS + 1)
+        await backend.save("key-1", '{"refresh_token": "secret"}', time.time() + 60)
+        assert "DELETE" in connection.executed[-1][0]
+
+        connection.responses.append(stored)
+        assert await backend.load("key-1") == '{"refresh_token": "secret"}'
+
+        # Anything not encrypted with this key (tampered, or another secret) is discarded
+        connection.responses.append(stored[:-4] + "AAAA")
+        assert await backend.load("key-1") is None
+        assert await backend.load("missing") is None
+
+        await backend.delete("key-1")
+        assert connection.executed[-1][1] == ("key-1",)
+
+    asyncio.run(run())
+
+def test_stale_session_cookie_falls_back_to_the_access_token(monkeypatch):
+    monkeypatch.setattr(settings, "session_mode", True)
+    monkeypatch.setattr(enhanced_dependencies, "session_store", SessionStore())
+    token_user = {"user": USER}
+
+    async def load_user_with_db(access_token):
+        assert access_token == "valid-access-token"
+        return token_user
+
+    monkeypatch.setattr(enhanced_dependencies, "_load_user_with_db", load_user_with_db)
+
+    # e.g. the memory backend after a restart: the cookie names a session nobody has
+    user_data = asyncio.run(enhanced_dependencies.get_current_user_with_db(
+        access_token="valid-access-token", session_id="evicted-session"
+    ))
+    assert user_data is token_user
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(enhanced_dependencies.get_current_user_with_db(
+            access_token=None, session_id="evicted-session"
+        ))
+    assert error.value.status_code == 401
+
+def test_backend_defaults_to_postgres_with_several_workers(monkeypatch, caplog):
+    monkeypatch.setattr(settings, "session_mode", True)
+    monkeypatch.setattr(settings, "session_backend", None)
+    monkeypatch.setattr(settings, "web_concurrency", 1)
+    assert sessions._create_backend() is None
+
+    monkeypatch.setattr(settings, "web_concurrency", 2)
+    assert isinstance(sessions._create_backend(), PostgresSessionBackend)
+
+    # An explicit memory backend is honoured, but a multi-worker setup is flagged
+    monkeypatch.setattr(settings, "session_backend", "memory")
+    with caplog.at_level("ERROR", logger=sessions.__name__):
+        assert sessions._create_backend() is None
+    assert "not shared between workers" in caplog.text
@@ -0,0 +1,63 @@
+# test_singleflight.py - Coalescing concurrent calls onto one in-flight task
+import asyncio
+
+import pytest
+
+from app.utils.singleflight import SingleFlight
+from conftest import Loader
+
+def test_concurrent_callers_share_one_call():
+    async def run():
+        flight = SingleFlight()
+        gate = asyncio.Event()
+        loader = Loader(gate=gate)
+
+        waiters = [asyncio.create_task(flight.do("key", loader)) for _ in range(5)]
+        await asyncio.sleep(0)
+        gate.set()
+        assert await asyncio.gather(*waiters) == ["v1"] * 5
+        assert loader.calls == 1
+        assert flight.stats() == {"calls": 5, "coalesced": 4, "in_flight": 0}
+
+        # Different keys don't wait on each other, and a finished key runs again
+        assert await asyncio.gather(flight.do("other", loader), flight.do("key", loader)) == ["v2", "v3"]
+
+    asyncio.run(run())
+
+def test_exception_reaches_every_waiter_without_poisoning_the_key():
+    async def run():
+        flight = SingleFlight()
+        gate = asyncio.Event()
+        failing = Loader(gate=gate, error=ConnectionError("database unavailable"))
+
+        waiters = [asyncio.create_task(flight.do("key", failing)) for _ in range(3)]
+        await asyncio.sleep(0)
+        gate.set()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        assert failing.calls == 1
+        assert all(isinstance(result, ConnectionError) for result in results)
+
+        # The failure isn't cached: the next caller gets a fresh attempt
+        assert flight.stats()["in_flight"] == 0
+        assert await flight.do("key", Loader()) == "v1"
+
+    asyncio.run(run())
+
+def test_cancelled_waiter_does_not_cancel_the_others():
+    async def run():
+        flight = SingleFlight()
+        gate = asyncio.Event()
+        loader = Loader(gate=gate)
+
+        impatient = asyncio.create_task(flight.do("key", loader))
+        patient = asyncio.create_task(flight.do("key", loader))
+        await asyncio.sleep(0)
+        impatient.cancel()
+        gate.set()
+
+        with pytest.raises(asyncio.CancelledError):
+            await impatient
+        assert await patient == "v1"
+        assert loader.calls == 1
+
+    asyncio.run(run())
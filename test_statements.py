@@ -0,0 +1,136 @@
+# test_statements.py - Named statement registry: registration, preparing and per-statement stats (no database needed)
+import asyncio
+
+import asyncpg
+import pytest
+
+from app.database.statements import StatementRegistry, _status_rows, is_write
+from conftest import FakeConnection
+
+USER_BY_SUB_SQL = "SELECT * FROM users WHERE cognito_sub = $1"
+
+class PreparingConnection:
+    """Records prepare_cached calls; queries listed in failing raise a PostgresError"""
+
+    def __init__(self, *failing):
+        self.failing = set(failing)
+        self.prepared = []
+
+    async def prepare_cached(self, query):
+        if query in self.failing:
+            raise asyncpg.exceptions.UndefinedTableError('relation "later" does not exist')
+        self.prepared.append(query)
+
+def test_register_is_idempotent_for_the_same_sql():
+    registry = StatementRegistry()
+    assert registry.register("users.by_sub", USER_BY_SUB_SQL) == "users.by_sub"
+    # Another module sharing the statement, formatted differently
+    registry.register("users.by_sub", """
+        SELECT * FROM users
+        WHERE cognito_sub = $1
+    """)
+    assert len(registry) == 1 and registry.query("users.by_sub") == USER_BY_SUB_SQL
+
+def test_register_rejects_different_sql_under_the_same_name():
+    registry = StatementRegistry()
+    registry.register("users.by_sub", USER_BY_SUB_SQL)
+    with pytest.raises(ValueError, match="users.by_sub"):
+        registry.register("users.by_sub", "SELECT * FROM users WHERE email = $1")
+    assert registry.query("users.by_sub") == USER_BY_SUB_SQL
+
+@pytest.mark.parametrize("status, rows", [
+    ("INSERT 0 1", 1),
+    ("UPDATE 3", 3),
+    ("DELETE 0", 0),
+    ("CREATE INDEX", 0),
+    ("", 0),
+    (None, 0),
+])
+def test_status_rows(status, rows):
+    assert _status_rows(status) == rows
+
+def test_is_write():
+    assert not is_write(USER_BY_SUB_SQL)
+    assert is_write("UPDATE users SET last_login = now() WHERE id = $1")
+    assert is_write("insert into newsletter_subscribers (email) values ($1)")
+    assert is_write("LOCK TABLE users IN SHARE MODE")
+    # Column names aren't keywords
+    assert not is_write("SELECT created_at, updated_at FROM content")
+
+def test_execute_and_fetch_record_rows_and_calls():
+    registry = StatementRegistry()
+    registry.register("users.touch", "UPDATE users SET last_login = now() WHERE id = $1")
+    registry.register("users.by_sub", USER_BY_SUB_SQL)
+    connection = FakeConnection(None, [{"id": 1}, {"id": 2}])
+
+    async def run():
+        await registry.execute(connection, "users.touch", 1)
+        await registry.fetch(connection, "users.by_sub", "sub-1")
+        await registry.fetchrow(connection, "users.by_sub", "sub-2")
+
+    asyncio.run(run())
+    stats = registry.stats()
+    # FakeConnection.execute always answers "OK": no row count in the tag
+    assert (stats["users.touch"]["calls"], stats["users.touch"]["rows"]) == (1, 0)
+    assert (stats["users.by_sub"]["calls"], stats["users.by_sub"]["rows"]) == (2, 2)
+    assert connection.executed[1] == (USER_BY_SUB_SQL, ("sub-1",))
+
+def test_settings_are_set_locally_around_the_statement():
+    registry = StatementRegistry()
+    registry.register("content.search", "SELECT id FROM content WHERE search_vector @@ $1",
+                      settings={"plan_cache_mode": "force_custom_plan"})
+    connection = FakeConnection(None, [{"id": 1}])
+
+    rows = asyncio.run(registry.fetch(connection, "content.search", "sleep"))
+    assert rows == [{"id": 1}] and connection.transactions == ["begin", "commit"]
+    assert connection.executed[0] == ("SET LOCAL plan_cache_mode = 'force_custom_plan'", ())
+    # Same SQL under other settings is a different statement
+    with pytest.raises(ValueError, match="content.search"):
+        registry.register("content.search", "SELECT id FROM content WHERE search_vector @@ $1")
+
+def test_errors_are_counted_and_raised():
+    registry = StatementRegistry()
+    registry.register("users.by_sub", USER_BY_SUB_SQL)
+
+    class BrokenConnection(FakeConnection):
+        async def fetchrow(self, query, *args, **kwargs):
+            raise asyncpg.exceptions.QueryCanceledError("canceling statement due to statement timeout")
+
+    with pytest.raises(asyncpg.exceptions.QueryCanceledError):
+        asyncio.run(registry.fetchrow(BrokenConnection(), "users.by_sub", "sub-1"))
+    stats = registry.stats()["users.by_sub"]
+    assert (stats["calls"], stats["errors"], stats["mean_ms"]) == (0, 1, None)
+
+def test_reset_stats_keeps_the_statements():
+    registry = StatementRegistry()
+    registry.register("users.by_sub", USER_BY_SUB_SQL)
+    asyncio.run(registry.fetchrow(FakeConnection({"id": 1}), "users.by_sub", "sub-1"))
+    assert registry.stats()["users.by_sub"]["calls"] == 1
+
+    registry.reset_stats()
+    assert registry.stats()["users.by_sub"] == {
+        "calls": 0, "errors": 0, "rows": 0, "total_ms": 0.0, "mean_ms": None, "max_ms": 0.0
+    }
+    assert registry.query("users.by_sub") == USER_BY_SUB_SQL
+
+def test_prepare_all_skips_statements_that_fail_to_prepare():
+    registry = StatementRegistry()
+    registry.register("users.by_sub", USER_BY_SUB_SQL)
+    registry.register("later.all", "SELECT * FROM later")
+    registry.register("users.count", "SELECT count(*) FROM users")
+    connection = PreparingConnection("SELECT * FROM later")
+
+    # A table a later migration creates shouldn't fail the pool connection
+    assert asyncio.run(registry.prepare_all(connection)) == 2
+    assert connection.prepared == [USER_BY_SUB_SQL, "SELECT count(*) FROM users"]
+
+def test_prepare_all_lets_other_errors_through():
+    registry = StatementRegistry()
+    registry.register("users.by_sub", USER_BY_SUB_SQL)
+
+    class DroppedConnection(PreparingConnection):
+        async def prepare_cached(self, query):
+            raise ConnectionResetError("connection lost")
+
+    with pytest.raises(ConnectionResetError):
+        asyncio.run(registry.prepare_all(DroppedConnection()))
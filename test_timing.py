@@ -0,0 +1,85 @@
+# test_timing.py - Request spans and the Server-Timing header
+import asyncio
+import re
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.middleware.timing import ServerTimingMiddleware, setup_timing
+from app.utils import timing
+from app.utils.timing import RequestTimings, span, timed
+
+ENTRY = re.compile(r'^[\w.]+;dur=\d+\.\d(;desc="x\d+")?$')
+
+@timed("db.lookup")
+async def lookup():
+    await asyncio.sleep(0)
+    return "row"
+
+def timed_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(ServerTimingMiddleware)
+
+    @app.get("/work")
+    async def work():
+        with span("auth"):
+            pass
+        await lookup()
+        await lookup()
+        return {"ok": True}
+
+    return app
+
+def test_server_timing_format():
+    timings = RequestTimings()
+    timings.add("auth", 1.234)
+    timings.add("db.user", 2.0)
+    timings.add("db.user", 3.0)
+    assert timings.server_timing(9.87) == 'auth;dur=1.2, db.user;dur=5.0;desc="x2", total;dur=9.9'
+
+def test_spans_outside_a_timed_request_are_free():
+    assert span("anything") is timing._NOOP_SPAN
+    assert asyncio.run(lookup()) == "row"
+
+def test_header_lists_the_request_spans(monkeypatch):
+    monkeypatch.setattr(settings, "request_timing_sample_rate", 1.0)
+    response = TestClient(timed_app()).get("/work")
+
+    entries = response.headers["server-timing"].split(", ")
+    assert all(ENTRY.match(entry) for entry in entries), entries
+    assert [entry.split(";")[0] for entry in entries] == ["auth", "db.lookup", "total"]
+    assert entries[1].endswith(';desc="x2"')
+
+def test_only_sampled_requests_are_timed(monkeypatch):
+    monkeypatch.setattr(settings, "request_timing_sample_rate", 0.25)
+    client = TestClient(timed_app())
+
+    monkeypatch.setattr(timing, "random", SimpleNamespace(random=lambda: 0.2))
+    assert "server-timing" in client.get("/work").headers
+    monkeypatch.setattr(timing, "random", SimpleNamespace(random=lambda: 0.25))
+    assert "server-timing" not in client.get("/work").headers
+
+def test_header_can_be_turned_off(monkeypatch, caplog):
+    monkeypatch.setattr(settings, "request_timing_sample_rate", 1.0)
+    monkeypatch.setattr(settings, "request_timing_header", False)
+
+    with caplog.at_level("INFO", logger="app.middleware.timing"):
+        response = TestClient(timed_app()).get("/work")
+
+    assert response.status_code == 200
+    assert "server-timing" not in response.headers
+    # Still logged, with the spans as structured fields
+    record = next(r for r in caplog.records if r.name == "app.middleware.timing")
+    assert record.http_status == 200 and set(record.spans) == {"auth", "db.lookup"}
+
+def test_disabled_timing_installs_no_middleware(monkeypatch):
+    monkeypatch.setattr(settings, "request_timing_enabled", False)
+    app = FastAPI()
+    setup_timing(app)
+    assert app.user_middleware == []
+
+    monkeypatch.setattr(settings, "request_timing_enabled", True)
+    setup_timing(app)
+    assert [m.cls for m in app.user_middleware] == [ServerTimingMiddleware]
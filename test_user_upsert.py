@@ -0,0 +1,97 @@
+# test_user_upsert.py - One-statement user sync on login and on first authenticated request (no database needed)
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from app.auth import enhanced_dependencies, profile_cache, user_service as user_service_module
+from app.auth.models import UserResponse
+from app.auth.profile_cache import get_cached_profile
+from app.database.statements import statement_registry
+from app.database.user_repository import UserRepository
+from conftest import FakeConnection
+
+USER = UserResponse(id="sub-1", email="reader@example.com", name="Reader",
+                    role="free_user", subscription_tier="free", permissions=[])
+
+def users_row(inserted: bool, **overrides):
+    """What users.upsert_on_login returns: the row plus (xmax = 0) AS inserted"""
+    row = {
+        "id": "user-1", "cognito_sub": "sub-1", "email": "reader@example.com",
+        "display_name": "Reader", "avatar_url": None, "subscription_tier": "free",
+        "role": "free_user", "status": "active",
+        "created_at": datetime(2026, 1, 1), "updated_at": datetime(2026, 10, 16),
+        "inserted": inserted
+    }
+    row.update(overrides)
+    return row
+
+@pytest.fixture
+def database(monkeypatch):
+    """Serves every get_db_connection from one FakeConnection"""
+    connection = FakeConnection()
+
+    async def get_db_connection():
+        return connection
+
+    async def release_db_connection(released):
+        pass
+
+    for module in (user_service_module, enhanced_dependencies):
+        monkeypatch.setattr(module, "get_db_connection", get_db_connection)
+        monkeypatch.setattr(module, "release_db_connection", release_db_connection)
+    profile_cache.user_profile_cache.clear()
+    yield connection
+    profile_cache.user_profile_cache.clear()
+
+def test_upsert_is_one_statement_and_drops_the_inserted_flag():
+    connection = FakeConnection(users_row(inserted=True))
+    db_user = asyncio.run(UserRepository(connection).upsert_on_login(
+        cognito_sub="sub-1", email="reader@example.com", display_name="Reader"
+    ))
+
+    assert "inserted" not in db_user and db_user["cognito_sub"] == "sub-1"
+    [(query, args)] = connection.executed
+    assert query == statement_registry.query("users.upsert_on_login")
+    assert args[1:] == ("sub-1", "reader@example.com", "Reader", "free_user", "free")
+
+def test_conflict_records_the_login():
+    query = " ".join(statement_registry.query("users.upsert_on_login").split())
+    # An existing user only gets updated_at bumped (what update_user_last_login did); nothing else is overwritten
+    assert "ON CONFLICT (cognito_sub) DO UPDATE SET updated_at = CURRENT_TIMESTAMP RETURNING" in query
+    assert query.endswith("(xmax = 0) AS inserted")
+
+    connection = FakeConnection(users_row(inserted=False, role="premium_user"))
+    db_user = asyncio.run(UserRepository(connection).upsert_on_login(
+        cognito_sub="sub-1", email="reader@example.com", display_name="Reader"
+    ))
+    # The stored role wins over the defaults sent for a new user
+    assert db_user["role"] == "premium_user" and "inserted" not in db_user
+    assert len(connection.executed) == 1
+
+def test_oauth_sync_caches_the_row_without_the_flag(database):
+    database.responses.append(users_row(inserted=False))
+    result = asyncio.run(user_service_module.user_service.sync_cognito_user_with_db(USER))
+
+    assert "inserted" not in result["db_user"]
+    assert get_cached_profile("sub-1") == result["db_user"]
+    assert len(database.executed) == 1
+
+def test_missing_user_is_created_with_the_upsert(database):
+    # The profile lookup finds nothing, then the upsert creates the row
+    database.responses.extend([None, users_row(inserted=True)])
+    db_user = asyncio.run(enhanced_dependencies._get_or_create_db_user(USER))
+
+    assert [query for query, args in database.executed] == [
+        statement_registry.query("users.by_cognito_sub"),
+        statement_registry.query("users.upsert_on_login"),
+    ]
+    assert "inserted" not in db_user
+    assert get_cached_profile("sub-1") == db_user
+
+def test_existing_user_is_only_read(database):
+    database.responses.append(users_row(inserted=False))
+    del database.responses[0]["inserted"]
+    asyncio.run(enhanced_dependencies._get_or_create_db_user(USER))
+    # No write per authenticated request: updated_at stays the last login
+    assert [query for query, args in database.executed] == [statement_registry.query("users.by_cognito_sub")]